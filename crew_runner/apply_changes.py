@@ -2,9 +2,156 @@
 File operation helpers: pure, testable functions for applying structured changes.
 """
 
+import mmap
+import os
 import re
+import stat
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import Tuple
+from typing import Optional, Tuple
+
+
+# Process umask, read once at import: os.umask() can only be queried by setting it,
+# which is not safe to do from the apply worker threads
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _atomic_write_text(file_path: Path, content: str) -> None:
+    """
+    Write content via a temp file in the same directory, then os.replace() it in.
+    Readers never see a half-written file, and the encoded bytes are written from a
+    memoryview so no extra Python-side copy is made. Existing file mode is kept;
+    new files get the mode open() would give them (0o666 minus the umask).
+    """
+    encoded = content.encode('utf-8')
+    mode = stat.S_IMODE(file_path.stat().st_mode) if file_path.exists() else 0o666 & ~_UMASK
+    fd, tmp_name = tempfile.mkstemp(dir=file_path.parent, prefix=f".{file_path.name}.", suffix=".tmp")
+    try:
+        view = memoryview(encoded)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+        os.close(fd)
+        fd = None
+        os.chmod(tmp_name, mode)
+        os.replace(tmp_name, file_path)
+    except BaseException:
+        if fd is not None:
+            os.close(fd)
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+
+# Below this size a plain read beats mmap setup (page-granular mapping)
+_MMAP_MIN_SIZE = 64 * 1024
+
+
+def _file_contains(file_path: Path, needle: str) -> bool:
+    """
+    Presence check with the same newline handling as _read_text.
+    The file bytes are searched directly (through mmap when large) unless the needle
+    spans lines and the file has '\r' line endings; that case compares normalized text.
+    """
+    encoded = needle.encode('utf-8')
+    multiline = '\n' in needle or '\r' in needle
+    with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < _MMAP_MIN_SIZE:
+            data = f.read()
+            if not multiline or b'\r' not in data:
+                return encoded in data
+        else:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if not multiline or mm.find(b'\r') == -1:
+                    return mm.find(encoded) != -1
+    return needle in _read_text(file_path)
+
+
+def _read_text(file_path: Path) -> str:
+    """
+    Read a UTF-8 file with the same newline handling as Path.read_text.
+    Small files take the plain read; large ones are decoded straight out of an mmap,
+    skipping the intermediate bytes copy.
+    """
+    with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < _MMAP_MIN_SIZE:
+            data = f.read().decode('utf-8')
+        else:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                data = str(mm, 'utf-8')
+    if '\r' in data:
+        # Universal newlines, as text-mode reads would have done
+        data = data.replace('\r\n', '\n').replace('\r', '\n')
+    return data
+
+
+# function name() {...} | const/let name = function() {...} | const/let name = () => {...}
+_JS_FUNC_TEMPLATE = (
+    r'(?:function\s+{n}\s*\([^)]*\)'
+    r'|(?:const|let)\s+{n}\s*=\s*(?:function\s*\([^)]*\)|\([^)]*\)\s*=>))'
+    r'\s*\{{[^}}]*\}}'
+)
+
+
+@lru_cache(maxsize=128)
+def _js_function_pattern(function_name: str) -> re.Pattern:
+    """Compiled matcher for any supported definition of function_name."""
+    return re.compile(_JS_FUNC_TEMPLATE.format(n=re.escape(function_name)), re.DOTALL | re.MULTILINE)
+
+
+def _upsert_match(content: str, match: Optional[re.Match], block: str) -> Optional[str]:
+    """Replace the matched block, or append block if there was no match. None if unchanged."""
+    if match:
+        # Check if replacement would change content (idempotency check)
+        existing_block = content[match.start():match.end()]
+        if existing_block.strip() == block.strip():
+            return None  # No change needed
+        return content[:match.start()] + block + content[match.end():]
+    
+    # Not found - append at end
+    if not content.endswith('\n'):
+        content += '\n'
+    return content + '\n' + block + '\n'
+
+
+def _upsert_function_js_text(content: str, function_name: str, function_body: str) -> Optional[str]:
+    # Single pass over the content: all supported definition forms in one alternation
+    match = _js_function_pattern(function_name).search(content)
+    return _upsert_match(content, match, function_body)
+
+
+def _upsert_css_selector_text(content: str, selector: str, css_block: str) -> Optional[str]:
+    # Escape selector for regex (handle .class, #id, element, etc.)
+    pattern = rf'{re.escape(selector)}\s*\{{[^}}]*\}}'
+    match = re.search(pattern, content, re.DOTALL | re.MULTILINE)
+    return _upsert_match(content, match, css_block)
+
+
+def _insert_at_anchor_text(content: str, anchor: str, content_to_insert: str,
+                           use_regex: bool, after: bool) -> Optional[str]:
+    """Insert before/after the first anchor hit. None if the anchor is not found."""
+    if use_regex:
+        match = re.search(anchor, content)
+        if not match:
+            return None
+        pos = match.end() if after else match.start()
+    else:
+        pos = content.find(anchor)
+        if pos == -1:
+            return None
+        if after:
+            pos += len(anchor)
+    
+    if after:
+        return content[:pos] + '\n' + content_to_insert + content[pos:]
+    return content[:pos] + content_to_insert + '\n' + content[pos:]
 
 
 def upsert_function_js(file_path: Path, function_name: str, function_body: str) -> bool:
@@ -16,40 +163,10 @@ def upsert_function_js(file_path: Path, function_name: str, function_body: str)
     if not file_path.exists():
         return False
     
-    content = file_path.read_text(encoding='utf-8')
-    
-    # Try to find function definition (supports various formats)
-    patterns = [
-        # function name() { ... } - match entire function body
-        rf'function\s+{re.escape(function_name)}\s*\([^)]*\)\s*\{{[^}}]*\}}',
-        # const name = function() { ... }
-        rf'const\s+{re.escape(function_name)}\s*=\s*function\s*\([^)]*\)\s*\{{[^}}]*\}}',
-        # const name = () => { ... }
-        rf'const\s+{re.escape(function_name)}\s*=\s*\([^)]*\)\s*=>\s*\{{[^}}]*\}}',
-        # let name = function() { ... }
-        rf'let\s+{re.escape(function_name)}\s*=\s*function\s*\([^)]*\)\s*\{{[^}}]*\}}',
-        # let name = () => { ... }
-        rf'let\s+{re.escape(function_name)}\s*=\s*\([^)]*\)\s*=>\s*\{{[^}}]*\}}',
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, content, re.DOTALL | re.MULTILINE)
-        if match:
-            # Check if replacement would change content (idempotency check)
-            existing_function = content[match.start():match.end()]
-            if existing_function.strip() == function_body.strip():
-                return False  # No change needed
-            
-            # Replace existing function
-            new_content = content[:match.start()] + function_body + content[match.end():]
-            file_path.write_text(new_content, encoding='utf-8')
-            return True
-    
-    # Function not found - append at end
-    if not content.endswith('\n'):
-        content += '\n'
-    content += '\n' + function_body + '\n'
-    file_path.write_text(content, encoding='utf-8')
+    new_content = _upsert_function_js_text(_read_text(file_path), function_name, function_body)
+    if new_content is None:
+        return False
+    _atomic_write_text(file_path, new_content)
     return True
 
 
@@ -62,31 +179,10 @@ def upsert_css_selector(file_path: Path, selector: str, css_block: str) -> bool:
     if not file_path.exists():
         return False
     
-    content = file_path.read_text(encoding='utf-8')
-    
-    # Escape selector for regex (handle .class, #id, element, etc.)
-    escaped_selector = re.escape(selector)
-    
-    # Try to find selector block (more robust matching)
-    pattern = rf'{escaped_selector}\s*\{{[^}}]*\}}'
-    match = re.search(pattern, content, re.DOTALL | re.MULTILINE)
-    
-    if match:
-        # Check if replacement would change content (idempotency check)
-        existing_block = content[match.start():match.end()]
-        if existing_block.strip() == css_block.strip():
-            return False  # No change needed
-        
-        # Replace existing selector
-        new_content = content[:match.start()] + css_block + content[match.end():]
-        file_path.write_text(new_content, encoding='utf-8')
-        return True
-    
-    # Selector not found - append at end
-    if not content.endswith('\n'):
-        content += '\n'
-    content += '\n' + css_block + '\n'
-    file_path.write_text(content, encoding='utf-8')
+    new_content = _upsert_css_selector_text(_read_text(file_path), selector, css_block)
+    if new_content is None:
+        return False
+    _atomic_write_text(file_path, new_content)
     return True
 
 
@@ -95,22 +191,11 @@ def insert_after_anchor(file_path: Path, anchor: str, content_to_insert: str, us
     if not file_path.exists():
         return False
     
-    current_content = file_path.read_text(encoding='utf-8')
-    
-    if use_regex:
-        match = re.search(anchor, current_content)
-        if match:
-            pos = match.end()
-        else:
-            return False
-    else:
-        pos = current_content.find(anchor)
-        if pos == -1:
-            return False
-        pos += len(anchor)
-    
-    new_content = current_content[:pos] + '\n' + content_to_insert + current_content[pos:]
-    file_path.write_text(new_content, encoding='utf-8')
+    new_content = _insert_at_anchor_text(_read_text(file_path), anchor,
+                                         content_to_insert, use_regex, after=True)
+    if new_content is None:
+        return False
+    _atomic_write_text(file_path, new_content)
     return True
 
 
@@ -119,63 +204,365 @@ def insert_before_anchor(file_path: Path, anchor: str, content_to_insert: str, u
     if not file_path.exists():
         return False
     
-    current_content = file_path.read_text(encoding='utf-8')
-    
-    if use_regex:
-        match = re.search(anchor, current_content)
-        if match:
-            pos = match.start()
-        else:
-            return False
-    else:
-        pos = current_content.find(anchor)
-        if pos == -1:
-            return False
-    
-    new_content = current_content[:pos] + content_to_insert + '\n' + current_content[pos:]
-    file_path.write_text(new_content, encoding='utf-8')
+    new_content = _insert_at_anchor_text(_read_text(file_path), anchor,
+                                         content_to_insert, use_regex, after=False)
+    if new_content is None:
+        return False
+    _atomic_write_text(file_path, new_content)
     return True
 
 
+def _ends_with_newline(file_path: Path) -> bool:
+    """Check the last byte only; an empty file counts as not newline-terminated."""
+    with open(file_path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() == 0:
+            return False
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b'\n'
+
+
+def _append_bytes(file_path: Path, text: str) -> None:
+    """O(1) append of text as its own line(s), without reading the file body."""
+    prefix = b'' if _ends_with_newline(file_path) else b'\n'
+    with open(file_path, 'ab') as f:
+        f.write(prefix + text.encode('utf-8'))
+
+
 def append_if_missing(file_path: Path, content_to_append: str, signature: str) -> bool:
     """Append content only if signature is not present. Returns True if appended."""
     if not file_path.exists():
         # Create file with content
         file_path.parent.mkdir(parents=True, exist_ok=True)
-        file_path.write_text(content_to_append, encoding='utf-8')
+        _atomic_write_text(file_path, content_to_append)
         return True
     
-    current_content = file_path.read_text(encoding='utf-8')
-    
-    if signature in current_content:
+    # Signature search runs on raw bytes; the file is never decoded
+    if _file_contains(file_path, signature):
         return False  # Already present
     
-    if not current_content.endswith('\n'):
-        current_content += '\n'
-    current_content += content_to_append + '\n'
-    file_path.write_text(current_content, encoding='utf-8')
+    _append_bytes(file_path, content_to_append + '\n')
     return True
 
 
-def apply_structured_changes(changes_data: dict, work_dir: Path) -> Tuple[bool, list[str], list[str]]:
+class _FileBuffer:
     """
-    Apply structured changes directly to files with robust fallbacks.
-    Returns (success, changed_files, error_messages)
-    Deduplication: tracks files in a set to avoid duplicates.
-    Idempotency: only reports files that actually changed.
+    In-memory view of one file while a group of changes is applied to it.
+    The file is read on first use, every operation mutates the cached string,
+    and flush() writes (or deletes) once at the end. Appends to a file that was
+    never read are queued and flushed as a plain append, without reading it.
+    """
+    
+    def __init__(self, file_path: Path):
+        self.file_path = file_path
+        self._content: Optional[str] = None
+        self._exists: Optional[bool] = None
+        self._tail: list[str] = []  # Pending appends to the unread on-disk file
+        self.dirty = False
+        self.deleted = False
+    
+    def exists(self) -> bool:
+        if self._exists is None:
+            self._exists = self.file_path.exists()
+        return self._exists
+    
+    def read(self) -> str:
+        if self._content is None:
+            self._content = _read_text(self.file_path)
+            if self._tail:
+                # Fold queued appends into the full content; it now needs a rewrite
+                for text in self._tail:
+                    if not self._content.endswith('\n'):
+                        self._content += '\n'
+                    self._content += text
+                self._tail = []
+                self.dirty = True
+        return self._content
+    
+    def contains(self, needle: str) -> bool:
+        """Substring check; searches the file bytes directly if it has not been read yet."""
+        if self._content is None and not self._tail:
+            return _file_contains(self.file_path, needle)
+        return needle in self.read()
+    
+    def append(self, text: str) -> None:
+        """Append text (caller supplies the trailing newline) after a newline boundary."""
+        if self._content is None:
+            self._tail.append(text)
+            return
+        content = self._content
+        if not content.endswith('\n'):
+            content += '\n'
+        self.write(content + text)
+    
+    def write(self, content: str) -> None:
+        self._content = content
+        self._exists = True
+        self._tail = []
+        self.dirty = True
+        self.deleted = False
+    
+    def delete(self) -> None:
+        self._content = None
+        self._exists = False
+        self._tail = []
+        self.dirty = False
+        self.deleted = True
+    
+    def flush(self) -> None:
+        """Write dirty content once via an atomic temp-file swap; untouched files are not rewritten."""
+        if self.dirty:
+            self.file_path.parent.mkdir(parents=True, exist_ok=True)
+            _atomic_write_text(self.file_path, self._content)
+        elif self._tail:
+            # Queued appends each end in a newline, so only the first needs a separator
+            _append_bytes(self.file_path, ''.join(self._tail))
+        elif self.deleted and self.file_path.exists():
+            self.file_path.unlink()
+        self._tail = []
+        self.dirty = False
+        self.deleted = False
+
+
+@dataclass
+class BatchResult:
+    """Outcome of applying a batch of structured changes.
+    succeeded: paths that changed on disk; failed: paths with at least one error;
+    messages: per-change progress lines, grouped by file in order of first appearance."""
+    succeeded: list[str] = field(default_factory=list)
+    failed: list[str] = field(default_factory=list)
+    errors: list[str] = field(default_factory=list)
+    warnings: list[str] = field(default_factory=list)
+    messages: list[str] = field(default_factory=list)
+
+
+def _apply_single_change(change: dict, buf: _FileBuffer, errors: list, warnings: list,
+                         messages: list) -> bool:
+    """
+    Apply one normalized change to the file buffer. Appends problems to errors/warnings
+    and progress lines to messages (runs in a worker thread, so it must not print).
+    Returns True if the file content actually changed.
+    """
+    path = change["path"]
+    operation = change.get("operation", "replace")  # Default to replace
+    changed = False
+    
+    try:
+        if operation == "create":
+            # Create new file
+            content = change.get("content", "")
+            if buf.exists():
+                warnings.append(f"File {path} already exists, overwriting (create operation)")
+            buf.write(content)
+            changed = True
+            messages.append(f"✓ Created file: {path}")
+            
+        elif operation == "replace_file" or operation == "replace":
+            # Replace entire file content
+            if not buf.exists():
+                errors.append(f"File not found for replace: {path}")
+                return False
+            content = change.get("content", "")
+            # Idempotency: check if content actually changed
+            if buf.read() == content:
+                messages.append(f"ℹ️  File {path} already matches replacement content (no changes needed)")
+                return False
+            buf.write(content)
+            changed = True
+            messages.append(f"✓ Replaced file: {path}")
+            
+        elif operation == "edit":
+            # Apply targeted edits with fallbacks
+            if not buf.exists():
+                errors.append(f"File not found for edit: {path}")
+                return False
+            
+            edits = change.get("edits", [])
+            # Pre-filter on raw bytes: if no (trimmed) find text is present at all, skip the decode
+            if edits and not any(buf.contains(edit.get("find", "").strip()) for edit in edits):
+                for edit in edits:
+                    errors.append(f"Could not find anchor in {path}: {edit.get('find', '')[:50]}...")
+                errors.append(f"No changes applied to {path} (all find texts not found)")
+                return False
+            
+            current_content = buf.read()
+            new_content = current_content
+            edit_success = False
+            
+            for edit in edits:
+                find_text = edit.get("find", "")
+                replace_text = edit.get("replace", "")
+                
+                # Try exact match first; find() + splice is one scan instead of `in` + replace()
+                pos = new_content.find(find_text)
+                if pos != -1:
+                    new_content = new_content[:pos] + replace_text + new_content[pos + len(find_text):]
+                    edit_success = True
+                    continue
+                
+                # Fall back to the whitespace-trimmed anchor (models often add or
+                # drop surrounding blank lines/indent); keep the file's own whitespace
+                trimmed = find_text.strip()
+                pos = new_content.find(trimmed) if trimmed else -1
+                if pos != -1:
+                    new_content = new_content[:pos] + replace_text.strip() + new_content[pos + len(trimmed):]
+                    edit_success = True
+                    warnings.append(f"Used whitespace-trimmed match for edit in {path}")
+                else:
+                    errors.append(f"Could not find anchor in {path}: {find_text[:50]}...")
+            
+            if edit_success and new_content != current_content:
+                buf.write(new_content)
+                changed = True
+                messages.append(f"✓ Edited file: {path}")
+            elif not edit_success:
+                errors.append(f"No changes applied to {path} (all find texts not found)")
+                
+        elif operation in ("insert_after_anchor", "insert_before_anchor"):
+            anchor = change.get("anchor", "")
+            content_to_insert = change.get("content", "")
+            use_regex = change.get("use_regex", False)
+            after = operation == "insert_after_anchor"
+            
+            new_content = None
+            if buf.exists():
+                try:
+                    new_content = _insert_at_anchor_text(buf.read(), anchor, content_to_insert, use_regex, after)
+                except re.error as e:
+                    errors.append(f"Invalid regex pattern for anchor in {path}: {e}")
+                    return False
+            if new_content is not None:
+                buf.write(new_content)
+                changed = True
+                messages.append(f"✓ Inserted content {'after' if after else 'before'} anchor in {path}")
+            else:
+                errors.append(f"Could not find anchor in {path}: {anchor[:50]}...")
+                
+        elif operation == "append_if_missing":
+            content_to_append = change.get("content", "")
+            signature = change.get("signature", "")
+            
+            # Idempotency: nothing is appended if the signature already exists
+            if not buf.exists():
+                buf.write(content_to_append)  # Create file with content
+                changed = True
+                messages.append(f"✓ Appended content to {path}")
+            elif buf.contains(signature):
+                messages.append(f"ℹ️  Content already present in {path} (signature found)")
+            else:
+                buf.append(content_to_append + '\n')
+                changed = True
+                messages.append(f"✓ Appended content to {path}")
+                
+        elif operation == "upsert_function_js":
+            function_name = change.get("function_name", "")
+            function_body = change.get("content", "")
+            
+            if not function_name:
+                errors.append(f"Missing function_name for upsert_function_js in {path}")
+                return False
+            
+            # Idempotency: only add to changed_files if content actually changed
+            new_content = None
+            if buf.exists():
+                new_content = _upsert_function_js_text(buf.read(), function_name, function_body)
+            if new_content is not None:
+                buf.write(new_content)
+                changed = True
+                messages.append(f"✓ Upserted function {function_name} in {path}")
+            else:
+                messages.append(f"ℹ️  Function {function_name} in {path} already up-to-date (no changes needed)")
+                
+        elif operation == "upsert_css_selector":
+            selector = change.get("selector", "")
+            css_block = change.get("content", "")
+            
+            if not selector:
+                errors.append(f"Missing selector for upsert_css_selector in {path}")
+                return False
+            
+            # Idempotency: only add to changed_files if content actually changed
+            new_content = None
+            if buf.exists():
+                new_content = _upsert_css_selector_text(buf.read(), selector, css_block)
+            if new_content is not None:
+                buf.write(new_content)
+                changed = True
+                messages.append(f"✓ Upserted CSS selector {selector} in {path}")
+            else:
+                messages.append(f"ℹ️  CSS selector {selector} in {path} already up-to-date (no changes needed)")
+                
+        elif operation == "delete":
+            # Delete file
+            if not buf.exists():
+                errors.append(f"File not found for delete: {path}")
+                return False
+            buf.delete()
+            changed = True
+            messages.append(f"✓ Deleted file: {path}")
+        else:
+            # This should not happen if validator is working correctly
+            errors.append(f"Unknown operation '{operation}' for {path}. Supported: create, replace, replace_file, edit, upsert_function_js, upsert_css_selector, insert_after_anchor, insert_before_anchor, append_if_missing, delete")
+    except Exception as e:
+        errors.append(f"Error applying change to {path}: {str(e)}")
+    
+    return changed
+
+
+def _apply_change_group(changes: list[dict], work_dir: Path, fail_fast: bool,
+                        stop_event: threading.Event) -> Tuple[bool, list[str], list[str], list[str]]:
+    """
+    Apply all changes for a single path in order (sequential upserts on one file).
+    The file is read at most once and written at most once for the whole group.
+    Returns (changed, errors, warnings, messages) for the group.
     """
-    changed_files_set = set()  # Use set to dedupe
+    changed = False
     errors = []
     warnings = []
+    messages = []
+    path = changes[0]["path"]
+    buf = _FileBuffer(work_dir / path)
+    
+    for change in changes:
+        if stop_event.is_set():
+            break
+        error_count = len(errors)
+        if _apply_single_change(change, buf, errors, warnings, messages):
+            changed = True
+        if fail_fast and len(errors) > error_count:
+            stop_event.set()
+            break
+    
+    # Flush whatever landed, even if a later change in the group failed
+    try:
+        buf.flush()
+    except Exception as e:
+        errors.append(f"Error applying change to {path}: {str(e)}")
+        changed = False
+    
+    return changed, errors, warnings, messages
+
+
+def apply_changes_batch(changes_data: dict, work_dir: Path, fail_fast: bool = False,
+                        max_workers: Optional[int] = None) -> BatchResult:
+    """
+    Apply structured changes, grouped by path. Changes to the same file run in
+    order; different files are written in parallel since the work is I/O-bound.
+    With fail_fast, the first error stops any change that has not started yet.
+    """
+    result = BatchResult()
     
     if "error" in changes_data:
-        return False, [], [changes_data["error"]]
+        result.errors.append(changes_data["error"])
+        return result
     
+    # Group by path, preserving order of first appearance and order within a group
+    groups_by_path: dict[str, list[dict]] = {}
     for change in changes_data.get("changes", []):
         # Schema normalization: accept both "path" and "file"
         path = change.get("path") or change.get("file")
         if not path:
-            errors.append("Change missing 'path' or 'file' field")
+            result.errors.append("Change missing 'path' or 'file' field")
             continue
         
         # Normalize in place
@@ -183,157 +570,50 @@ def apply_structured_changes(changes_data: dict, work_dir: Path) -> Tuple[bool,
         if "file" in change:
             del change["file"]  # Remove duplicate field
         
-        operation = change.get("operation", "replace")  # Default to replace
-        file_path = work_dir / path
-        
-        try:
-            if operation == "create":
-                # Create new file
-                file_path.parent.mkdir(parents=True, exist_ok=True)
-                content = change.get("content", "")
-                if file_path.exists():
-                    warnings.append(f"File {path} already exists, overwriting (create operation)")
-                file_path.write_text(content, encoding='utf-8')
-                changed_files_set.add(path)  # Use set to dedupe
-                print(f"✓ Created file: {path}")
-                
-            elif operation == "replace_file" or operation == "replace":
-                # Replace entire file content
-                if not file_path.exists():
-                    errors.append(f"File not found for replace: {path}")
-                    continue
-                content = change.get("content", "")
-                # Idempotency: check if content actually changed
-                if file_path.exists():
-                    current_content = file_path.read_text(encoding='utf-8')
-                    if current_content == content:
-                        print(f"ℹ️  File {path} already matches replacement content (no changes needed)")
-                        continue
-                file_path.write_text(content, encoding='utf-8')
-                changed_files_set.add(path)  # Use set to dedupe
-                print(f"✓ Replaced file: {path}")
-                
-            elif operation == "edit":
-                # Apply targeted edits with fallbacks
-                if not file_path.exists():
-                    errors.append(f"File not found for edit: {path}")
-                    continue
-                
-                current_content = file_path.read_text(encoding='utf-8')
-                new_content = current_content
-                edit_success = False
-                
-                edits = change.get("edits", [])
-                for edit in edits:
-                    find_text = edit.get("find", "")
-                    replace_text = edit.get("replace", "")
-                    
-                    # Try exact match first
-                    if find_text in new_content:
-                        new_content = new_content.replace(find_text, replace_text, 1)
-                        edit_success = True
-                    else:
-                        # Try regex anchor
-                        try:
-                            pattern = re.compile(re.escape(find_text), re.MULTILINE | re.DOTALL)
-                            if pattern.search(new_content):
-                                new_content = pattern.sub(replace_text, new_content, count=1)
-                                edit_success = True
-                                warnings.append(f"Used regex fallback for edit in {path}")
-                            else:
-                                errors.append(f"Could not find anchor in {path}: {find_text[:50]}...")
-                        except:
-                            errors.append(f"Invalid regex pattern in {path}: {find_text[:50]}...")
-                
-                if edit_success and new_content != current_content:
-                    file_path.write_text(new_content, encoding='utf-8')
-                    changed_files_set.add(path)  # Use set to dedupe
-                    print(f"✓ Edited file: {path}")
-                elif not edit_success:
-                    errors.append(f"No changes applied to {path} (all find texts not found)")
-                    
-            elif operation == "insert_after_anchor":
-                anchor = change.get("anchor", "")
-                content_to_insert = change.get("content", "")
-                use_regex = change.get("use_regex", False)
-                
-                if insert_after_anchor(file_path, anchor, content_to_insert, use_regex):
-                    changed_files_set.add(path)  # Use set to dedupe
-                    print(f"✓ Inserted content after anchor in {path}")
-                else:
-                    errors.append(f"Could not find anchor in {path}: {anchor[:50]}...")
-                    
-            elif operation == "insert_before_anchor":
-                anchor = change.get("anchor", "")
-                content_to_insert = change.get("content", "")
-                use_regex = change.get("use_regex", False)
-                
-                if insert_before_anchor(file_path, anchor, content_to_insert, use_regex):
-                    changed_files_set.add(path)  # Use set to dedupe
-                    print(f"✓ Inserted content before anchor in {path}")
-                else:
-                    errors.append(f"Could not find anchor in {path}: {anchor[:50]}...")
-                    
-            elif operation == "append_if_missing":
-                content_to_append = change.get("content", "")
-                signature = change.get("signature", "")
-                
-                # Idempotency: append_if_missing already returns False if signature exists
-                if append_if_missing(file_path, content_to_append, signature):
-                    changed_files_set.add(path)  # Use set to dedupe
-                    print(f"✓ Appended content to {path}")
-                else:
-                    print(f"ℹ️  Content already present in {path} (signature found)")
-                    
-            elif operation == "upsert_function_js":
-                function_name = change.get("function_name", "")
-                function_body = change.get("content", "")
-                
-                if not function_name:
-                    errors.append(f"Missing function_name for upsert_function_js in {path}")
-                    continue
-                
-                # Idempotency: only add to changed_files if content actually changed
-                if upsert_function_js(file_path, function_name, function_body):
-                    changed_files_set.add(path)  # Use set to dedupe
-                    print(f"✓ Upserted function {function_name} in {path}")
-                else:
-                    print(f"ℹ️  Function {function_name} in {path} already up-to-date (no changes needed)")
-                    
-            elif operation == "upsert_css_selector":
-                selector = change.get("selector", "")
-                css_block = change.get("content", "")
-                
-                if not selector:
-                    errors.append(f"Missing selector for upsert_css_selector in {path}")
-                    continue
-                
-                # Idempotency: only add to changed_files if content actually changed
-                if upsert_css_selector(file_path, selector, css_block):
-                    changed_files_set.add(path)  # Use set to dedupe
-                    print(f"✓ Upserted CSS selector {selector} in {path}")
-                else:
-                    print(f"ℹ️  CSS selector {selector} in {path} already up-to-date (no changes needed)")
-                    
-            elif operation == "delete":
-                # Delete file
-                if not file_path.exists():
-                    errors.append(f"File not found for delete: {path}")
-                    continue
-                file_path.unlink()
-                changed_files_set.add(path)  # Use set to dedupe
-                print(f"✓ Deleted file: {path}")
-            else:
-                # This should not happen if validator is working correctly
-                errors.append(f"Unknown operation '{operation}' for {path}. Supported: create, replace, replace_file, edit, upsert_function_js, upsert_css_selector, insert_after_anchor, insert_before_anchor, append_if_missing, delete")
-                
-        except Exception as e:
-            errors.append(f"Error applying change to {path}: {str(e)}")
+        groups_by_path.setdefault(path, []).append(change)
+    
+    if not groups_by_path or (fail_fast and result.errors):
+        return result
+    
+    stop_event = threading.Event()
+    workers = max_workers or min(8, len(groups_by_path))
+    
+    def run_group(group: list[dict]):
+        return _apply_change_group(group, work_dir, fail_fast, stop_event)
+    
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # map() yields in submission order, so errors stay grouped by file
+        outcomes = list(executor.map(run_group, groups_by_path.values()))
+    
+    for path, (changed, errors, warnings, messages) in zip(groups_by_path, outcomes):
+        # A file can be both changed and failed (e.g. an earlier upsert landed)
+        if changed:
+            result.succeeded.append(path)
+        if errors:
+            result.failed.append(path)
+        result.errors.extend(errors)
+        result.warnings.extend(warnings)
+        result.messages.extend(messages)
+    
+    # Printed here rather than in the workers so lines from different files never interleave
+    for message in result.messages:
+        print(message)
+    
+    return result
+
+
+def apply_structured_changes(changes_data: dict, work_dir: Path, fail_fast: bool = False) -> Tuple[bool, list[str], list[str]]:
+    """
+    Apply structured changes directly to files with robust fallbacks.
+    Returns (success, changed_files, error_messages)
+    Deduplication: changes are grouped by path, so each file is reported once,
+    in order of first appearance in the change list.
+    Idempotency: only reports files that actually changed.
+    """
+    result = apply_changes_batch(changes_data, work_dir, fail_fast=fail_fast)
     
     # Print warnings
-    for warning in warnings:
+    for warning in result.warnings:
         print(f"⚠️  {warning}")
     
-    # Convert set to sorted list for consistent output
-    changed_files = sorted(list(changed_files_set))
-    return len(errors) == 0, changed_files, errors
+    return len(result.errors) == 0, result.succeeded, result.errors
@@ -4,7 +4,14 @@ Coverage checking: verify implementation plan requirements are met.
 
 import re
 from pathlib import Path
-from .plan_requirements import parse_plan_requirements
+from .apply_changes import _read_text
+from .plan_requirements import parse_plan_requirements, _SEL_PREFIXES
+
+
+# Every declared function name: function name( | const/let/var name =
+_JS_DEF_RE = re.compile(r'function\s+([\w$]+)\s*\(|(?:const|let|var)\s+([\w$]+)\s*=')
+# Every .class / #id / [attribute] that opens a rule or a selector list
+_CSS_RULE_PART_RE = re.compile(r'([.#][\w-]+|\[[^\]]+\])\s*[{,]')
 
 
 def check_coverage(plan_file: Path, work_dir: Path) -> tuple[bool, dict]:
@@ -20,64 +27,34 @@ def check_coverage(plan_file: Path, work_dir: Path) -> tuple[bool, dict]:
         "required_files": []
     }
     
-    # Check required functions in JS files
-    for func_name in requirements["functions"]:
-        found = False
-        # Check common JS files
+    # Check required functions in JS files: one scan per file collects every
+    # declared name, then membership is a set lookup per required function
+    if requirements["functions"]:
+        defined = set()
         for js_file in ["app.js", "index.js", "main.js"]:
             js_path = work_dir / js_file
             if js_path.exists():
-                content = js_path.read_text(encoding='utf-8')
-                # Look for function definition
-                patterns = [
-                    rf'function\s+{re.escape(func_name)}\s*\(',
-                    rf'const\s+{re.escape(func_name)}\s*=',
-                    rf'let\s+{re.escape(func_name)}\s*=',
-                    rf'var\s+{re.escape(func_name)}\s*='
-                ]
-                for pattern in patterns:
-                    if re.search(pattern, content):
-                        found = True
-                        break
-                if found:
-                    break
-        if not found:
-            missing["functions"].append(func_name)
+                content = _read_text(js_path)
+                for func_decl, var_decl in _JS_DEF_RE.findall(content):
+                    defined.add(func_decl or var_decl)
+        missing["functions"] = [f for f in requirements["functions"] if f not in defined]
     
     # Check CSS selectors
     css_path = work_dir / "styles.css"
     
     # Filter out invalid/garbage selectors before checking
-    valid_selectors = [s for s in requirements["css_selectors"] 
-                      if s and (s.startswith('.') or s.startswith('#') or s.startswith('['))]
+    valid_selectors = [s for s in requirements["css_selectors"] if s.startswith(_SEL_PREFIXES)]
     
     if valid_selectors:
         print(f"   Checking {len(valid_selectors)} CSS selector(s): {', '.join(valid_selectors)}")
     
     if css_path.exists():
-        css_content = css_path.read_text(encoding='utf-8')
+        # Single pass over the stylesheet
+        defined_parts = set(_CSS_RULE_PART_RE.findall(_read_text(css_path)))
         for selector in valid_selectors:
-            # Check for selector in CSS file
             # Handle compound selectors (e.g., ".modal .close" -> match ".modal" and ".close")
-            selector_parts = selector.split()
-            all_found = True
-            
-            for part in selector_parts:
-                # Each part should start with . or #
-                if part.startswith('.'):
-                    pattern = rf'\{re.escape(part)}\s*\{{'
-                elif part.startswith('#'):
-                    pattern = rf'\{re.escape(part)}\s*\{{'
-                else:
-                    # Skip invalid parts
-                    all_found = False
-                    break
-                
-                if not re.search(pattern, css_content, re.MULTILINE):
-                    all_found = False
-                    break
-            
-            if not all_found:
+            # Each part must open a rule somewhere in the file
+            if not all(part in defined_parts for part in selector.split()):
                 missing["css_selectors"].append(selector)
     else:
         # If CSS file doesn't exist but selectors are required, mark all as missing
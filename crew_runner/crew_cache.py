@@ -0,0 +1,74 @@
+"""
+Crew result cache: replay a finished crew run instead of re-running the LLM pipeline
+for an issue whose text hasn't changed.
+"""
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+
+@dataclass
+class CachedCrewResult:
+    """The parts of a CrewAI CrewOutput that apply_implementation() reads, in JSON-friendly form."""
+    raw: str
+    tasks_output: list[str] = field(default_factory=list)
+
+    def __str__(self) -> str:
+        return self.raw
+
+
+class CrewResultCache:
+    """
+    Crew results keyed by a hash of the issue (repo, title, body, sub-issues) and
+    CREW_PROMPT_VERSION, one JSON file per entry under cache_dir.
+    Bump CREW_PROMPT_VERSION after changing prompts or models to stop replaying old results.
+    """
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+        # issue number -> key of its last lookup, so put() stores under the same signature
+        self._keys: dict[int, str] = {}
+
+    @staticmethod
+    def key_for(repo_name: str, title: str, body: Optional[str], sub_issues: list = ()) -> str:
+        """sha256 of the issue signature; sub_issues are (number, title, body) tuples."""
+        signature = json.dumps({
+            "repo": repo_name,
+            "title": title,
+            "body": body or "",
+            "sub": sorted([number, sub_title, sub_body or ""] for number, sub_title, sub_body in sub_issues),
+            "version": os.getenv("CREW_PROMPT_VERSION", ""),
+        }, sort_keys=True)
+        return hashlib.sha256(signature.encode('utf-8')).hexdigest()
+
+    def get(self, issue_number: int, key: str) -> Optional[CachedCrewResult]:
+        """Cached result for key (None on a miss or unreadable entry); remembers key for put()."""
+        self._keys[issue_number] = key
+        try:
+            entry = json.loads((self.cache_dir / f"{key}.json").read_text(encoding='utf-8'))
+            return CachedCrewResult(raw=entry["raw"], tasks_output=list(entry.get("tasks_output", [])))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def put(self, issue_number: int, result) -> None:
+        """Store result (a CrewOutput or CachedCrewResult) under the key of the issue's last get()."""
+        key = self._keys.get(issue_number)
+        if key is None or not result:
+            return
+        entry = {
+            "raw": str(getattr(result, 'raw', None) or result),
+            "tasks_output": [str(task_output) for task_output in getattr(result, 'tasks_output', None) or []],
+        }
+        path = self.cache_dir / f"{key}.json"
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # Written beside the entry and renamed so a crash never leaves a half-written entry
+            tmp_path = path.with_suffix('.tmp')
+            tmp_path.write_text(json.dumps(entry), encoding='utf-8')
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️  Could not write crew result cache: {e}")
@@ -4,22 +4,119 @@ Side-effect wrappers with clear return codes.
 """
 
 import os
+import re
 import subprocess
+import threading
+import time
+import traceback
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Optional
 
+# Commands that talk to a remote get a longer default timeout
+_NETWORK_GIT_COMMANDS = frozenset({'fetch', 'pull', 'push'})
+# Commands that rewrite many files or run hooks; large checkouts or staging batches can take minutes
+_SLOW_GIT_COMMANDS = frozenset({'add', 'apply', 'checkout', 'commit', 'reset'})
+# Network commands must fail instead of waiting on a credential prompt until the timeout kills them
+_NO_PROMPT_ENV = {'GIT_TERMINAL_PROMPT': '0'}
+# Commands that can change branch, HEAD, index or working tree; they invalidate the snapshot cache
+_WRITE_GIT_COMMANDS = frozenset({'add', 'apply', 'branch', 'checkout', 'commit', 'pull', 'push', 'reset'})
+# Transport failures as git/ssh/curl report them on stderr (DNS, refused, unreachable, timed out)
+_NETWORK_ERROR_RE = re.compile(
+    r"could not resolve host|could not connect|connection (?:refused|reset|timed out)|"
+    r"timed out|timeout|network is unreachable",
+    re.IGNORECASE,
+)
+
+
+def run_git(args: list[str], work_dir: Path, *, timeout: Optional[float] = None,
+            text: bool = True, capture: bool = True) -> subprocess.CompletedProcess:
+    """
+    Run `git <args>` in work_dir with check=False and a timeout (120s for add/apply/checkout/commit/reset,
+    30s for fetch/pull/push, 10s otherwise).
+    Output is captured unless capture=False, in which case it is discarded.
+    Network commands run with terminal credential prompts disabled so missing auth fails immediately;
+    a GIT_ASKPASS/SSH_ASKPASS helper already set in the environment is left in place.
+    Raises subprocess.TimeoutExpired like subprocess.run.
+    """
+    if timeout is None:
+        if args[0] in _SLOW_GIT_COMMANDS:
+            timeout = 120
+        elif args[0] in _NETWORK_GIT_COMMANDS:
+            timeout = 30
+        else:
+            timeout = 10
+    stream = subprocess.PIPE if capture else subprocess.DEVNULL
+    env = None
+    if args[0] in _NETWORK_GIT_COMMANDS:
+        env = {**os.environ, **_NO_PROMPT_ENV}
+        # A no-op askpass, unless the user has a helper (e.g. an editor's) that can answer without a terminal
+        if 'GIT_ASKPASS' not in os.environ and 'SSH_ASKPASS' not in os.environ:
+            env['GIT_ASKPASS'] = 'true'
+    try:
+        return subprocess.run(['git', *args], cwd=work_dir, stdout=stream, stderr=stream,
+                              text=text, check=False, timeout=timeout, env=env)
+    finally:
+        if args[0] in _WRITE_GIT_COMMANDS:
+            invalidate_git_snapshot(work_dir)
+
+
+def push_args(branch_name: str) -> list[str]:
+    """
+    run_git() args that push branch_name to origin and set its upstream.
+    CREW_SKIP_HOOKS=1 adds --no-verify (skip pre-push hooks) and --atomic.
+    """
+    args = ['push', '--porcelain', '-u', 'origin', branch_name]
+    if os.getenv("CREW_SKIP_HOOKS", "0").lower() in ("1", "true", "yes"):
+        args[1:1] = ['--no-verify', '--atomic']
+    return args
+
+
+def rejected_push_refs(porcelain_output: str) -> list[tuple[str, str]]:
+    """
+    (ref, reason) for each ref `git push --porcelain` reports as rejected ('!' flag),
+    e.g. ('refs/heads/x:refs/heads/x', '[rejected] (non-fast-forward)').
+    """
+    rejected = []
+    for line in porcelain_output.splitlines():
+        parts = line.split('\t')
+        if len(parts) == 3 and parts[0] == '!':
+            rejected.append((parts[1], parts[2]))
+    return rejected
+
+
+def _read_head_branch(git_dir: Path) -> Optional[str]:
+    """
+    Branch name from .git/HEAD without spawning git; 'HEAD' when detached,
+    matching `git rev-parse --abbrev-ref HEAD`. None if HEAD can't be read.
+    """
+    try:
+        head = (git_dir / "HEAD").read_text(encoding='utf-8').strip()
+    except OSError:
+        return None
+    if head.startswith('ref: refs/heads/'):
+        return head[len('ref: refs/heads/'):]
+    return 'HEAD' if head else None
+
 
 def get_current_branch(work_dir: Path) -> Optional[str]:
     """Get current git branch name."""
-    if not (work_dir / ".git").exists():
+    git_dir = work_dir / ".git"
+    if not git_dir.exists():
         return None
     
+    # Plain checkouts: HEAD is a small file, no subprocess needed.
+    # Worktrees/submodules (.git is a file) fall through to git itself.
+    if git_dir.is_dir():
+        branch = _read_head_branch(git_dir)
+        if branch:
+            return branch
+    
     try:
-        result = subprocess.run(['git', 'rev-parse', '--abbrev-ref', 'HEAD'], 
-                              cwd=work_dir, capture_output=True, text=True, check=False, timeout=5)
+        result = run_git(['rev-parse', '--abbrev-ref', 'HEAD'], work_dir, timeout=5)
         if result.returncode == 0:
             return result.stdout.strip()
-    except Exception:
+    except (subprocess.SubprocessError, OSError):
         pass
     return None
 
@@ -30,56 +127,288 @@ def get_head_sha(work_dir: Path, short: bool = False) -> Optional[str]:
         return None
     
     try:
-        cmd = ['git', 'rev-parse', '--short', 'HEAD'] if short else ['git', 'rev-parse', 'HEAD']
-        result = subprocess.run(cmd, cwd=work_dir, capture_output=True, text=True, check=False, timeout=5)
+        args = ['rev-parse', '--short', 'HEAD'] if short else ['rev-parse', 'HEAD']
+        result = run_git(args, work_dir, timeout=5)
         if result.returncode == 0:
             return result.stdout.strip()
-    except Exception:
+    except (subprocess.SubprocessError, OSError):
         pass
     return None
 
 
-def get_git_changed_files(work_dir: Path) -> list[str]:
-    """Get list of changed files from git status. Returns empty list if no changes."""
-    if not (work_dir / ".git").exists():
-        return []
+@dataclass
+class GitSnapshot:
+    """Branch, HEAD, upstream and changed files from one `git status --porcelain=v2 --branch`."""
+    branch: Optional[str] = None      # 'HEAD' when detached, like `rev-parse --abbrev-ref HEAD`
+    head_sha: Optional[str] = None    # None before the first commit
+    upstream: Optional[str] = None    # None when no upstream is configured
+    changed_files: list[str] = field(default_factory=list)
+    
+    @property
+    def dirty(self) -> bool:
+        return bool(self.changed_files)
     
+    @property
+    def short_sha(self) -> Optional[str]:
+        return self.head_sha[:7] if self.head_sha else None
+
+
+# Space-separated fields before the path in porcelain v2 entries: ordinary, renamed/copied, unmerged
+_V2_PATH_FIELD = {'1': 8, '2': 9, 'u': 10}
+
+
+# Snapshots are reused while .git/index and .git/HEAD are untouched, for at most _SNAPSHOT_TTL
+# seconds (edits to the working tree alone do not move either file)
+_SNAPSHOT_TTL = 2.0
+_SNAPSHOT_CACHE: dict[Path, tuple[tuple[int, int], float, GitSnapshot]] = {}
+
+
+def _snapshot_key(git_dir: Path) -> Optional[tuple[int, int]]:
+    """mtime_ns of .git/index and .git/HEAD, or None when .git is not a plain directory."""
+    try:
+        head_mtime = os.stat(git_dir / "HEAD").st_mtime_ns
+    except OSError:
+        return None
     try:
-        result = subprocess.run(
-            ["git", "status", "--porcelain"],
+        index_mtime = os.stat(git_dir / "index").st_mtime_ns
+    except OSError:
+        index_mtime = 0  # no index before the first `git add`
+    return (index_mtime, head_mtime)
+
+
+# work_dir -> (done event, [snapshot]) for a `git status` currently running; concurrent
+# callers wait for it instead of spawning their own
+_SNAPSHOT_INFLIGHT: dict[Path, tuple[threading.Event, list]] = {}
+_SNAPSHOT_INFLIGHT_LOCK = threading.Lock()
+
+
+def invalidate_git_snapshot(work_dir: Path) -> None:
+    """Drop the cached snapshot for work_dir (call after writing files, committing or pushing)."""
+    work_dir = Path(work_dir).absolute()
+    _SNAPSHOT_CACHE.pop(work_dir, None)
+    # A status already running may predate the change; later callers start a fresh one
+    with _SNAPSHOT_INFLIGHT_LOCK:
+        _SNAPSHOT_INFLIGHT.pop(work_dir, None)
+
+
+def get_git_snapshot(work_dir: Path) -> Optional[GitSnapshot]:
+    """
+    Read branch, HEAD, upstream and changed files with a single git subprocess.
+    Cached per work_dir until the index or HEAD moves or the TTL expires.
+    Returns None if not a git repository or git fails.
+    """
+    work_dir = Path(work_dir).absolute()
+    key = _snapshot_key(work_dir / ".git")
+    if key is not None:
+        cached = _SNAPSHOT_CACHE.get(work_dir)
+        if cached and cached[0] == key and time.monotonic() - cached[1] < _SNAPSHOT_TTL:
+            return cached[2]
+    
+    # A readable .git/HEAD already proves this is a repository; only stat .git when it wasn't
+    if key is None and not (work_dir / ".git").exists():
+        return None
+    
+    with _SNAPSHOT_INFLIGHT_LOCK:
+        inflight = _SNAPSHOT_INFLIGHT.get(work_dir)
+        if inflight is None:
+            inflight = _SNAPSHOT_INFLIGHT[work_dir] = (threading.Event(), [])
+            leader = True
+        else:
+            leader = False
+    done, result = inflight
+    if not leader:
+        done.wait()
+        return result[0] if result else None
+    
+    snapshot = None
+    try:
+        snapshot = _read_git_snapshot(work_dir)
+        if key is not None and snapshot is not None:
+            _SNAPSHOT_CACHE[work_dir] = (key, time.monotonic(), snapshot)
+    finally:
+        result.append(snapshot)
+        with _SNAPSHOT_INFLIGHT_LOCK:
+            if _SNAPSHOT_INFLIGHT.get(work_dir) is inflight:
+                del _SNAPSHOT_INFLIGHT[work_dir]
+        done.set()
+    return snapshot
+
+
+def _iter_nul_records(stream, chunk_size: int = 1 << 16):
+    """Yield NUL-terminated records from a binary stream as chunks arrive."""
+    pending = b''
+    while chunk := stream.read1(chunk_size):
+        records = (pending + chunk).split(b'\0')
+        pending = records.pop()
+        yield from records
+    if pending:
+        yield pending
+
+
+def _read_git_snapshot(work_dir: Path) -> Optional[GitSnapshot]:
+    """Stream `git status --porcelain=v2 --branch -z` and parse it into a GitSnapshot."""
+    try:
+        proc = subprocess.Popen(
+            # --no-optional-locks: read-only, so the index (part of the cache key) is not rewritten
+            ["git", "--no-optional-locks", "status", "--porcelain=v2", "--branch", "-z"],
             cwd=work_dir,
-            capture_output=True,
-            text=True,
-            timeout=10
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
         )
-        
-        if result.returncode != 0:
-            return []
-        
-        files = []
-        for line in result.stdout.strip().split('\n'):
-            if line.strip():
-                # Format: " M file.js" or "?? newfile.js"
-                file_path = line[3:].strip()
-                if file_path:
-                    files.append(file_path)
-        
-        return files
-    except Exception:
-        return []
+    except (subprocess.SubprocessError, OSError):
+        return None
+    timer = threading.Timer(10, proc.kill)
+    timer.start()
+    
+    snapshot = GitSnapshot()
+    try:
+        # -z: NUL-terminated records, paths unquoted; a rename entry is followed by its original path.
+        # Parsing overlaps with git still writing, and the raw output is never held in full
+        records = _iter_nul_records(proc.stdout)
+        for raw in records:
+            if not raw:
+                continue
+            record = raw.decode('utf-8', 'replace')
+            kind = record[0]
+            if kind == '#':
+                key, _, value = record[2:].partition(' ')
+                if key == 'branch.oid':
+                    snapshot.head_sha = None if value == '(initial)' else value
+                elif key == 'branch.head':
+                    snapshot.branch = 'HEAD' if value == '(detached)' else value
+                elif key == 'branch.upstream':
+                    snapshot.upstream = value
+            elif kind in _V2_PATH_FIELD:
+                snapshot.changed_files.append(record.split(' ', _V2_PATH_FIELD[kind])[-1])
+                if kind == '2':
+                    next(records, None)  # original path of the rename/copy
+            elif kind in '?!':
+                snapshot.changed_files.append(record[2:])
+    finally:
+        proc.stdout.close()
+        returncode = proc.wait()
+        timer.cancel()
+    
+    return snapshot if returncode == 0 else None
+
+
+def get_git_changed_files(work_dir: Path) -> list[str]:
+    """Get list of changed files from git status. Returns empty list if no changes."""
+    snapshot = get_git_snapshot(work_dir)
+    return snapshot.changed_files if snapshot else []
 
 
 def has_changes(cwd: Path) -> bool:
-    """Check if there are uncommitted changes."""
-    if not (cwd / ".git").exists():
-        return False
+    """Check if there are uncommitted changes (the cached snapshot's dirty bit)."""
+    snapshot = get_git_snapshot(cwd)
+    return snapshot.dirty if snapshot else False
+
+
+# Base branch preference order: Git Flow's development, then main/master
+BASE_BRANCH_CANDIDATES = ('development', 'main', 'master')
+
+
+# (work_dir, branches) -> (ref mtimes key, existing branches)
+_BRANCHES_CACHE: dict[tuple[Path, tuple[str, ...]], tuple[tuple[int, ...], set[str]]] = {}
+
+
+def _refs_key(git_dir: Path, branches: tuple[str, ...]) -> Optional[tuple[int, ...]]:
+    """
+    mtime_ns of packed-refs and of every loose-ref directory a branch could be created in.
+    Creating or deleting a loose ref touches its directory; None when refs aren't plain files.
+    """
+    heads = git_dir / "refs" / "heads"
+    dirs = {heads}
+    for branch in branches:
+        parent = heads
+        for part in branch.split('/')[:-1]:
+            parent = parent / part
+            dirs.add(parent)
+    
+    key = []
+    for path in [git_dir / "packed-refs"] + sorted(dirs):
+        try:
+            key.append(os.stat(path).st_mtime_ns)
+        except FileNotFoundError:
+            if path == heads:
+                return None
+            key.append(-1)
+        except OSError:
+            return None
+    return tuple(key)
+
+
+def existing_branches(work_dir: Path, branches: tuple[str, ...]) -> set[str]:
+    """
+    Return which of the given local branches exist, using one `git for-each-ref` call.
+    Cached per work_dir until packed-refs or the loose ref directories change.
+    """
+    cache_id = (Path(work_dir).absolute(), branches)
+    key = _refs_key(Path(work_dir) / ".git", branches)
+    cached = _BRANCHES_CACHE.get(cache_id)
+    if key is not None and cached and cached[0] == key:
+        return set(cached[1])
+    
+    try:
+        result = run_git(['for-each-ref', '--format=%(refname)'] + [f'refs/heads/{b}' for b in branches], work_dir)
+    except (subprocess.SubprocessError, OSError):
+        return set()
+    if result.returncode != 0:
+        return set()
+    # Patterns also match refs nested below them (e.g. main/x), so compare full ref names
+    refs = set(result.stdout.split())
+    existing = {b for b in branches if f'refs/heads/{b}' in refs}
+    if key is not None:
+        _BRANCHES_CACHE[cache_id] = (key, existing)
+    return set(existing)
+
+
+def find_base_branch(existing: set[str]) -> Optional[str]:
+    """First of BASE_BRANCH_CANDIDATES present in existing, or None."""
+    return next((b for b in BASE_BRANCH_CANDIDATES if b in existing), None)
+
+
+# (work_dir, branch) -> time.monotonic() of its last successful `git pull --ff-only`
+_LAST_PULL: dict[tuple[Path, str], float] = {}
+
+
+def pull_base_branch(work_dir: Path, base_branch: str) -> bool:
+    """
+    Fast-forward the checked-out base branch from its remote.
+    Skipped (returns True) if it was pulled within BASE_PULL_TTL_SEC seconds (default 120),
+    so back-to-back issues don't each pay a network round trip.
+    """
+    key = (Path(work_dir).absolute(), base_branch)
+    last_pull = _LAST_PULL.get(key)
+    if last_pull is not None and time.monotonic() - last_pull < float(os.getenv("BASE_PULL_TTL_SEC", "120")):
+        return True
     
     try:
-        r = subprocess.run(["git", "status", "--porcelain"], 
-                          cwd=cwd, text=True, capture_output=True, check=True)
-        return bool(r.stdout.strip())
-    except Exception:
+        result = run_git(['pull', '--ff-only'], work_dir, capture=False)
+    except (subprocess.SubprocessError, OSError):
         return False
+    if result.returncode != 0:
+        return False
+    _LAST_PULL[key] = time.monotonic()
+    return True
+
+
+# Generated patch files that must never be committed
+_PATCH_ARTIFACT_SUFFIXES = ('crewai_patch.diff', '_patch.diff')
+
+# Paths per `git add` invocation, well under the argv limit
+_GIT_ADD_BATCH = 500
+
+
+def stage_files(work_dir: Path, file_paths: list[str]) -> None:
+    """Stage file_paths with one `git add --` per batch instead of one process per file."""
+    for start in range(0, len(file_paths), _GIT_ADD_BATCH):
+        batch = file_paths[start:start + _GIT_ADD_BATCH]
+        result = run_git(['add', '--'] + batch, work_dir, capture=False)
+        if result.returncode != 0:
+            # One bad pathspec fails the whole batch; retry per file so the rest still get staged
+            for file_path in batch:
+                run_git(['add', '--', file_path], work_dir, capture=False)
 
 
 def ensure_feature_branch(repo_root: Path, issue_number: Optional[int] = None) -> str:
@@ -161,28 +490,20 @@ def ensure_feature_branch(repo_root: Path, issue_number: Optional[int] = None) -
     
     try:
         # Check if feature branch already exists
-        result = subprocess.run(
-            ['git', 'show-ref', '--verify', '--quiet', f'refs/heads/{feature_branch}'],
-            cwd=repo_root, capture_output=True, check=False, timeout=5
-        )
+        result = run_git(['show-ref', '--verify', '--quiet', f'refs/heads/{feature_branch}'], repo_root,
+                         timeout=5, capture=False)
         
         if result.returncode == 0:
             # Branch exists - checkout it
             print(f"   Branch '{feature_branch}' already exists, checking out...")
-            result = subprocess.run(
-                ['git', 'checkout', feature_branch],
-                cwd=repo_root, capture_output=True, text=True, check=False, timeout=10
-            )
+            result = run_git(['checkout', feature_branch], repo_root)
             if result.returncode != 0:
                 print(f"❌ Failed to checkout existing branch: {result.stderr}")
                 raise ValueError(f"Failed to checkout feature branch '{feature_branch}': {result.stderr}")
         else:
             # Branch doesn't exist - create it
             print(f"   Creating new branch '{feature_branch}' from '{current_branch}'...")
-            result = subprocess.run(
-                ['git', 'checkout', '-b', feature_branch],
-                cwd=repo_root, capture_output=True, text=True, check=False, timeout=10
-            )
+            result = run_git(['checkout', '-b', feature_branch], repo_root)
             if result.returncode != 0:
                 print(f"❌ Failed to create branch: {result.stderr}")
                 raise ValueError(f"Failed to create feature branch '{feature_branch}': {result.stderr}")
@@ -215,18 +536,8 @@ def ensure_base_branch(work_dir: Path):
             return
         
         # Determine base branch (prefer development, fallback to main/master)
-        base_branch = None
-        result = subprocess.run(['git', 'show-ref', '--verify', '--quiet', f'refs/heads/development'],
-                              cwd=work_dir, capture_output=True, check=False)
-        if result.returncode == 0:
-            base_branch = 'development'
-        else:
-            for branch in ['main', 'master']:
-                result = subprocess.run(['git', 'show-ref', '--verify', '--quiet', f'refs/heads/{branch}'],
-                                      cwd=work_dir, capture_output=True, check=False)
-                if result.returncode == 0:
-                    base_branch = branch
-                    break
+        existing = existing_branches(work_dir, BASE_BRANCH_CANDIDATES)
+        base_branch = find_base_branch(existing)
         
         if not base_branch:
             print(f"⚠ No development/main/master branch found, staying on {current_branch}")
@@ -234,18 +545,14 @@ def ensure_base_branch(work_dir: Path):
         
         # Switch to base branch if not already on it
         if current_branch != base_branch:
-            result = subprocess.run(['git', 'status', '--porcelain'], 
-                                  cwd=work_dir, capture_output=True, text=True, check=False)
-            if result.stdout.strip():
+            if has_changes(work_dir):
                 print(f"⚠ Uncommitted changes detected on {current_branch}")
                 print(f"   Switching to {base_branch} will carry these changes over")
             
             print(f"🔄 Switching to base branch: {base_branch}")
-            result = subprocess.run(['git', 'checkout', base_branch], 
-                                  cwd=work_dir, capture_output=True, text=True, check=False)
+            result = run_git(['checkout', base_branch], work_dir, capture=False)
             if result.returncode == 0:
-                subprocess.run(['git', 'pull', '--ff-only'], 
-                             cwd=work_dir, capture_output=True, check=False)
+                pull_base_branch(work_dir, base_branch)
                 print(f"✓ On base branch: {base_branch}")
     except Exception as e:
         print(f"⚠ Error ensuring base branch: {e}")
@@ -257,9 +564,6 @@ def create_branch_and_commit(issue_number: int, work_dir: Path, repo_name: str =
     Create a git branch, commit changes, and optionally push.
     Returns dict with: did_commit, did_push, branch_name, commit_hash (if successful)
     """
-    original_dir = os.getcwd()
-    os.chdir(work_dir)
-    
     try:
         # Check if git repo exists
         if not (Path(work_dir) / ".git").exists():
@@ -269,72 +573,47 @@ def create_branch_and_commit(issue_number: int, work_dir: Path, repo_name: str =
         # Get current branch
         current_branch = get_current_branch(work_dir)
         
-        # Determine base branch
-        base_branch = None
-        result = subprocess.run(['git', 'show-ref', '--verify', '--quiet', f'refs/heads/development'],
-                              cwd=work_dir, capture_output=True, check=False)
-        if result.returncode == 0:
-            base_branch = 'development'
-        else:
-            for branch in ['main', 'master']:
-                result = subprocess.run(['git', 'show-ref', '--verify', '--quiet', f'refs/heads/{branch}'],
-                                      cwd=work_dir, capture_output=True, check=False)
-                if result.returncode == 0:
-                    base_branch = branch
-                    break
+        # Determine base branch (prefer development, fallback to main/master)
+        existing = existing_branches(work_dir, BASE_BRANCH_CANDIDATES + (f"feature/issue-{issue_number}",))
+        base_branch = find_base_branch(existing)
         
         if not base_branch:
             base_branch = current_branch or 'main'
         
         # Switch to base branch if not already on it
         if current_branch != base_branch:
-            subprocess.run(['git', 'checkout', base_branch], cwd=work_dir, check=False, capture_output=True)
-            subprocess.run(['git', 'pull', '--ff-only'], cwd=work_dir, check=False, capture_output=True)
+            run_git(['checkout', base_branch], work_dir, capture=False)
+            pull_base_branch(work_dir, base_branch)
         
         # Create branch
         branch_name = f"feature/issue-{issue_number}"
         
         if current_branch != branch_name:
-            result = subprocess.run(['git', 'show-ref', '--verify', '--quiet', f'refs/heads/{branch_name}'],
-                                  cwd=work_dir, capture_output=True, check=False)
-            if result.returncode == 0:
-                result = subprocess.run(['git', 'checkout', branch_name], 
-                                      cwd=work_dir, capture_output=True, text=True, check=False)
+            if branch_name in existing:
+                result = run_git(['checkout', branch_name], work_dir, capture=False)
                 if result.returncode != 0:
-                    subprocess.run(['git', 'branch', '-D', branch_name], cwd=work_dir, check=False, capture_output=True)
-                    result = subprocess.run(['git', 'checkout', '-b', branch_name], 
-                                          cwd=work_dir, capture_output=True, text=True, check=False)
+                    run_git(['branch', '-D', branch_name], work_dir, capture=False)
+                    result = run_git(['checkout', '-b', branch_name], work_dir, capture=False)
                     if result.returncode != 0:
                         return {"did_commit": False, "did_push": False, "branch_name": None, "commit_hash": None}
             else:
-                result = subprocess.run(['git', 'checkout', '-b', branch_name], 
-                                      cwd=work_dir, capture_output=True, text=True, check=False)
+                result = run_git(['checkout', '-b', branch_name], work_dir, capture=False)
                 if result.returncode != 0:
                     return {"did_commit": False, "did_push": False, "branch_name": None, "commit_hash": None}
         
         # Check for changes to commit
-        result = subprocess.run(['git', 'status', '--porcelain'], 
-                              cwd=work_dir, capture_output=True, text=True, check=True)
-        
-        status_lines = result.stdout.strip().split('\n') if result.stdout.strip() else []
-        files_to_commit = []
-        for line in status_lines:
-            if line.strip():
-                file_path = line[3:].strip()
-                if not file_path.endswith('crewai_patch.diff') and not file_path.endswith('_patch.diff'):
-                    files_to_commit.append(file_path)
+        files_to_commit = [f for f in get_git_changed_files(Path(work_dir))
+                           if not f.endswith(_PATCH_ARTIFACT_SUFFIXES)]
         
         if not files_to_commit:
             print("⚠ No source files to commit (only patch artifacts/plans or no changes)")
             return {"did_commit": False, "did_push": False, "branch_name": branch_name, "commit_hash": None}
         
         # Add files
-        for file_path in files_to_commit:
-            subprocess.run(['git', 'add', file_path], cwd=work_dir, check=False, capture_output=True)
+        stage_files(work_dir, files_to_commit)
         
         # Verify staged
-        result = subprocess.run(['git', 'diff', '--cached', '--name-only'], 
-                              cwd=work_dir, capture_output=True, text=True, check=True)
+        result = run_git(['diff', '--cached', '--name-only'], work_dir)
         if not result.stdout.strip():
             print("⚠ No files staged for commit")
             return {"did_commit": False, "did_push": False, "branch_name": branch_name, "commit_hash": None}
@@ -344,8 +623,8 @@ def create_branch_and_commit(issue_number: int, work_dir: Path, repo_name: str =
         if issue_title:
             commit_msg = f"feat: implement solution for issue #{issue_number}: {issue_title}\n\nCloses #{issue_number}"
         
-        result = subprocess.run(['git', 'commit', '-m', commit_msg], 
-                              cwd=work_dir, capture_output=True, text=True, check=False)
+        # Generous timeout: commit hooks may run linters or tests
+        result = run_git(['commit', '-m', commit_msg], work_dir, timeout=120)
         commit_result_dict = {
             "did_commit": False,
             "did_push": False,
@@ -366,21 +645,18 @@ def create_branch_and_commit(issue_number: int, work_dir: Path, repo_name: str =
         # Push if requested
         if push:
             try:
-                import socket
-                try:
-                    socket.create_connection(("github.com", 443), timeout=5)
-                except (socket.timeout, OSError):
-                    print(f"⚠ Network connectivity issue: Cannot reach github.com")
-                    return commit_result_dict
-                
-                push_result = subprocess.run(['git', 'push', '-u', 'origin', branch_name], 
-                                      cwd=work_dir, capture_output=True, text=True, check=False, timeout=60)
+                # No separate connectivity probe: a failed push's stderr says whether the remote was unreachable
+                push_result = run_git(push_args(branch_name), work_dir, timeout=60)
                 if push_result.returncode == 0:
                     commit_result_dict["did_push"] = True
                     print(f"✓ Pushed branch to origin")
                 else:
                     error_msg = push_result.stderr or push_result.stdout or "Unknown error"
-                    if "timeout" in error_msg.lower() or "could not connect" in error_msg.lower():
+                    rejected = rejected_push_refs(push_result.stdout or "")
+                    if rejected:
+                        for ref, reason in rejected:
+                            print(f"⚠ Push rejected for {ref}: {reason}")
+                    elif _NETWORK_ERROR_RE.search(error_msg):
                         print(f"⚠ Network connectivity issue: Cannot reach GitHub")
                     else:
                         print(f"⚠ Failed to push branch: {error_msg[:200]}")
@@ -392,8 +668,9 @@ def create_branch_and_commit(issue_number: int, work_dir: Path, repo_name: str =
         return commit_result_dict
     except Exception as e:
         print(f"⚠ Error in git operations: {e}")
-        import traceback
-        traceback.print_exc()
+        if os.getenv("CREW_DEBUG", "false").lower() == "true":
+            traceback.print_exc()
         return {"did_commit": False, "did_push": False, "branch_name": None, "commit_hash": None}
     finally:
-        os.chdir(original_dir)
+        # The commit moves the branch ref and the push sets the upstream; neither touches .git/HEAD
+        invalidate_git_snapshot(work_dir)
@@ -6,37 +6,122 @@ Must be called only after RunState.coverage_ok is true.
 import os
 import json
 import re
+import time
 import requests
+from requests.adapters import HTTPAdapter
+from typing import Optional
 from github import Github
 from github.Auth import Token
 
 
+# Shared session for direct REST/GraphQL calls: keep-alive connections are reused across
+# requests instead of paying a TCP + TLS handshake on every call
+_HTTP = requests.Session()
+_HTTP.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=20))
+
+
+# One PyGithub client per token, so its HTTP session (and open connections) is reused
+_GITHUB_CLIENTS: dict[str, Github] = {}
+
+
+GRAPHQL_URL = "https://api.github.com/graphql"
+# query text -> its JSON-encoded '{"query": ..., "variables": ' prefix, so each fixed query is encoded once
+_ENCODED_QUERIES: dict[str, bytes] = {}
+
+
+def post_graphql(query: str, variables: dict, headers: dict, timeout: float = 30):
+    """POST a GraphQL request on the shared session; only the variables are JSON-encoded per call"""
+    prefix = _ENCODED_QUERIES.get(query)
+    if prefix is None:
+        prefix = _ENCODED_QUERIES[query] = json.dumps({"query": query})[:-1].encode() + b', "variables": '
+    body = prefix + json.dumps(variables).encode() + b"}"
+    return _HTTP.post(GRAPHQL_URL, headers={**headers, "Content-Type": "application/json"}, data=body, timeout=timeout)
+
+
 def get_github_client(token: str = None):
     """Get authenticated GitHub client"""
     if not token:
         token = os.getenv("GITHUB_TOKEN")
     if not token:
         return None
-    auth = Token(token)
-    return Github(auth=auth)
+    client = _GITHUB_CLIENTS.get(token)
+    if client is None:
+        client = _GITHUB_CLIENTS[token] = Github(auth=Token(token))
+    return client
+
+
+# repo_name -> lazily-loaded Repository; handles make no request until a call needs one
+_REPOS: dict[str, object] = {}
+
+
+def get_repo(repo_name: str, token: str = None):
+    """Repository handle for repo_name, created once per repo (None without credentials)"""
+    g = get_github_client(token)
+    if not g:
+        return None
+    repo = _REPOS.get(repo_name)
+    if repo is None:
+        repo = _REPOS[repo_name] = g.get_repo(repo_name, lazy=True)
+    return repo
+
+
+def _verify_repo_and_issue_gql(repo_name: str, issue_number: int, token: str = None):
+    """
+    Look up a repository, one of its issues and its 5 newest open issues in one GraphQL request.
+    
+    Returns:
+        (repo_meta, issue_meta, recent): repo_meta/issue_meta are None when not found or not
+        accessible; recent is a list of {number, title} dicts.
+        Raises requests.exceptions.RequestException on network errors.
+    """
+    owner, name = repo_name.split('/', 1)
+    query = """
+    query($owner: String!, $repo: String!, $number: Int!) {
+      repository(owner: $owner, name: $repo) {
+        id
+        nameWithOwner
+        issue(number: $number) {
+          id
+          number
+          title
+        }
+        issues(first: 5, states: OPEN, orderBy: {field: CREATED_AT, direction: DESC}) {
+          nodes {
+            number
+            title
+          }
+        }
+      }
+    }
+    """
+    headers = {
+        "Authorization": f"Bearer {token or os.getenv('GITHUB_TOKEN')}",
+        "Content-Type": "application/json",
+    }
+    response = post_graphql(query, {"owner": owner, "repo": name, "number": issue_number}, headers)
+    response.raise_for_status()
+    # NOT_FOUND comes back as an error alongside a null repository/issue, so read data regardless
+    repository = (response.json().get('data') or {}).get('repository')
+    if not repository:
+        return None, None, []
+    recent = (repository.get('issues') or {}).get('nodes', [])
+    return {"id": repository.get('id'), "name": repository.get('nameWithOwner')}, repository.get('issue'), recent
 
 
 def get_sub_issues(repo_name: str, issue_number: int):
     """Get sub-issues (child issues) for a given parent issue"""
-    g = get_github_client()
-    if not g:
+    repo = get_repo(repo_name)
+    if not repo:
         return []
     
     try:
-        repo = g.get_repo(repo_name)
         
         # Method 1: Try GitHub Sub-Issues API (if available)
         try:
-            import requests
             token = os.getenv("GITHUB_TOKEN")
             headers = {"Authorization": f"token {token}", "Accept": "application/vnd.github+json"}
             url = f"https://api.github.com/repos/{repo_name}/issues/{issue_number}/sub-issues"
-            response = requests.get(url, headers=headers, timeout=10)
+            response = _HTTP.get(url, headers=headers, timeout=10)
             
             if response.status_code == 200:
                 sub_issues_data = response.json()
@@ -84,8 +169,8 @@ def get_sub_issues(repo_name: str, issue_number: int):
 
 def get_next_issue(repo_name: str, processed_issues_file):
     """Get the next unprocessed issue"""
-    g = get_github_client()
-    if not g:
+    repo = get_repo(repo_name)
+    if not repo:
         return None
     
     # Load processed issues
@@ -95,7 +180,6 @@ def get_next_issue(repo_name: str, processed_issues_file):
             processed = set(json.load(f))
     
     # Get open issues
-    repo = g.get_repo(repo_name)
     issues = repo.get_issues(state='open', sort='updated')
     
     # Find first unprocessed issue
@@ -108,40 +192,68 @@ def get_next_issue(repo_name: str, processed_issues_file):
 
 def mark_issue_processed(issue_number: int, processed_issues_file):
     """Mark an issue as processed"""
+    mark_issues_processed([issue_number], processed_issues_file)
+
+
+def mark_issues_processed(issue_numbers: list[int], processed_issues_file):
+    """Mark several issues as processed with one read and one write of the processed file"""
     processed = set()
     if processed_issues_file.exists():
         with open(processed_issues_file, 'r') as f:
             processed = set(json.load(f))
     
-    processed.add(issue_number)
+    processed.update(issue_numbers)
     
     with open(processed_issues_file, 'w') as f:
         json.dump(list(processed), f)
 
 
-def create_pr(repo_name: str, branch_name: str, issue_number: int, issue_title: str = None):
-    """Create a pull request on GitHub"""
+# repo_name -> branch new PRs target; only successful lookups are remembered
+_PR_BASE_BRANCHES: dict[str, str] = {}
+
+
+def resolve_pr_base_branch(repo_name: str) -> str:
+    """Return the branch PRs should target: development, main or master, whichever exists first ('main' if none)"""
+    base_branch = _PR_BASE_BRANCHES.get(repo_name)
+    if base_branch:
+        return base_branch
+    
+    candidates = ["development", "main", "master"]
+    # All three refs in one GraphQL request instead of a get_branch() call per candidate
+    owner, name = repo_name.split('/', 1)
+    refs = "\n".join(f'{b}: ref(qualifiedName: "refs/heads/{b}") {{ name }}' for b in candidates)
+    query = f"query($owner: String!, $repo: String!) {{ repository(owner: $owner, name: $repo) {{ {refs} }} }}"
+    headers = {
+        "Authorization": f"Bearer {os.getenv('GITHUB_TOKEN')}",
+        "Content-Type": "application/json",
+    }
     try:
-        g = get_github_client()
-        if not g:
+        response = post_graphql(query, {"owner": owner, "repo": name}, headers)
+        if response.status_code == 200:
+            repository = (response.json().get('data') or {}).get('repository') or {}
+            base_branch = next((b for b in candidates if repository.get(b)), None)
+    except (requests.exceptions.Timeout, requests.exceptions.ConnectionError):
+        pass
+    
+    if not base_branch:
+        return "main"
+    _PR_BASE_BRANCHES[repo_name] = base_branch
+    return base_branch
+
+
+def create_pr(repo_name: str, branch_name: str, issue_number: int, issue_title: str = None,
+              base_branch: str = None):
+    """Create a pull request on GitHub (base_branch is looked up when not given)"""
+    try:
+        repo = get_repo(repo_name)
+        if not repo:
             print("⚠ Cannot create PR: GitHub client not available")
             return None
         
-        repo = g.get_repo(repo_name)
         org_name = repo_name.split('/')[0]
         
-        # Determine base branch
-        base_branch = None
-        for branch in ["development", "main", "master"]:
-            try:
-                repo.get_branch(branch)
-                base_branch = branch
-                break
-            except:
-                continue
-        
         if not base_branch:
-            base_branch = "main"
+            base_branch = resolve_pr_base_branch(repo_name)
         
         # PR title and body
         pr_title = f"[CrewAI] Implement issue #{issue_number}"
@@ -197,33 +309,116 @@ Please review the changes carefully.
         return None
 
 
+# Field names that identify a project's pipeline/status column
+STATUS_FIELD_NAMES = ['status', 'state', 'stage', 'progress', 'column']
+
+# Projects V2 layout per (repo_name, project_name): ID, title, fields and the status field's
+# option IDs, reused for _PROJECT_META_TTL seconds so moves skip the discovery query
+_PROJECT_META_TTL = 300.0
+_PROJECT_META_CACHE: dict[tuple[str, Optional[str]], tuple[dict, float]] = {}
+# (project_id, issue_number) -> project item ID; an item keeps its ID while it stays in the project
+_PROJECT_ITEM_CACHE: dict[tuple[str, int], str] = {}
+
+
+def get_cached_project_v2(repo_name: str, project_name: Optional[str]) -> Optional[dict]:
+    """Return the cached Projects V2 layout for (repo_name, project_name), or None if missing or expired"""
+    cached = _PROJECT_META_CACHE.get((repo_name, project_name))
+    if cached and time.monotonic() - cached[1] < _PROJECT_META_TTL:
+        return cached[0]
+    return None
+
+
+def index_status_field(fields: list) -> dict:
+    """
+    Find a project's status field and index its options once.
+    
+    Returns:
+        dict with status_field_id, status_field_name, options ({name_lower: option_id})
+        and option_names (original spelling); None/empty when there is no status field
+    """
+    status_field = next(
+        (f for f in fields if any(name in f.get('name', '').lower() for name in STATUS_FIELD_NAMES)), {}
+    )
+    options = status_field.get('options', [])
+    return {
+        'status_field_id': status_field.get('id'),
+        'status_field_name': status_field.get('name'),
+        'options': {opt.get('name', '').lower(): opt.get('id') for opt in options},
+        'option_names': [opt.get('name', '') for opt in options],
+    }
+
+
+def resolve_status_option(status: dict, target_value: str) -> Optional[str]:
+    """Option ID for target_value: case-insensitive exact match, else the first partial match"""
+    target = target_value.lower()
+    option_id = status['options'].get(target)
+    if option_id:
+        return option_id
+    for name in status['option_names']:
+        if target in name.lower() or name.lower() in target:
+            print(f"   Using partial match: '{name}' for '{target_value}'")
+            return status['options'][name.lower()]
+    return None
+
+
+def cache_project_v2(repo_name: str, project_name: Optional[str], project_v2: dict) -> dict:
+    """Index a projectsV2 node's status field and cache it; returns the cached layout"""
+    fields = project_v2.get('fields', {}).get('nodes', [])
+    meta = {
+        'id': project_v2.get('id'),
+        'title': project_v2.get('title'),
+        'fields': fields,
+        **index_status_field(fields),
+    }
+    _PROJECT_META_CACHE[(repo_name, project_name)] = (meta, time.monotonic())
+    return meta
+
+
 def move_issue_in_project(repo_name: str, issue_number: int, target_column_name: str, project_name: str = None):
-    """Move an issue to a specific column in GitHub project (supports both Classic and V2 Projects)"""
+    """Move an issue to a specific column (status option) in a GitHub Projects V2 board"""
     try:
-        g = get_github_client()
-        if not g:
+        if not get_github_client():
             print("⚠ Cannot move issue: GitHub client not available")
             return False
         
-        repo = g.get_repo(repo_name)
-        issue = repo.get_issue(issue_number)
-        
         org_name = repo_name.split('/')[0]
         repo_name_only = repo_name.split('/')[1]
         token = os.getenv("GITHUB_TOKEN")
         
-        # Try Projects V2 (GraphQL) first
+        # Projects V2 (GraphQL)
         print(f"🔍 Looking for project: {project_name or 'default'}...")
         
-        graphql_url = "https://api.github.com/graphql"
         headers = {
             "Authorization": f"Bearer {token}",
             "Content-Type": "application/json",
         }
         
-        query = """
-        query($owner: String!, $repo: String!) {
-          repository(owner: $owner, name: $repo) {
+        # Project layout is cached per (repo, project); the issue's own projectItems give its
+        # item ID, and once that is cached too the move is a single mutation
+        meta = get_cached_project_v2(repo_name, project_name)
+        project_item_id = _PROJECT_ITEM_CACHE.get((meta['id'], issue_number)) if meta else None
+        issue_node = {}
+        # True once projectItems listed every project the issue is in
+        item_ids_complete = False
+        
+        if not project_item_id:
+            issue_selection = """
+            issue(number: $number) {
+              id
+              projectItems(first: 20) {
+                pageInfo {
+                  hasNextPage
+                }
+                nodes {
+                  id
+                  project {
+                    id
+                  }
+                }
+              }
+            }
+            """
+            projects_selection = """
             projectsV2(first: 10) {
               nodes {
                 id
@@ -243,241 +438,151 @@ def move_issue_in_project(repo_name: str, issue_number: int, target_column_name:
                 }
               }
             }
-          }
-        }
-        """
-        
-        variables = {"owner": org_name, "repo": repo_name_only}
-        
-        try:
-            response = requests.post(graphql_url, headers=headers, json={"query": query, "variables": variables}, timeout=30)
-        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
-            print(f"⚠ Network error when querying GitHub Projects API: {e}")
-            return False
-        
-        if response.status_code == 200:
-            data = response.json()
-            if 'errors' not in data:
-                projects_v2 = data.get('data', {}).get('repository', {}).get('projectsV2', {}).get('nodes', [])
-                if projects_v2:
-                    project_v2 = None
-                    if project_name:
-                        for p in projects_v2:
-                            if p.get('title') == project_name:
-                                project_v2 = p
-                                break
-                    else:
-                        project_v2 = projects_v2[0]
-                    
-                    if project_v2:
-                        print(f"📋 Using Projects V2: {project_v2.get('title')} (ID: {project_v2.get('id')})")
-                        return move_issue_in_project_v2(
-                            project_v2.get('id'),
-                            issue.id,
-                            issue_number,
-                            target_column_name,
-                            project_v2.get('fields', {}).get('nodes', []),
-                            token
-                        )
-        
-        # Fallback to classic projects (REST API)
-        print("   Trying classic projects (REST API)...")
-        project = None
-        projects = []
-        
-        try:
-            projects = list(repo.get_projects())
-            print(f"📋 Found {len(projects)} repository-level classic project(s)")
-        except:
-            projects = []
-        
-        if not projects:
-            try:
-                user = g.get_user(org_name)
-                projects = list(user.get_projects())
-                print(f"📋 Found {len(projects)} user-level classic project(s)")
-            except:
-                projects = []
-        
-        if not projects:
-            print("⚠ No projects found")
-            return False
-        
-        if project_name:
-            for p in projects:
-                if p.name == project_name:
-                    project = p
-                    break
-        else:
-            project = projects[0]
-        
-        if not project:
-            print(f"⚠ Project '{project_name or 'default'}' not found")
-            return False
-        
-        print(f"📋 Using classic project: {project.name} (ID: {project.id})")
-        
-        columns = list(project.get_columns())
-        print(f"📋 Found {len(columns)} columns: {[c.name for c in columns]}")
-        
-        target_column = None
-        issue_card = None
-        source_column = None
-        
-        for column in columns:
-            if column.name == target_column_name:
-                target_column = column
-                break
-        
-        for column in columns:
-            if issue_card:
-                break
-            try:
-                cards = list(column.get_cards())
-                for card in cards:
-                    try:
-                        content = card.get_content()
-                        if hasattr(content, 'number') and content.number == issue_number:
-                            issue_card = card
-                            source_column = column
-                            print(f"   ✓ Found issue #{issue_number} in column '{column.name}'")
-                            break
-                    except:
-                        continue
-            except Exception as e:
-                continue
-        
-        if not target_column:
-            print(f"⚠ Target column '{target_column_name}' not found")
-            return False
-        
-        if not issue_card:
-            print(f"⚠ Issue #{issue_number} not found in project. Adding to '{target_column_name}'...")
+            """
+            query = """
+            query($owner: String!, $repo: String!, $number: Int!) {
+              repository(owner: $owner, name: $repo) {%s}
+            }
+            """ % (issue_selection + ("" if meta else projects_selection))
+            
+            variables = {"owner": org_name, "repo": repo_name_only, "number": issue_number}
+            
             try:
-                url = f"https://api.github.com/projects/columns/{target_column.id}/cards"
-                headers = {
-                    "Authorization": f"Bearer {token}",
-                    "Accept": "application/vnd.github+json",
-                    "X-GitHub-Api-Version": "2022-11-28"
-                }
-                data = {"content_id": issue.id, "content_type": "Issue"}
-                response = requests.post(url, headers=headers, json=data)
-                if response.status_code in [201, 200]:
-                    print(f"✓ Added issue #{issue_number} to '{target_column_name}'")
-                    return True
-            except Exception as e:
-                print(f"⚠ Failed to add issue to project: {e}")
+                response = post_graphql(query, variables, headers)
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+                print(f"⚠ Network error when querying GitHub Projects API: {e}")
                 return False
-        
-        if source_column and source_column.id == target_column.id:
-            print(f"✓ Issue #{issue_number} already in '{target_column_name}'")
-            return True
-        
-        url = f"https://api.github.com/projects/columns/cards/{issue_card.id}/moves"
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Accept": "application/vnd.github+json",
-            "X-GitHub-Api-Version": "2022-11-28"
-        }
-        data = {"position": "top", "column_id": target_column.id}
-        
-        print(f"🔄 Moving issue #{issue_number} from '{source_column.name if source_column else 'unknown'}' to '{target_column_name}'...")
-        response = requests.post(url, headers=headers, json=data)
-        
-        if response.status_code in [201, 200]:
-            print(f"✓ Moved issue #{issue_number} to '{target_column_name}'")
-            return True
-        else:
-            print(f"⚠ Failed to move card: {response.status_code}")
-            return False
+            
+            if response.status_code == 200:
+                data = response.json()
+                if 'errors' not in data:
+                    repository = data.get('data', {}).get('repository', {})
+                    issue_node = repository.get('issue') or {}
+                    item_ids = {
+                        item['project']['id']: item['id']
+                        for item in issue_node.get('projectItems', {}).get('nodes', [])
+                        if item.get('project')
+                    }
+                    item_page_info = (issue_node.get('projectItems') or {}).get('pageInfo') or {}
+                    item_ids_complete = bool(issue_node) and item_page_info.get('hasNextPage') is False
+                    projects_v2 = repository.get('projectsV2', {}).get('nodes', [])
+                    if not meta and projects_v2:
+                        project_v2 = None
+                        if project_name:
+                            for p in projects_v2:
+                                if p.get('title') == project_name:
+                                    project_v2 = p
+                                    break
+                        else:
+                            project_v2 = projects_v2[0]
+                        if project_v2:
+                            meta = cache_project_v2(repo_name, project_name, project_v2)
+                    if meta:
+                        project_item_id = item_ids.get(meta['id'])
+        
+        if meta:
+            print(f"📋 Using Projects V2: {meta['title']} (ID: {meta['id']})")
+            return move_issue_in_project_v2(
+                meta['id'],
+                issue_node.get('id'),
+                issue_number,
+                target_column_name,
+                meta['fields'],
+                token,
+                project_item_id=project_item_id,
+                status_field_id=meta['status_field_id'],
+                option_id=resolve_status_option(meta, target_column_name),
+                # Not among the issue's projectItems means not in the project: add it, don't scan
+                scan_items=not item_ids_complete
+            )
+        
+        # Classic projects (REST columns/cards) have been sunset by GitHub, so there is no fallback
+        print(f"⚠ Project '{project_name or 'default'}' not found among {repo_name}'s Projects V2 boards")
+        return False
             
     except Exception as e:
         print(f"⚠ Error moving issue in project: {e}")
         return False
 
 
-def move_issue_in_project_v2(project_id: str, issue_id: int, issue_number: int, 
-                             target_field_value: str, fields: list, token: str):
-    """Move an issue in a Projects V2 using GraphQL"""
+def move_issue_in_project_v2(project_id: str, issue_id: str, issue_number: int, 
+                             target_field_value: str, fields: list, token: str,
+                             project_item_id: str = None, status_field_id: str = None, option_id: str = None,
+                             scan_items: bool = True):
+    """
+    Move an issue in a Projects V2 using GraphQL.
+    Without project_item_id, the project's items are paged through to find the issue
+    unless scan_items is False (the caller knows it isn't in the project yet).
+    """
     try:
-        graphql_url = "https://api.github.com/graphql"
         headers = {
             "Authorization": f"Bearer {token}",
             "Content-Type": "application/json",
         }
         
-        status_field = None
-        target_option_id = None
-        status_field_names = ['status', 'state', 'stage', 'progress', 'column']
-        
-        for field in fields:
-            field_name_lower = field.get('name', '').lower()
-            if any(name in field_name_lower for name in status_field_names):
-                status_field = field
-                options = field.get('options', [])
-                for opt in options:
-                    if opt.get('name', '').lower() == target_field_value.lower():
-                        target_option_id = opt.get('id')
-                        break
-                if not target_option_id:
-                    for opt in options:
-                        opt_name = opt.get('name', '').lower()
-                        if target_field_value.lower() in opt_name or opt_name in target_field_value.lower():
-                            target_option_id = opt.get('id')
-                            break
-                break
+        # Callers with a cached project layout pass the resolved field/option IDs
+        if not (status_field_id and option_id):
+            status = index_status_field(fields)
+            status_field_id = status['status_field_id']
+            option_id = resolve_status_option(status, target_field_value) if status_field_id else None
         
-        if not status_field or not target_option_id:
+        if not status_field_id or not option_id:
             print(f"⚠ Status field or target option not found")
             return False
         
-        # Get project item
-        query_item = """
-        query($projectId: ID!) {
-          node(id: $projectId) {
-            ... on ProjectV2 {
-              items(first: 100) {
-                nodes {
-                  id
-                  content {
-                    ... on Issue {
+        if not project_item_id and scan_items:
+            # Get project item (unless the caller already resolved it), one page at a time
+            query_item = """
+            query($projectId: ID!, $cursor: String) {
+              node(id: $projectId) {
+                ... on ProjectV2 {
+                  items(first: 50, after: $cursor) {
+                    pageInfo { hasNextPage endCursor }
+                    nodes {
                       id
-                      number
+                      content {
+                        ... on Issue {
+                          id
+                          number
+                        }
+                      }
                     }
                   }
                 }
               }
             }
-          }
-        }
-        """
-        
-        try:
-            response = requests.post(graphql_url, headers=headers, 
-                                   json={"query": query_item, "variables": {"projectId": project_id}}, timeout=30)
-        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
-            print(f"⚠ Network error: {e}")
-            return False
-        
-        if response.status_code != 200:
-            return False
-        
-        data = response.json()
-        if 'errors' in data:
-            return False
-        
-        items = data.get('data', {}).get('node', {}).get('items', {}).get('nodes', [])
-        project_item_id = None
-        
-        for item in items:
-            if item.get('content', {}).get('number') == issue_number:
-                project_item_id = item.get('id')
-                break
+            """
+            
+            cursor = None
+            while True:
+                try:
+                    response = post_graphql(query_item, {"projectId": project_id, "cursor": cursor}, headers)
+                except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+                    print(f"⚠ Network error: {e}")
+                    return False
+                
+                if response.status_code != 200:
+                    return False
+                
+                data = response.json()
+                if 'errors' in data:
+                    return False
+                
+                items_page = (data.get('data', {}).get('node') or {}).get('items') or {}
+                for item in items_page.get('nodes', []):
+                    if (item.get('content') or {}).get('number') == issue_number:
+                        project_item_id = item.get('id')
+                        break
+                
+                page_info = items_page.get('pageInfo') or {}
+                if project_item_id or not page_info.get('hasNextPage'):
+                    break
+                cursor = page_info.get('endCursor')
         
         if not project_item_id:
             # Add issue to project first
             content_id = issue_id
-            if not str(issue_id).startswith('Issue_'):
+            if str(issue_id).isdigit():
                 content_id = f"Issue_{issue_id}"
             
             mutation_add = """
@@ -489,10 +594,7 @@ def move_issue_in_project_v2(project_id: str, issue_id: int, issue_number: int,
             """
             
             try:
-                response_add = requests.post(graphql_url, headers=headers,
-                                            json={"query": mutation_add, 
-                                                  "variables": {"projectId": project_id, "contentId": content_id}}, 
-                                            timeout=30)
+                response_add = post_graphql(mutation_add, {"projectId": project_id, "contentId": content_id}, headers)
                 if response_add.status_code == 200:
                     data_add = response_add.json()
                     if 'errors' not in data_add:
@@ -519,23 +621,120 @@ def move_issue_in_project_v2(project_id: str, issue_id: int, issue_number: int,
         variables_update = {
             "projectId": project_id,
             "itemId": project_item_id,
-            "fieldId": status_field.get('id'),
-            "optionId": target_option_id
+            "fieldId": status_field_id,
+            "optionId": option_id
         }
         
         try:
-            response_update = requests.post(graphql_url, headers=headers,
-                                          json={"query": mutation_update, "variables": variables_update}, timeout=30)
+            response_update = post_graphql(mutation_update, variables_update, headers)
             if response_update.status_code == 200:
                 data_update = response_update.json()
                 if 'errors' not in data_update:
+                    _PROJECT_ITEM_CACHE[(project_id, issue_number)] = project_item_id
                     print(f"✓ Moved issue #{issue_number} to '{target_field_value}'")
                     return True
         except:
             pass
         
+        # The item may have been removed from the project; look it up again next time
+        _PROJECT_ITEM_CACHE.pop((project_id, issue_number), None)
         return False
             
     except Exception as e:
         print(f"⚠ Error in Projects V2 movement: {e}")
         return False
+
+
+# Aliased mutations sent per GraphQL document; keeps each request well inside GitHub's limits
+_BATCH_MUTATION_LIMIT = 20
+
+
+def move_issues_in_project_v2_batch(project_id: str, status_field_id: str,
+                                    updates: list[tuple[str, str]], token: str) -> list[bool]:
+    """
+    Set the status field of several project items in one GraphQL request.
+    
+    Args:
+        project_id: Projects V2 node ID
+        status_field_id: ID of the single-select status field
+        updates: (item_id, option_id) pairs, at most _BATCH_MUTATION_LIMIT
+        token: GitHub token
+    
+    Returns:
+        One success flag per update, in order
+    """
+    if not updates:
+        return []
+    
+    # m0, m1, ... aliases of the same mutation, each with its own item/option variables
+    params = ["$projectId: ID!", "$fieldId: ID!"]
+    selections = []
+    variables = {"projectId": project_id, "fieldId": status_field_id}
+    for i, (item_id, option_id) in enumerate(updates):
+        params.append(f"$item{i}: ID!, $option{i}: String!")
+        selections.append(
+            f"m{i}: updateProjectV2ItemFieldValue(input: {{projectId: $projectId, itemId: $item{i}, "
+            f"fieldId: $fieldId, value: {{singleSelectOptionId: $option{i}}}}}) {{ projectV2Item {{ id }} }}"
+        )
+        variables[f"item{i}"] = item_id
+        variables[f"option{i}"] = option_id
+    mutation = f"mutation({', '.join(params)}) {{\n  " + "\n  ".join(selections) + "\n}"
+    
+    headers = {
+        "Authorization": f"Bearer {token}",
+        "Content-Type": "application/json",
+    }
+    try:
+        response = post_graphql(mutation, variables, headers)
+    except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+        print(f"⚠ Network error when updating project status: {e}")
+        return [False] * len(updates)
+    
+    if response.status_code != 200:
+        print(f"⚠ Failed to update: {response.status_code} - {response.text[:200]}")
+        return [False] * len(updates)
+    
+    # A failed alias comes back as null data plus an error whose path names the alias
+    data = response.json().get('data') or {}
+    return [bool(data.get(f"m{i}")) for i in range(len(updates))]
+
+
+def move_issues_in_project(repo_name: str, moves: list[tuple[int, str]], project_name: str = None,
+                           move_one=None) -> dict:
+    """
+    Apply several pipeline moves, batching those whose project item and option IDs are cached.
+    
+    Moves that can't be resolved from the cache (or fail in the batch) go through
+    move_one (default: move_issue_in_project) one at a time.
+    
+    Returns:
+        {issue_number: success}
+    """
+    move_one = move_one or move_issue_in_project
+    results = {}
+    meta = get_cached_project_v2(repo_name, project_name)
+    batch = []
+    for issue_number, target_column_name in moves:
+        item_id = _PROJECT_ITEM_CACHE.get((meta['id'], issue_number)) if meta else None
+        option_id = resolve_status_option(meta, target_column_name) if meta else None
+        if item_id and option_id and meta['status_field_id']:
+            batch.append((issue_number, target_column_name, item_id, option_id))
+        else:
+            results[issue_number] = move_one(repo_name, issue_number, target_column_name, project_name)
+    
+    token = os.getenv("GITHUB_TOKEN")
+    for start in range(0, len(batch), _BATCH_MUTATION_LIMIT):
+        chunk = batch[start:start + _BATCH_MUTATION_LIMIT]
+        print(f"🔄 Moving {len(chunk)} issue(s) in one request...")
+        flags = move_issues_in_project_v2_batch(
+            meta['id'], meta['status_field_id'], [(item_id, option_id) for _, _, item_id, option_id in chunk], token
+        )
+        for (issue_number, target_column_name, _, _), ok in zip(chunk, flags):
+            if ok:
+                print(f"✓ Moved issue #{issue_number} to '{target_column_name}'")
+                results[issue_number] = True
+            else:
+                # The cached item may be stale; resolve it again on the single-move path
+                _PROJECT_ITEM_CACHE.pop((meta['id'], issue_number), None)
+                results[issue_number] = move_one(repo_name, issue_number, target_column_name, project_name)
+    return results
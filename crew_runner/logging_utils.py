@@ -3,9 +3,69 @@ Logging helpers: consistent formatting for status summaries.
 """
 
 import re
-import subprocess
+import sys
 from pathlib import Path
-from .git_ops import get_current_branch, get_head_sha, has_changes
+from typing import Optional
+from .git_ops import get_git_snapshot
+
+# Case-insensitive single-pass keyword scans; 'git' also covers 'github'
+_LOCAL_WARNING_RE = re.compile(r"patch|implementation|plan|file", re.IGNORECASE)
+_GIT_WARNING_RE = re.compile(r"git|push|branch|pipeline|remote|network", re.IGNORECASE)
+
+_TEST_STATUS_RE = re.compile(r"Test Execution Status:\s*([✅❌⚠️ℹ️]+)\s*([A-Z]+)")
+
+
+def parse_test_status(plan_content: str) -> tuple[bool, Optional[str]]:
+    """Return (test_executed, test_status) from the test results section of an implementation plan."""
+    has_status_line = "Test Execution Status" in plan_content
+    if not has_status_line and "## Test Results" not in plan_content:
+        return False, None
+    
+    # Only run the regex when its literal prefix is present
+    status_match = _TEST_STATUS_RE.search(plan_content) if has_status_line else None
+    if status_match:
+        return True, f"{status_match.group(1)} {status_match.group(2)}"
+    if "Status: ✅ PASSED" in plan_content:
+        return True, "✅ PASSED"
+    if "Status: ❌ FAILED" in plan_content:
+        return True, "❌ FAILED"
+    if "Status: ⚠️  NO TESTS FOUND" in plan_content:
+        return True, "⚠️  NO TESTS FOUND"
+    return True, "ℹ️  COMPLETED"
+
+
+def split_warnings(warnings: list[str]) -> tuple[list[str], list[str]]:
+    """Split warnings into (local, git) lists; anything not clearly git-related counts as local."""
+    local_warnings, git_warnings = [], []
+    for warning in warnings:
+        if not _LOCAL_WARNING_RE.search(warning) and _GIT_WARNING_RE.search(warning):
+            git_warnings.append(warning)
+        else:
+            local_warnings.append(warning)
+    return local_warnings, git_warnings
+
+
+# plan path -> (st_mtime_ns, st_size, test_executed, test_status)
+_PLAN_CACHE: dict[Path, tuple[int, int, bool, Optional[str]]] = {}
+
+
+def read_plan_test_status(plan_file: Path) -> tuple[bool, Optional[str]]:
+    """parse_test_status() for a plan file, re-reading it only when its mtime or size changes."""
+    try:
+        st = plan_file.stat()
+    except OSError:
+        return False, None
+    
+    cached = _PLAN_CACHE.get(plan_file)
+    if cached and cached[:2] == (st.st_mtime_ns, st.st_size):
+        return cached[2], cached[3]
+    
+    try:
+        test_executed, test_status = parse_test_status(plan_file.read_text(encoding='utf-8'))
+    except (OSError, UnicodeDecodeError):
+        return False, None
+    _PLAN_CACHE[plan_file] = (st.st_mtime_ns, st.st_size, test_executed, test_status)
+    return test_executed, test_status
 
 
 def print_issue_status(issue_number: int, work_dir: Path, warnings: list[str], implementation_status: dict = None):
@@ -20,196 +80,166 @@ def print_issue_status(issue_number: int, work_dir: Path, warnings: list[str], i
         warnings: List of warning messages
         implementation_status: Optional dict with did_commit, did_push flags
     """
-    # Separate warnings into local and git/github categories
-    local_warnings = []
-    git_warnings = []
+    # Collected and written once at the end instead of one print (and TTY flush) per line
+    out: list[str] = []
     
-    for warning in warnings:
-        warning_lower = warning.lower()
-        if any(keyword in warning_lower for keyword in ['patch', 'implementation', 'plan', 'file']):
-            local_warnings.append(warning)
-        elif any(keyword in warning_lower for keyword in ['git', 'github', 'push', 'branch', 'pipeline', 'remote', 'network']):
-            git_warnings.append(warning)
-        else:
-            local_warnings.append(warning)
+    # Separate warnings into local and git/github categories
+    local_warnings, git_warnings = split_warnings(warnings)
     
     # Check local implementation status
     patch_file = work_dir / "crewai_patch.diff"
+    has_patch_file = patch_file.exists()
     plan_file = work_dir / "implementations" / f"issue_{issue_number}_plan.md"
-    patch_applied = has_changes(work_dir) if (work_dir / ".git").exists() else False
+    # One `git status --porcelain=v2 --branch` answers branch, HEAD, upstream and dirtiness
+    is_git_repo = (work_dir / ".git").exists()
+    snapshot = get_git_snapshot(work_dir) if is_git_repo else None
+    patch_applied = snapshot.dirty if snapshot else False
     
     # Check test execution status from implementation plan
-    test_status = None
-    test_executed = False
-    if plan_file.exists():
-        try:
-            plan_content = plan_file.read_text(encoding='utf-8')
-            if "## Test Results" in plan_content or "Test Execution Status" in plan_content:
-                test_executed = True
-                status_match = re.search(r"Test Execution Status:\s*([✅❌⚠️ℹ️]+)\s*([A-Z]+)", plan_content)
-                if status_match:
-                    test_status = f"{status_match.group(1)} {status_match.group(2)}"
-                elif "Status: ✅ PASSED" in plan_content:
-                    test_status = "✅ PASSED"
-                elif "Status: ❌ FAILED" in plan_content:
-                    test_status = "❌ FAILED"
-                elif "Status: ⚠️  NO TESTS FOUND" in plan_content:
-                    test_status = "⚠️  NO TESTS FOUND"
-                else:
-                    test_status = "ℹ️  COMPLETED"
-        except:
-            pass
+    test_executed, test_status = read_plan_test_status(plan_file)
     
     # Capture ACTUAL current git branch and HEAD commit
-    current_branch = get_current_branch(work_dir)
-    head_sha = get_head_sha(work_dir, short=True)
+    current_branch = snapshot.branch if snapshot else None
+    head_sha = snapshot.short_sha if snapshot else None
     git_committed = False
     git_pushed = False
     
-    if (work_dir / ".git").exists():
+    if snapshot:
         # Use implementation_status flags if available (most accurate)
         if implementation_status:
             git_committed = implementation_status.get("did_commit", False)
             git_pushed = implementation_status.get("did_push", False)
         else:
-            # Fallback: Check if there are commits on this branch
-            try:
-                result = subprocess.run(['git', 'log', '--oneline', '-1'], 
-                                      cwd=work_dir, capture_output=True, text=True, check=False, timeout=5)
-                if result.returncode == 0 and result.stdout.strip():
-                    git_committed = True
-                
-                # Check if branch is pushed (fallback method)
-                if current_branch:
-                    result = subprocess.run(['git', 'rev-parse', '--abbrev-ref', '@{u}'], 
-                                          cwd=work_dir, capture_output=True, text=True, check=False, timeout=5)
-                    if result.returncode == 0:
-                        git_pushed = True
-            except Exception:
-                pass
+            # Fallback: HEAD exists once the branch has a commit; an upstream means it was pushed
+            git_committed = snapshot.head_sha is not None
+            git_pushed = bool(current_branch and snapshot.upstream)
     
     # Print Section 1: Local Implementation & Testing
-    print(f"\n{'='*70}")
-    print(f"📦 LOCAL IMPLEMENTATION & TESTING - Issue #{issue_number}")
-    print(f"{'='*70}")
+    out.append(f"\n{'='*70}")
+    out.append(f"📦 LOCAL IMPLEMENTATION & TESTING - Issue #{issue_number}")
+    out.append(f"{'='*70}")
     
     if patch_applied:
-        print(f"✅ Code changes applied successfully to local files")
-    elif patch_file.exists():
-        print(f"⚠️  Code changes generated but not automatically applied")
-        print(f"   Patch file: {patch_file}")
-        print(f"   To apply manually:")
-        print(f"      cd {work_dir}")
-        print(f"      git apply --whitespace=fix crewai_patch.diff")
+        out.append(f"✅ Code changes applied successfully to local files")
+    elif has_patch_file:
+        out.append(f"⚠️  Code changes generated but not automatically applied")
+        out.append(f"   Patch file: {patch_file}")
+        out.append(f"   To apply manually:")
+        out.append(f"      cd {work_dir}")
+        out.append(f"      git apply --whitespace=fix crewai_patch.diff")
     else:
-        print(f"ℹ️  Implementation plan generated (no patch file)")
+        out.append(f"ℹ️  Implementation plan generated (no patch file)")
     
     if plan_file.exists():
-        print(f"✅ Implementation plan: {plan_file}")
-        print(f"   Contains full code changes and implementation details")
+        out.append(f"✅ Implementation plan: {plan_file}")
+        out.append(f"   Contains full code changes and implementation details")
     
     # Show test execution status
     if test_executed:
-        print(f"\n🧪 Test Execution Status:")
+        out.append(f"\n🧪 Test Execution Status:")
         if test_status:
-            print(f"   {test_status}")
+            out.append(f"   {test_status}")
         else:
-            print(f"   ℹ️  Tests were executed (check plan file for details)")
-        print(f"   Review test results in: {plan_file}")
+            out.append(f"   ℹ️  Tests were executed (check plan file for details)")
+        out.append(f"   Review test results in: {plan_file}")
     elif patch_applied:
-        print(f"\n⚠️  Test Execution:")
-        print(f"   Tests were not executed (may have been skipped or failed to start)")
+        out.append(f"\n⚠️  Test Execution:")
+        out.append(f"   Tests were not executed (may have been skipped or failed to start)")
     
     if local_warnings:
-        print(f"\n⚠️  Local Warnings:")
+        out.append(f"\n⚠️  Local Warnings:")
         for warning in local_warnings:
-            print(f"   - {warning}")
+            out.append(f"   - {warning}")
     
     # Testing instructions
     if not test_executed:
-        print(f"\n🧪 Manual Testing Steps:")
-    print(f"   1. Review implementation plan: {plan_file}")
-    if patch_file.exists() and not patch_applied:
-        print(f"   2. Apply patch manually (see above) or copy code from plan file")
-    print(f"   3. Test locally:")
-    print(f"      cd {work_dir}")
+        out.append(f"\n🧪 Manual Testing Steps:")
+    out.append(f"   1. Review implementation plan: {plan_file}")
+    if has_patch_file and not patch_applied:
+        out.append(f"   2. Apply patch manually (see above) or copy code from plan file")
     if (work_dir / "package.json").exists():
-        print(f"      npm start  # or: node server.js")
+        run_cmd = "npm start  # or: node server.js"
     elif (work_dir / "server.js").exists():
-        print(f"      node server.js")
+        run_cmd = "node server.js"
     else:
-        print(f"      python3 -m http.server 8000  # or your preferred method")
-    print(f"   4. Open in browser and verify functionality")
+        run_cmd = "python3 -m http.server 8000  # or your preferred method"
+    out.append(f"""   3. Test locally:
+      cd {work_dir}
+      {run_cmd}
+   4. Open in browser and verify functionality""")
     
     # Print Section 2: Git/GitHub Operations
-    print(f"\n{'='*70}")
-    print(f"🔀 GIT STATUS / SUMMARY - Issue #{issue_number}")
-    print(f"{'='*70}")
+    out.append(f"\n{'='*70}")
+    out.append(f"🔀 GIT STATUS / SUMMARY - Issue #{issue_number}")
+    out.append(f"{'='*70}")
     
-    if not (work_dir / ".git").exists():
-        print(f"ℹ️  Not a git repository - Git operations skipped")
+    if not is_git_repo:
+        out.append(f"ℹ️  Not a git repository - Git operations skipped")
     else:
         if current_branch:
-            print(f"📍 Current Branch: {current_branch}")
+            out.append(f"📍 Current Branch: {current_branch}")
         else:
-            print(f"⚠️  Branch status unknown")
+            out.append(f"⚠️  Branch status unknown")
         
         if head_sha:
-            print(f"📍 HEAD Commit: {head_sha}")
+            out.append(f"📍 HEAD Commit: {head_sha}")
         else:
-            print(f"⚠️  HEAD commit unknown")
+            out.append(f"⚠️  HEAD commit unknown")
         
         # Only show "Committed ✅" if commit actually succeeded
         if git_committed:
-            print(f"✅ Committed")
+            out.append(f"✅ Committed")
         else:
-            print(f"⚠️  Not committed")
+            out.append(f"⚠️  Not committed")
         
         # Only show "Pushed ✅" if push actually succeeded
         if git_pushed:
-            print(f"✅ Pushed")
+            out.append(f"✅ Pushed")
         else:
-            print(f"⚠️  Not pushed")
+            out.append(f"⚠️  Not pushed")
             if current_branch:
-                print(f"   To push manually:")
-                print(f"      cd {work_dir}")
-                print(f"      git push -u origin {current_branch}")
+                out.append(f"   To push manually:")
+                out.append(f"      cd {work_dir}")
+                out.append(f"      git push -u origin {current_branch}")
         
         if git_warnings:
-            print(f"\n⚠️  Git/GitHub Warnings:")
+            out.append(f"\n⚠️  Git/GitHub Warnings:")
             for warning in git_warnings:
-                print(f"   - {warning}")
+                out.append(f"   - {warning}")
     
     # Summary
-    print(f"\n{'='*70}")
-    print(f"📊 SUMMARY - Issue #{issue_number}")
-    print(f"{'='*70}")
+    out.append(f"\n{'='*70}")
+    out.append(f"📊 SUMMARY - Issue #{issue_number}")
+    out.append(f"{'='*70}")
     
     if patch_applied:
-        print(f"✅ Code changes: Applied successfully")
+        out.append(f"✅ Code changes: Applied successfully")
     else:
-        print(f"⚠️  Code changes: Not applied (check patch file)")
+        out.append(f"⚠️  Code changes: Not applied (check patch file)")
     
     # Test status
     if test_executed:
         if test_status and "PASSED" in test_status:
-            print(f"✅ Tests: Executed and PASSED")
+            out.append(f"✅ Tests: Executed and PASSED")
         elif test_status and "FAILED" in test_status:
-            print(f"❌ Tests: Executed but FAILED - Review test results")
+            out.append(f"❌ Tests: Executed but FAILED - Review test results")
         elif test_status and "NO TESTS FOUND" in test_status:
-            print(f"⚠️  Tests: No tests found - Manual verification recommended")
+            out.append(f"⚠️  Tests: No tests found - Manual verification recommended")
         else:
-            print(f"ℹ️  Tests: Executed (check results in plan file)")
+            out.append(f"ℹ️  Tests: Executed (check results in plan file)")
     else:
-        print(f"⚠️  Tests: Not executed")
+        out.append(f"⚠️  Tests: Not executed")
     
     # Git status
     if git_warnings:
-        print(f"⚠️  Git/GitHub: Some operations had issues (non-critical for local testing)")
+        out.append(f"⚠️  Git/GitHub: Some operations had issues (non-critical for local testing)")
     elif current_branch and git_committed and git_pushed:
-        print(f"✅ Git/GitHub: All operations completed successfully")
+        out.append(f"✅ Git/GitHub: All operations completed successfully")
     elif current_branch:
-        print(f"ℹ️  Git/GitHub: Partial completion (check status above)")
+        out.append(f"ℹ️  Git/GitHub: Partial completion (check status above)")
+    
+    out.append(f"{'='*70}")
+    out.append(f"{'='*70}\n")
     
-    print(f"{'='*70}")
-    print(f"{'='*70}\n")
+    sys.stdout.write("\n".join(out) + "\n")
+    sys.stdout.flush()
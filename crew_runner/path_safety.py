@@ -4,6 +4,7 @@ Path safety: normalization, traversal prevention, and repo_root containment chec
 
 import os
 from pathlib import Path
+from typing import Optional
 
 
 def get_repo_file_allowlist(work_dir: Path) -> set[str]:
@@ -39,9 +40,11 @@ def get_repo_file_allowlist(work_dir: Path) -> set[str]:
     return allowlist
 
 
-def validate_path_safety(path: str, work_dir: Path, change_index: int) -> list[str]:
+def validate_path_safety(path: str, work_dir: Path, change_index: int, repo_root_str: Optional[str] = None) -> list[str]:
     """
     Validate path safety: reject absolute paths, .. traversal, ensure within repo_root.
+    Pass repo_root_str (str(work_dir.resolve())) when validating many paths so the
+    repo root is resolved once per batch instead of once per change.
     Returns list of errors (empty if valid).
     """
     errors = []
@@ -56,13 +59,14 @@ def validate_path_safety(path: str, work_dir: Path, change_index: int) -> list[s
         errors.append(f"Change {change_index}: Path traversal rejected: '{path}'. Paths containing '..' are not allowed.")
         return errors
     
-    # Resolve final write path and ensure it stays inside repo_root
+    if repo_root_str is None:
+        repo_root_str = str(work_dir.resolve())
+    
+    # Resolve final write path and ensure it stays inside repo_root.
+    # realpath still follows symlinks, so a link pointing outside the repo is caught.
     try:
-        resolved_path = (work_dir / path).resolve()
-        # Check if resolved path is still within work_dir
-        try:
-            resolved_path.relative_to(work_dir.resolve())
-        except ValueError:
+        resolved_str = os.path.realpath(os.path.join(repo_root_str, path))
+        if not (resolved_str == repo_root_str or resolved_str.startswith(repo_root_str + os.sep)):
             errors.append(f"Change {change_index}: Path escapes repository root: '{path}' resolves outside repo.")
             return errors
     except Exception as e:
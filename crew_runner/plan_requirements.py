@@ -6,6 +6,33 @@ import re
 from pathlib import Path
 
 
+# Selector kinds treated as CSS requirements: .class, #id, [attribute]
+_SEL_PREFIXES = ('.', '#', '[')
+
+# Compiled once at import; parse_plan_requirements runs on every coverage check
+# One pass over the "##".."######" plan sections we care about. Each body runs up to the next
+# header line (or end of text) instead of the old "[^#]*" scans, which stopped at the first
+# "#" anywhere (e.g. an #id selector) and could backtrack heavily on header-less input.
+_SECTION_RE = re.compile(
+    r'^[ \t]*#{2,6}\s*(New Functions|Files to Change)[^\n]*\n(.*?)(?=^[ \t]*#{1,6}\s|\Z)',
+    re.IGNORECASE | re.MULTILINE | re.DOTALL
+)
+# "Test Approach" counts as a header or as plain/bold text ("**Test Approach:** ..."),
+# running from the phrase to the next header line
+_TEST_APPROACH_RE = re.compile(r'Test Approach.*?(?=^[ \t]*#{1,6}\s|\Z)', re.IGNORECASE | re.MULTILINE | re.DOTALL)
+_FUNC_NAME_RE = re.compile(r'[-*]\s*`?(\w+)\s*\([^)]*\)`?')
+# Fenced code block | inline backtick .class/#id/[attribute] | CSS declaration line
+_CSS_SCAN_RE = re.compile(
+    r'```(?:css)?\s*(?P<block>[^`]+)```'
+    r'|`(?P<inline>[.#][\w-]+|\[[^\]]+\])`'
+    r'|(?:^|\n)\s*(?P<decl>[.#\[][\w-]+(?:\s+[.#\[][\w-]+)*)\s*\{',
+    re.IGNORECASE | re.MULTILINE
+)
+_SELECTOR_RE = re.compile(r'(?:^|\n)\s*([.#\[][\w-]+(?:\s*[.#\[][\w-]+)*(?:\s*\{)?)', re.MULTILINE)
+_TEST_FILE_RE = re.compile(r'(test[/\\][\w/\\-]+\.(?:js|ts|py))')
+_FILE_ITEM_RE = re.compile(r'[-*]\s*`([^`]+)`')
+
+
 def parse_plan_requirements(plan_file: Path) -> dict:
     """
     Parse requirements from implementation plan file.
@@ -24,83 +51,55 @@ def parse_plan_requirements(plan_file: Path) -> dict:
     try:
         content = plan_file.read_text(encoding='utf-8')
         
+        sections = {}
+        for m in _SECTION_RE.finditer(content):
+            # First occurrence of each section wins, as with the old re.search
+            sections.setdefault(m.group(1).lower(), m.group(2))
+        
         # Extract functions from "New Functions/Classes/Modules" section
-        func_section = re.search(r'###?\s*New Functions[^#]*', content, re.IGNORECASE | re.DOTALL)
-        if func_section:
-            func_text = func_section.group(0)
+        func_text = sections.get("new functions")
+        if func_text:
             # Look for function names like "functionName()" or "- functionName"
-            func_matches = re.findall(r'[-*]\s*`?(\w+)\s*\([^)]*\)`?', func_text)
-            requirements["functions"] = [f for f in func_matches if not f.startswith('function')]
+            requirements["functions"] = [
+                m.group(1) for m in _FUNC_NAME_RE.finditer(func_text) if not m.group(1).startswith('function')
+            ]
         
         # Extract CSS selectors from "Files to Change" or "styles.css" mentions
         # Only treat CSS selectors as required if they start with ., #, or [
         # Prefer extracting selectors from backticks, fenced code blocks, or CSS declarations
         css_selectors = set()
         
-        # Method 1: Extract from fenced code blocks (```css or ```)
-        code_block_pattern = r'```(?:css)?\s*([^`]+)```'
-        code_blocks = re.findall(code_block_pattern, content, re.IGNORECASE | re.DOTALL)
-        for block in code_blocks:
-            # Extract selectors from CSS code blocks
-            selector_pattern = r'(?:^|\n)\s*([.#\[][\w-]+(?:\s*[.#\[][\w-]+)*(?:\s*\{)?)'
-            matches = re.findall(selector_pattern, block, re.MULTILINE)
-            for match in matches:
-                # Clean up: remove trailing { and whitespace
-                selector = match.strip().rstrip('{').strip()
-                # Only accept if starts with ., #, or [
-                if selector and (selector.startswith('.') or selector.startswith('#') or selector.startswith('[')):
+        # Single pass over the plan; each match is one of:
+        #   block  - fenced code block (```css or ```), selectors extracted per line
+        #   inline - backtick-wrapped selector (e.g., `.modal`, `#editModal`, `[data-id]`),
+        #            which also covers bullets like "- Add `.modal` styles"
+        #   decl   - a line that looks like a CSS declaration (".modal {")
+        for m in _CSS_SCAN_RE.finditer(content):
+            kind = m.lastgroup
+            if kind == "block":
+                # Clean up: remove trailing { and whitespace; only accept ., #, or [
+                cleaned = (sm.group(1).strip().rstrip('{').strip() for sm in _SELECTOR_RE.finditer(m.group("block")))
+                css_selectors.update(sel for sel in cleaned if sel.startswith(_SEL_PREFIXES))
+            else:
+                selector = m.group(kind).strip()
+                if selector.startswith(_SEL_PREFIXES):
                     css_selectors.add(selector)
         
-        # Method 2: Extract from inline backticks (e.g., `.modal`, `#editModal`, `[data-id]`)
-        # Handle attribute selectors like [data-id], [data-id="value"], etc.
-        # Pattern matches: .class, #id, or [attribute] (with optional value)
-        inline_backtick_pattern = r'`((?:[.#][\w-]+|\[[^\]]+\]))`'
-        inline_matches = re.findall(inline_backtick_pattern, content)
-        for match in inline_matches:
-            selector = match.strip()
-            # Only accept if starts with ., #, or [
-            if selector and (selector.startswith('.') or selector.startswith('#') or selector.startswith('[')):
-                css_selectors.add(selector)
-        
-        # Method 3: Extract from lines that look like CSS declarations
-        css_declaration_pattern = r'(?:^|\n)\s*([.#\[][\w-]+(?:\s+[.#\[][\w-]+)*)\s*\{'
-        declaration_matches = re.findall(css_declaration_pattern, content, re.MULTILINE)
-        for match in declaration_matches:
-            selector = match.strip()
-            # Only accept if starts with ., #, or [
-            if selector and (selector.startswith('.') or selector.startswith('#') or selector.startswith('[')):
-                css_selectors.add(selector)
-        
-        # Method 4: Extract from bullet lists that mention selectors
-        # Look for lines like "- Add `.modal` styles" or "- Style `#toast`" or "- Use `[data-id]` selector"
-        # Pattern matches: .class, #id, or [attribute] (with optional value)
-        bullet_pattern = r'[-*]\s+[^`]*`((?:[.#][\w-]+|\[[^\]]+\]))`'
-        bullet_matches = re.findall(bullet_pattern, content)
-        for match in bullet_matches:
-            selector = match.strip()
-            # Only accept if starts with ., #, or [
-            if selector and (selector.startswith('.') or selector.startswith('#') or selector.startswith('[')):
-                css_selectors.add(selector)
-        
         # Debug logging on extraction
         if css_selectors:
             print(f"   Extracted {len(css_selectors)} CSS selector(s) from plan: {', '.join(sorted(css_selectors))}")
         
         requirements["css_selectors"] = sorted(list(css_selectors))
         
-        # Extract test files from "Test Approach" or "Files to Change"
-        test_section = re.search(r'Test Approach[^#]*|test[^#]*\.(js|ts|py)', content, re.IGNORECASE | re.DOTALL)
-        if test_section:
-            test_text = test_section.group(0)
-            test_matches = re.findall(r'(test[/\\][\w/\\-]+\.(?:js|ts|py))', test_text)
-            requirements["test_files"] = test_matches
+        # Extract test files from "Test Approach"; without that section, any test/ path in the plan
+        test_section = _TEST_APPROACH_RE.search(content)
+        test_text = test_section.group(0) if test_section else content
+        requirements["test_files"] = _TEST_FILE_RE.findall(test_text)
         
         # Extract required files from "Files to Change" section
-        files_section = re.search(r'###?\s*Files to Change[^#]*', content, re.IGNORECASE | re.DOTALL)
-        if files_section:
-            files_text = files_section.group(0)
-            file_matches = re.findall(r'[-*]\s*`([^`]+)`', files_text)
-            requirements["required_files"] = file_matches
+        files_text = sections.get("files to change")
+        if files_text:
+            requirements["required_files"] = _FILE_ITEM_RE.findall(files_text)
         
     except Exception as e:
         print(f"⚠️  Warning: Could not parse plan requirements: {e}")
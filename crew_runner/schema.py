@@ -2,12 +2,18 @@
 Schema types, normalization, and validation for structured changes.
 """
 
+import os
+import re
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Optional
 from .path_safety import validate_path_safety, get_repo_file_allowlist
 
 
+# Unified-diff markers rejected in structured change content
+_DIFF_RE = re.compile(r'(?i)diff --git|--- a/|\+\+\+ b/|@@')
+
+
 @dataclass
 class RunState:
     """
@@ -25,6 +31,13 @@ class RunState:
     head_sha_after: Optional[str] = None
 
 
+def _case_key(path: str) -> str:
+    """Case-folding key for similar-file lookups (normcase is a C call on Windows)."""
+    if os.name == 'nt':
+        return os.path.normcase(path)
+    return path.lower()
+
+
 def normalize_change_schema(change: dict) -> tuple[str, list[str]]:
     """
     Normalize change schema: accept both "path" and "file", normalize to "path".
@@ -126,16 +139,14 @@ def check_diff_markers(change: dict, i: int) -> list[str]:
     if "after" in change:
         content_fields_to_check.append(change["after"])
     
-    # Check for unified-diff markers only in content fields
-    diff_markers = ["diff --git", "--- a/", "+++ b/", "@@"]
+    # Check for unified-diff markers only in content fields.
+    # (?i) folds case at match time instead of allocating a lowercased copy.
     for content_field in content_fields_to_check:
         if isinstance(content_field, str):
-            content_lower = content_field.lower()
-            for marker in diff_markers:
-                if marker in content_lower:
-                    errors.append(f"Change {i}: Contains diff-like content in content field (rejecting - use structured format only). Found marker: '{marker}'")
-                    break
-            if any(marker in content_lower for marker in diff_markers):
+            match = _DIFF_RE.search(content_field)
+            if match:
+                marker = match.group(0).lower()
+                errors.append(f"Change {i}: Contains diff-like content in content field (rejecting - use structured format only). Found marker: '{marker}'")
                 break
     
     return errors
@@ -160,6 +171,10 @@ def validate_structured_changes(changes_data: dict, work_dir: Path) -> tuple[boo
     
     # Build repo file allowlist
     repo_files = get_repo_file_allowlist(work_dir)
+    # Resolve the repo root once; per-change checks are string prefix comparisons
+    repo_root_str = str(work_dir.resolve())
+    # Case-insensitive index, only built if a lookup misses
+    repo_files_ci = None
     
     for i, change in enumerate(changes_data["changes"]):
         # Schema normalization
@@ -175,7 +190,7 @@ def validate_structured_changes(changes_data: dict, work_dir: Path) -> tuple[boo
         
         # Path safety validation
         if path:
-            path_errors = validate_path_safety(path, work_dir, i)
+            path_errors = validate_path_safety(path, work_dir, i, repo_root_str)
             errors.extend(path_errors)
             if path_errors:
                 continue
@@ -204,13 +219,10 @@ def validate_structured_changes(changes_data: dict, work_dir: Path) -> tuple[boo
         # Check if file is in repo allowlist (for existing file operations)
         if operation in ops_requiring_existing:
             if normalized_path not in repo_files and not file_path.exists():
-                # Try to find similar file (case-insensitive)
-                found_similar = None
-                path_lower = normalized_path.lower()
-                for repo_file in repo_files:
-                    if repo_file.lower() == path_lower:
-                        found_similar = repo_file
-                        break
+                # Try to find similar file (case-insensitive); index built once per call
+                if repo_files_ci is None:
+                    repo_files_ci = {_case_key(f): f for f in repo_files}
+                found_similar = repo_files_ci.get(_case_key(normalized_path))
                 
                 if found_similar:
                     errors.append(f"Change {i}: File '{path}' not found, but similar file exists: {found_similar}")
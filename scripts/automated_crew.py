@@ -9,6 +9,11 @@ import sys
 import subprocess
 import re
 import shlex
+import shutil
+import tempfile
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
 import requests
 from pathlib import Path
 from dotenv import load_dotenv
@@ -17,8 +22,10 @@ from github.Auth import Token
 from crewai import Agent, Task, Crew, LLM
 from crewai.tools.base_tool import BaseTool
 from typing import Type, Optional
+from dataclasses import dataclass, field
 from pydantic import BaseModel, Field
 import json
+from datetime import datetime
 
 # Add parent directory to path to import crew_runner modules
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -30,14 +37,19 @@ from crew_runner.apply_changes import apply_structured_changes
 from crew_runner.plan_requirements import parse_plan_requirements
 from crew_runner.coverage import check_coverage
 from crew_runner.git_ops import (
-    get_current_branch, get_head_sha, get_git_changed_files,
-    has_changes, ensure_base_branch, create_branch_and_commit, ensure_feature_branch
+    get_current_branch, get_head_sha, get_git_changed_files, get_git_snapshot, invalidate_git_snapshot,
+    has_changes, run_git, _NETWORK_ERROR_RE, rejected_push_refs, push_args, stage_files, _PATCH_ARTIFACT_SUFFIXES,
+    BASE_BRANCH_CANDIDATES, existing_branches, find_base_branch, pull_base_branch,
+    ensure_base_branch, create_branch_and_commit, ensure_feature_branch
 )
 from crew_runner.github_ops import (
     get_github_client, get_sub_issues, get_next_issue,
-    mark_issue_processed, create_pr, move_issue_in_project
+    mark_issues_processed, create_pr, resolve_pr_base_branch, move_issue_in_project, _verify_repo_and_issue_gql,
+    STATUS_FIELD_NAMES, index_status_field, resolve_status_option,
+    get_cached_project_v2, cache_project_v2, _PROJECT_ITEM_CACHE, move_issues_in_project, _HTTP, post_graphql
 )
-from crew_runner.logging_utils import print_issue_status
+from crew_runner.logging_utils import print_issue_status, read_plan_test_status, split_warnings
+from crew_runner.crew_cache import CrewResultCache
 
 # Load environment variables first
 load_dotenv()
@@ -282,32 +294,46 @@ def detect_test_framework(work_dir: Path) -> dict:
     
     return test_info
 
+_GITHUB_CLIENT = None
+
 def get_github_client():
-    """Get authenticated GitHub client"""
+    """Get authenticated GitHub client (created once, so its HTTP session is reused)"""
+    global _GITHUB_CLIENT
     if not GITHUB_TOKEN:
         return None
-    auth = Token(GITHUB_TOKEN)
-    return Github(auth=auth)
+    if _GITHUB_CLIENT is None:
+        _GITHUB_CLIENT = Github(auth=Token(GITHUB_TOKEN))
+    return _GITHUB_CLIENT
 
-def get_sub_issues(repo_name, issue_number):
-    """Get sub-issues (child issues) for a given parent issue"""
+_REPOS = {}
+
+def get_repo(repo_name):
+    """Repository handle, created once per repo; lazy, so no GET is made until a call needs one"""
     g = get_github_client()
     if not g:
+        return None
+    repo = _REPOS.get(repo_name)
+    if repo is None:
+        repo = _REPOS[repo_name] = g.get_repo(repo_name, lazy=True)
+    return repo
+
+def get_sub_issues(repo_name, issue_number):
+    """Get sub-issues (child issues) for a given parent issue"""
+    repo = get_repo(repo_name)
+    if not repo:
         return []
     
     try:
-        repo = g.get_repo(repo_name)
         
         # Method 1: Try GitHub Sub-Issues API (if available)
         # Note: Sub-issues API might require GitHub Enterprise or specific features
         try:
             # Use REST API to get sub-issues
             # GET /repos/{owner}/{repo}/issues/{issue_number}/sub-issues
-            import requests
             token = os.getenv("GITHUB_TOKEN")
             headers = {"Authorization": f"token {token}", "Accept": "application/vnd.github+json"}
             url = f"https://api.github.com/repos/{repo_name}/issues/{issue_number}/sub-issues"
-            response = requests.get(url, headers=headers, timeout=10)
+            response = _HTTP.get(url, headers=headers, timeout=10)
             
             if response.status_code == 200:
                 sub_issues_data = response.json()
@@ -325,7 +351,6 @@ def get_sub_issues(repo_name, issue_number):
         if not parent_issue.body:
             return []
         
-        import re
         # Pattern to find issue references: #123 or #123, #456
         issue_refs = re.findall(r'#(\d+)', parent_issue.body)
         sub_issues = []
@@ -358,8 +383,8 @@ def get_sub_issues(repo_name, issue_number):
 
 def get_next_issue(repo_name, processed_issues_file):
     """Get the next unprocessed issue"""
-    g = get_github_client()
-    if not g:
+    repo = get_repo(repo_name)
+    if not repo:
         return None
     
     # Load processed issues
@@ -369,7 +394,6 @@ def get_next_issue(repo_name, processed_issues_file):
             processed = set(json.load(f))
     
     # Get open issues
-    repo = g.get_repo(repo_name)
     issues = repo.get_issues(state='open', sort='updated')
     
     # Find first unprocessed issue
@@ -379,18 +403,6 @@ def get_next_issue(repo_name, processed_issues_file):
     
     return None
 
-def mark_issue_processed(issue_number, processed_issues_file):
-    """Mark an issue as processed"""
-    processed = set()
-    if processed_issues_file.exists():
-        with open(processed_issues_file, 'r') as f:
-            processed = set(json.load(f))
-    
-    processed.add(issue_number)
-    
-    with open(processed_issues_file, 'w') as f:
-        json.dump(list(processed), f)
-
 def create_implementation_crew():
     """Create a crew for implementing solutions - aligned with run_autopr.py structure"""
     
@@ -430,7 +442,6 @@ def create_implementation_crew():
     else:
         # Check if Ollama is available
         try:
-            import subprocess
             result = subprocess.run(['curl', '-sSf', f'{ollama_base_url}/api/tags'], 
                                   capture_output=True, timeout=2)
             if result.returncode == 0:
@@ -543,6 +554,49 @@ def create_implementation_crew():
     
     return product, architect, developer, reviewer, tester
 
+def _compress_context(text: str, max_tokens: Optional[int] = None) -> str:
+    """
+    Trim prompt context before it is embedded in task descriptions.
+    Drops markdown table separator rows, strips trailing whitespace and collapses
+    runs of blank lines. With max_tokens, also caps the result at ~max_tokens
+    (approx 4 chars/token); issue text is never capped, so acceptance criteria
+    at the end of a long issue still reach the crew.
+    Code fences are left untouched apart from trailing whitespace.
+    """
+    if not text:
+        return text
+    
+    lines = []
+    in_code = False
+    for line in text.splitlines():
+        line = line.rstrip()
+        if line.lstrip().startswith("```"):
+            in_code = not in_code
+        elif not in_code:
+            # Table separators like |---|:---:| carry no information
+            if line.startswith("|") and not line.strip("|-: "):
+                continue
+            if not line and lines and not lines[-1]:
+                continue  # Dedupe adjacent blank lines
+        lines.append(line)
+    
+    compressed = "\n".join(lines).strip()
+    if max_tokens is None:
+        return compressed
+    max_chars = max_tokens * 4
+    if len(compressed) > max_chars:
+        compressed = compressed[:max_chars] + "\n\n[... context truncated to save tokens ...]"
+    return compressed
+
+
+def _truncate_path_list(paths: list[str], head: int = 20, tail: int = 5) -> list[str]:
+    """Keep the first `head` and last `tail` paths, noting how many were skipped."""
+    if len(paths) <= head + tail:
+        return paths
+    skipped = len(paths) - head - tail
+    return paths[:head] + [f"... ({skipped} more)"] + paths[-tail:]
+
+
 def get_project_context(work_dir: Path) -> str:
     """Gather project context from repository files"""
     context_parts = []
@@ -679,7 +733,30 @@ def get_project_context(work_dir: Path) -> str:
     else:
         return "## Project Context\nNo specific project context detected. Assume standard project layout.\n\n"
 
-def process_issue(issue, repo_name, work_dir, include_sub_issues=True, enable_testing: bool = None):
+def gather_project_inputs(work_dir: Path) -> tuple[str, set[str], str]:
+    """
+    Everything process_issue reads from the working tree: (compressed project context,
+    repo file allowlist, repo type). Taken in one place so parallel crews can share a snapshot.
+    """
+    project_context = _compress_context(get_project_context(work_dir), max_tokens=4000)
+    repo_files = get_repo_file_allowlist(work_dir)
+    
+    # Determine repo type from package.json
+    repo_type = "static frontend web app"
+    if (work_dir / "package.json").exists():
+        try:
+            pkg = json.loads((work_dir / "package.json").read_text())
+            deps = list(pkg.get('dependencies', {}).keys()) + list(pkg.get('devDependencies', {}).keys())
+            if any('express' in d.lower() or 'mongoose' in d.lower() or 'backend' in d.lower() for d in deps):
+                repo_type = "static frontend web app (no backend)"
+            else:
+                repo_type = "static frontend web app"
+        except:
+            pass
+    return project_context, repo_files, repo_type
+
+def process_issue(issue, repo_name, work_dir, include_sub_issues=True, enable_testing: bool = None,
+                  result_cache: Optional[CrewResultCache] = None, project_inputs: Optional[tuple] = None):
     """Process a single issue through the crew - aligned with run_autopr.py workflow
     
     Args:
@@ -689,6 +766,8 @@ def process_issue(issue, repo_name, work_dir, include_sub_issues=True, enable_te
         include_sub_issues: If True, process sub-issues as part of this issue
         enable_testing: If True, run tests after applying changes.
                        If None, uses ENABLE_TESTING env var (default: True)
+        result_cache: If given, a cached result for the same issue text is returned without running the crew
+        project_inputs: gather_project_inputs() result to use instead of reading work_dir
     """
     
     print(f"\n{'='*70}")
@@ -705,10 +784,18 @@ def process_issue(issue, repo_name, work_dir, include_sub_issues=True, enable_te
                 print(f"   - #{sub.number}: {sub.title}")
             print()
     
+    if result_cache is not None:
+        cache_key = CrewResultCache.key_for(repo_name, issue.title, issue.body,
+                                            [(sub.number, sub.title, sub.body) for sub in sub_issues])
+        cached_result = result_cache.get(issue.number, cache_key)
+        if cached_result is not None:
+            print(f"♻️  Reusing cached crew result for issue #{issue.number} (set CREW_RESULT_CACHE=false to rerun the crew)")
+            return cached_result
+    
     product, architect, developer, reviewer, tester = create_implementation_crew()
     
-    # Gather project context
-    project_context = get_project_context(work_dir)
+    # Gather project context (unless the caller read it already), shared by the architect and developer tasks
+    project_context, repo_files, repo_type = project_inputs or gather_project_inputs(work_dir)
     print("📋 Project context gathered")
     
     # Build issue text including sub-issues context
@@ -723,6 +810,7 @@ def process_issue(issue, repo_name, work_dir, include_sub_issues=True, enable_te
             if sub.body:
                 sub_issues_text += f"  {sub.body[:200]}...\n"  # First 200 chars
         issue_text += sub_issues_text
+    issue_text = _compress_context(issue_text)
     
     # Task 1: Product Manager - Convert to user story (aligned with run_autopr.py)
     product_task = Task(
@@ -759,24 +847,10 @@ Working directory: {work_dir}
         expected_output="Minimal technical plan with files to change and test approach"
     )
     
-    # A) Get repo file allowlist for repo-scoped prompting
-    repo_files = get_repo_file_allowlist(work_dir)
-    allowed_paths_list = sorted([f for f in repo_files if not f.startswith('test')])[:20]  # Top 20 non-test files
+    # A) Repo file allowlist (from gather_project_inputs) for repo-scoped prompting
+    allowed_paths_list = _truncate_path_list(sorted([f for f in repo_files if not f.startswith('test')]))  # First 20 + last 5 non-test files
     test_files_list = sorted([f for f in repo_files if 'test' in f.lower()])[:10]  # Top 10 test files
     
-    # Determine repo type from project context
-    repo_type = "static frontend web app"
-    if (work_dir / "package.json").exists():
-        try:
-            pkg = json.loads((work_dir / "package.json").read_text())
-            deps = list(pkg.get('dependencies', {}).keys()) + list(pkg.get('devDependencies', {}).keys())
-            if any('express' in d.lower() or 'mongoose' in d.lower() or 'backend' in d.lower() for d in deps):
-                repo_type = "static frontend web app (no backend)"
-            else:
-                repo_type = "static frontend web app"
-        except:
-            pass
-    
     # Task 3: Developer - Produce structured changes (NOT a diff)
     developer_task = Task(
         description=f"""You will implement this issue by producing structured file changes in JSON format.
@@ -918,14 +992,19 @@ If changes are needed, describe them clearly (bullets).
     print("Crew Execution Complete")
     print(f"{'='*70}")
     print(f"Result type: {type(result)}")
+    # Serialize once; str() on a CrewOutput walks all nested task outputs
     result_str = str(result) if result else ""
-    print(f"Result length: {len(result_str)} characters")
+    result_len = len(result_str)
+    print(f"Result length: {result_len} characters")
     
-    # Try to extract more detailed information
-    if hasattr(result, 'tasks_output'):
+    # Per-task breakdown is debug-only (set CREW_DEBUG=true)
+    if os.getenv("CREW_DEBUG", "false").lower() == "true" and hasattr(result, 'tasks_output'):
         print(f"Number of task outputs: {len(result.tasks_output)}")
         for i, task_output in enumerate(result.tasks_output):
-            print(f"  Task {i+1} output length: {len(str(task_output))} chars")
+            # Prefer the raw text over re-serializing the whole TaskOutput
+            raw = getattr(task_output, 'raw', None)
+            task_len = len(raw) if isinstance(raw, str) else len(str(task_output))
+            print(f"  Task {i+1} output length: {task_len} chars")
     
     return result
 
@@ -974,931 +1053,6 @@ def parse_structured_changes(text: str) -> dict:
         return {"error": f"Invalid JSON: {str(e)}"}
 
 
-def get_repo_file_allowlist(work_dir: Path) -> set[str]:
-    """
-    Build a set of existing files in the repo (excluding build artifacts, node_modules, etc.).
-    Used to prevent edits to non-existent backend files or files outside the repo.
-    Returns set of relative file paths.
-    """
-    allowlist = set()
-    exclude_dirs = {'.git', 'node_modules', 'dist', 'build', '.next', '.nuxt', 
-                    '__pycache__', '.pytest_cache', '.venv', 'venv', 'env',
-                    '.crewai_cache', 'coverage', '.coverage'}
-    
-    if not work_dir.exists():
-        return allowlist
-    
-    try:
-        for root, dirs, files in os.walk(work_dir):
-            # Skip excluded directories
-            dirs[:] = [d for d in dirs if d not in exclude_dirs and not d.startswith('.')]
-            
-            for file in files:
-                file_path = Path(root) / file
-                try:
-                    rel_path = file_path.relative_to(work_dir)
-                    allowlist.add(str(rel_path))
-                except ValueError:
-                    # File outside work_dir, skip
-                    continue
-    except Exception as e:
-        print(f"⚠️  Warning: Could not build repo file allowlist: {e}")
-    
-    return allowlist
-
-
-def validate_structured_changes(changes_data: dict, work_dir: Path) -> tuple[bool, list[str]]:
-    """
-    Validate structured changes before applying.
-    
-    Schema normalization: Accepts both "path" and "file" fields, normalizes to "path".
-    Repo allowlist: Prevents edits to non-existent files or files outside the repo.
-    
-    Returns (is_valid, error_messages)
-    """
-    errors = []
-    
-    if "error" in changes_data:
-        return False, [changes_data["error"]]
-    
-    if "changes" not in changes_data:
-        return False, ["Missing 'changes' key in structured changes"]
-    
-    # Build repo file allowlist
-    repo_files = get_repo_file_allowlist(work_dir)
-    
-    for i, change in enumerate(changes_data["changes"]):
-        # Schema normalization: accept both "path" and "file"
-        if "path" not in change and "file" not in change:
-            errors.append(f"Change {i}: Missing 'path' or 'file' field")
-            continue
-        
-        # Normalize: set path from either field, always delete "file" after normalization
-        path = change.get("path") or change.get("file")
-        change["path"] = path  # Normalize in place
-        if "file" in change:
-            del change["file"]  # Always remove "file" to avoid ambiguity
-        
-        if "operation" not in change:
-            errors.append(f"Change {i}: Missing 'operation'")
-            continue
-        operation = change["operation"]
-        
-        # C) Path safety: reject absolute paths and .. traversal
-        if path:
-            # Reject absolute paths
-            if Path(path).is_absolute():
-                errors.append(f"Change {i}: Absolute path rejected: '{path}'. Use relative paths only.")
-                continue
-            
-            # Reject paths containing .. segments
-            if ".." in path:
-                errors.append(f"Change {i}: Path traversal rejected: '{path}'. Paths containing '..' are not allowed.")
-                continue
-            
-            # Resolve final write path and ensure it stays inside repo_root
-            try:
-                resolved_path = (work_dir / path).resolve()
-                # Check if resolved path is still within work_dir
-                try:
-                    resolved_path.relative_to(work_dir.resolve())
-                except ValueError:
-                    errors.append(f"Change {i}: Path escapes repository root: '{path}' resolves outside repo.")
-                    continue
-            except Exception as e:
-                errors.append(f"Change {i}: Invalid path '{path}': {str(e)}")
-                continue
-        
-        # B) Tighten diff detection: only scan content-like fields, not str(change)
-        content_fields_to_check = []
-        if "content" in change:
-            content_fields_to_check.append(change["content"])
-        if "before" in change:
-            content_fields_to_check.append(change["before"])
-        if "after" in change:
-            content_fields_to_check.append(change["after"])
-        
-        # Check for unified-diff markers only in content fields
-        diff_markers = ["diff --git", "--- a/", "+++ b/", "@@"]
-        for content_field in content_fields_to_check:
-            if isinstance(content_field, str):
-                content_lower = content_field.lower()
-                for marker in diff_markers:
-                    if marker in content_lower:
-                        errors.append(f"Change {i}: Contains diff-like content in content field (rejecting - use structured format only). Found marker: '{marker}'")
-                        break
-                if any(marker in content_lower for marker in diff_markers):
-                    break
-        
-        # Validate operation
-        # Legacy operations
-        legacy_ops = ["create", "replace", "edit", "delete"]
-        # New robust operations
-        new_ops = ["replace_file", "upsert_function_js", "upsert_css_selector", 
-                   "insert_after_anchor", "insert_before_anchor", "append_if_missing"]
-        valid_ops = legacy_ops + new_ops
-        
-        if operation not in valid_ops:
-            errors.append(f"Change {i}: Invalid operation '{operation}' (must be one of {valid_ops})")
-            continue
-        
-        # Normalize replace_file to replace for downstream compatibility
-        if operation == "replace_file":
-            operation = "replace"
-            change["operation"] = "replace"  # Update in place for applier
-        
-        # Validate file path against repo allowlist
-        file_path = work_dir / path
-        normalized_path = str(Path(path).as_posix())  # Normalize path separators
-        
-        # Operations that require existing files
-        ops_requiring_existing = ["replace", "edit", "delete", "upsert_function_js", 
-                                   "upsert_css_selector", "insert_after_anchor", 
-                                   "insert_before_anchor", "append_if_missing"]
-        
-        # Check if file is in repo allowlist (for existing file operations)
-        if operation in ops_requiring_existing:
-            if normalized_path not in repo_files and not file_path.exists():
-                # Try to find similar file (case-insensitive)
-                found_similar = None
-                path_lower = normalized_path.lower()
-                for repo_file in repo_files:
-                    if repo_file.lower() == path_lower:
-                        found_similar = repo_file
-                        break
-                
-                if found_similar:
-                    errors.append(f"Change {i}: File '{path}' not found, but similar file exists: {found_similar}")
-                else:
-                    # Check if this looks like a backend/API hallucination
-                    suspicious_patterns = ['api/', 'routes.js', 'controllers/', 'models/', 'backend/', 'server/']
-                    if any(pattern in normalized_path.lower() for pattern in suspicious_patterns):
-                        errors.append(f"Change {i}: File '{path}' does not exist and appears to be a backend/API file not in this repo. Only modify existing files in this repo.")
-                    else:
-                        errors.append(f"Change {i}: File '{path}' does not exist (for {operation} operation). Only modify existing files in this repo.")
-        
-        # For create operations, restrict to approved directories
-        elif operation == "create":
-            # Allow creation in test directories or explicitly allowed locations
-            allowed_create_dirs = ['test', 'tests', 'spec', '__tests__']
-            path_parts = Path(normalized_path).parts
-            if path_parts:
-                first_dir = path_parts[0].lower()
-                if first_dir not in allowed_create_dirs:
-                    # Check if plan explicitly allows this (would need plan context, but for now warn)
-                    # In practice, we'll allow it but log a warning
-                    pass  # Allow create but could add warning if needed
-        
-        # Validate required fields based on operation
-        # Note: path is already validated above
-        if operation in ["create", "replace"]:
-            if "content" not in change:
-                errors.append(f"Change {i}: Missing 'content' for {operation} operation")
-        elif operation == "edit":
-            if "edits" not in change:
-                errors.append(f"Change {i}: Missing 'edits' for edit operation")
-            elif not isinstance(change["edits"], list):
-                errors.append(f"Change {i}: 'edits' must be a list")
-        elif operation == "upsert_function_js":
-            if not change.get("path"):
-                errors.append(f"Change {i}: Missing 'path' for upsert_function_js operation")
-            if "function_name" not in change:
-                errors.append(f"Change {i}: Missing 'function_name' for upsert_function_js operation")
-            if "content" not in change:
-                errors.append(f"Change {i}: Missing 'content' (function body) for upsert_function_js operation")
-        elif operation == "upsert_css_selector":
-            if not change.get("path"):
-                errors.append(f"Change {i}: Missing 'path' for upsert_css_selector operation")
-            if "selector" not in change:
-                errors.append(f"Change {i}: Missing 'selector' for upsert_css_selector operation")
-            if "content" not in change:
-                errors.append(f"Change {i}: Missing 'content' (CSS block) for upsert_css_selector operation")
-        elif operation in ["insert_after_anchor", "insert_before_anchor"]:
-            if not change.get("path"):
-                errors.append(f"Change {i}: Missing 'path' for {operation} operation")
-            if "anchor" not in change:
-                errors.append(f"Change {i}: Missing 'anchor' for {operation} operation")
-            if "content" not in change:
-                errors.append(f"Change {i}: Missing 'content' for {operation} operation")
-        elif operation == "append_if_missing":
-            if not change.get("path"):
-                errors.append(f"Change {i}: Missing 'path' for append_if_missing operation")
-            if "content" not in change:
-                errors.append(f"Change {i}: Missing 'content' for append_if_missing operation")
-            if "signature" not in change:
-                errors.append(f"Change {i}: Missing 'signature' for append_if_missing operation")
-        elif operation == "replace_file":
-            if not change.get("path"):
-                errors.append(f"Change {i}: Missing 'path' for replace_file operation")
-            if "content" not in change:
-                errors.append(f"Change {i}: Missing 'content' for replace_file operation")
-    
-    return len(errors) == 0, errors
-
-
-def test_upsert_function_js():
-    """Self-test for upsert_function_js function"""
-    import tempfile
-    
-    # Test 1: Append new function
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.js', delete=False) as tmp:
-        tmp.write("// Existing code\n")
-        tmp_path = Path(tmp.name)
-    
-    try:
-        result = upsert_function_js(tmp_path, "newFunction", "function newFunction() { return true; }")
-        assert result == True, "Should append new function"
-        content = tmp_path.read_text()
-        assert "function newFunction()" in content, "Function should be in file"
-    finally:
-        tmp_path.unlink()
-    
-    # Test 2: Replace existing function
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.js', delete=False) as tmp:
-        tmp.write("function existing() { return false; }\n")
-        tmp_path = Path(tmp.name)
-    
-    try:
-        result = upsert_function_js(tmp_path, "existing", "function existing() { return true; }")
-        assert result == True, "Should replace existing function"
-        content = tmp_path.read_text()
-        assert "return true" in content, "Function should be replaced"
-        assert "return false" not in content, "Old function should be gone"
-    finally:
-        tmp_path.unlink()
-    
-    print("✅ upsert_function_js self-test passed")
-
-
-def test_upsert_css_selector():
-    """Self-test for upsert_css_selector function"""
-    import tempfile
-    
-    # Test 1: Append new selector
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.css', delete=False) as tmp:
-        tmp.write("body { margin: 0; }\n")
-        tmp_path = Path(tmp.name)
-    
-    try:
-        result = upsert_css_selector(tmp_path, ".modal", ".modal { display: none; }")
-        assert result == True, "Should append new selector"
-        content = tmp_path.read_text()
-        assert ".modal" in content, "Selector should be in file"
-    finally:
-        tmp_path.unlink()
-    
-    # Test 2: Replace existing selector
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.css', delete=False) as tmp:
-        tmp.write(".modal { display: block; }\n")
-        tmp_path = Path(tmp.name)
-    
-    try:
-        result = upsert_css_selector(tmp_path, ".modal", ".modal { display: none; }")
-        assert result == True, "Should replace existing selector"
-        content = tmp_path.read_text()
-        assert "display: none" in content, "Selector should be replaced"
-        assert "display: block" not in content, "Old selector should be gone"
-    finally:
-        tmp_path.unlink()
-    
-    print("✅ upsert_css_selector self-test passed")
-
-
-def test_upsert_function_js():
-    """Self-test for upsert_function_js function"""
-    import tempfile
-    
-    # Test 1: Append new function
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.js', delete=False) as tmp:
-        tmp.write("// Existing code\n")
-        tmp_path = Path(tmp.name)
-    
-    try:
-        result = upsert_function_js(tmp_path, "newFunction", "function newFunction() { return true; }")
-        assert result == True, "Should append new function"
-        content = tmp_path.read_text()
-        assert "function newFunction()" in content, "Function should be in file"
-    finally:
-        tmp_path.unlink()
-    
-    # Test 2: Replace existing function
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.js', delete=False) as tmp:
-        tmp.write("function existing() { return false; }\n")
-        tmp_path = Path(tmp.name)
-    
-    try:
-        result = upsert_function_js(tmp_path, "existing", "function existing() { return true; }")
-        assert result == True, "Should replace existing function"
-        content = tmp_path.read_text()
-        assert "return true" in content, "Function should be replaced"
-        assert "return false" not in content, "Old function should be gone"
-    finally:
-        tmp_path.unlink()
-    
-    print("✅ upsert_function_js self-test passed")
-
-
-def test_upsert_css_selector():
-    """Self-test for upsert_css_selector function"""
-    import tempfile
-    
-    # Test 1: Append new selector
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.css', delete=False) as tmp:
-        tmp.write("body { margin: 0; }\n")
-        tmp_path = Path(tmp.name)
-    
-    try:
-        result = upsert_css_selector(tmp_path, ".modal", ".modal { display: none; }")
-        assert result == True, "Should append new selector"
-        content = tmp_path.read_text()
-        assert ".modal" in content, "Selector should be in file"
-    finally:
-        tmp_path.unlink()
-    
-    # Test 2: Replace existing selector
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.css', delete=False) as tmp:
-        tmp.write(".modal { display: block; }\n")
-        tmp_path = Path(tmp.name)
-    
-    try:
-        result = upsert_css_selector(tmp_path, ".modal", ".modal { display: none; }")
-        assert result == True, "Should replace existing selector"
-        content = tmp_path.read_text()
-        assert "display: none" in content, "Selector should be replaced"
-        assert "display: block" not in content, "Old selector should be gone"
-    finally:
-        tmp_path.unlink()
-    
-    print("✅ upsert_css_selector self-test passed")
-
-
-def upsert_function_js(file_path: Path, function_name: str, function_body: str) -> bool:
-    """
-    Upsert a JavaScript function: replace if exists, append if not.
-    Supports: function name(), const name = function(), const name = () =>
-    Returns True if change was made (idempotent: returns False if content unchanged).
-    """
-    if not file_path.exists():
-        return False
-    
-    content = file_path.read_text(encoding='utf-8')
-    original_content = content
-    
-    # Try to find function definition (supports various formats)
-    # More robust pattern matching
-    patterns = [
-        # function name() { ... } - match entire function body
-        rf'function\s+{re.escape(function_name)}\s*\([^)]*\)\s*\{{[^}}]*\}}',
-        # const name = function() { ... }
-        rf'const\s+{re.escape(function_name)}\s*=\s*function\s*\([^)]*\)\s*\{{[^}}]*\}}',
-        # const name = () => { ... }
-        rf'const\s+{re.escape(function_name)}\s*=\s*\([^)]*\)\s*=>\s*\{{[^}}]*\}}',
-        # let name = function() { ... }
-        rf'let\s+{re.escape(function_name)}\s*=\s*function\s*\([^)]*\)\s*\{{[^}}]*\}}',
-        # let name = () => { ... }
-        rf'let\s+{re.escape(function_name)}\s*=\s*\([^)]*\)\s*=>\s*\{{[^}}]*\}}',
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, content, re.DOTALL | re.MULTILINE)
-        if match:
-            # Check if replacement would change content (idempotency check)
-            existing_function = content[match.start():match.end()]
-            if existing_function.strip() == function_body.strip():
-                return False  # No change needed
-            
-            # Replace existing function
-            new_content = content[:match.start()] + function_body + content[match.end():]
-            file_path.write_text(new_content, encoding='utf-8')
-            return True
-    
-    # Function not found - append at end
-    if not content.endswith('\n'):
-        content += '\n'
-    content += '\n' + function_body + '\n'
-    file_path.write_text(content, encoding='utf-8')
-    return True
-
-
-def upsert_css_selector(file_path: Path, selector: str, css_block: str) -> bool:
-    """
-    Upsert a CSS selector: replace if exists, append if not.
-    Supports: .class, #id, element, element.class, etc.
-    Returns True if change was made (idempotent: returns False if content unchanged).
-    """
-    if not file_path.exists():
-        return False
-    
-    content = file_path.read_text(encoding='utf-8')
-    original_content = content
-    
-    # Escape selector for regex (handle .class, #id, element, etc.)
-    # Need to handle special regex chars but preserve CSS selector meaning
-    escaped_selector = re.escape(selector)
-    
-    # Try to find selector block (more robust matching)
-    # Match selector followed by optional whitespace and opening brace
-    pattern = rf'{escaped_selector}\s*\{{[^}}]*\}}'
-    match = re.search(pattern, content, re.DOTALL | re.MULTILINE)
-    
-    if match:
-        # Check if replacement would change content (idempotency check)
-        existing_block = content[match.start():match.end()]
-        if existing_block.strip() == css_block.strip():
-            return False  # No change needed
-        
-        # Replace existing selector
-        new_content = content[:match.start()] + css_block + content[match.end():]
-        file_path.write_text(new_content, encoding='utf-8')
-        return True
-    
-    # Selector not found - append at end
-    if not content.endswith('\n'):
-        content += '\n'
-    content += '\n' + css_block + '\n'
-    file_path.write_text(content, encoding='utf-8')
-    return True
-
-
-def insert_after_anchor(file_path: Path, anchor: str, content_to_insert: str, use_regex: bool = False) -> bool:
-    """Insert content after an anchor string or regex pattern. Returns True if inserted."""
-    if not file_path.exists():
-        return False
-    
-    current_content = file_path.read_text(encoding='utf-8')
-    
-    if use_regex:
-        match = re.search(anchor, current_content)
-        if match:
-            pos = match.end()
-        else:
-            return False
-    else:
-        pos = current_content.find(anchor)
-        if pos == -1:
-            return False
-        pos += len(anchor)
-    
-    new_content = current_content[:pos] + '\n' + content_to_insert + current_content[pos:]
-    file_path.write_text(new_content, encoding='utf-8')
-    return True
-
-
-def insert_before_anchor(file_path: Path, anchor: str, content_to_insert: str, use_regex: bool = False) -> bool:
-    """Insert content before an anchor string or regex pattern. Returns True if inserted."""
-    if not file_path.exists():
-        return False
-    
-    current_content = file_path.read_text(encoding='utf-8')
-    
-    if use_regex:
-        match = re.search(anchor, current_content)
-        if match:
-            pos = match.start()
-        else:
-            return False
-    else:
-        pos = current_content.find(anchor)
-        if pos == -1:
-            return False
-    
-    new_content = current_content[:pos] + content_to_insert + '\n' + current_content[pos:]
-    file_path.write_text(new_content, encoding='utf-8')
-    return True
-
-
-def append_if_missing(file_path: Path, content_to_append: str, signature: str) -> bool:
-    """Append content only if signature is not present. Returns True if appended."""
-    if not file_path.exists():
-        # Create file with content
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-        file_path.write_text(content_to_append, encoding='utf-8')
-        return True
-    
-    current_content = file_path.read_text(encoding='utf-8')
-    
-    if signature in current_content:
-        return False  # Already present
-    
-    if not current_content.endswith('\n'):
-        current_content += '\n'
-    current_content += content_to_append + '\n'
-    file_path.write_text(current_content, encoding='utf-8')
-    return True
-
-
-def apply_structured_changes(changes_data: dict, work_dir: Path) -> tuple[bool, list[str], list[str]]:
-    """
-    Apply structured changes directly to files with robust fallbacks.
-    Returns (success, changed_files, error_messages)
-    F) Deduplication: tracks files in a set to avoid duplicates.
-    F) Idempotency: only reports files that actually changed.
-    """
-    changed_files_set = set()  # Use set to dedupe
-    errors = []
-    warnings = []
-    
-    if "error" in changes_data:
-        return False, [], [changes_data["error"]]
-    
-    for change in changes_data.get("changes", []):
-        # Schema normalization: accept both "path" and "file"
-        path = change.get("path") or change.get("file")
-        if not path:
-            errors.append("Change missing 'path' or 'file' field")
-            continue
-        
-        # Normalize in place
-        change["path"] = path
-        if "file" in change:
-            del change["file"]  # Remove duplicate field
-        
-        operation = change.get("operation", "replace")  # Default to replace
-        file_path = work_dir / path
-        
-        try:
-            if operation == "create":
-                # Create new file
-                file_path.parent.mkdir(parents=True, exist_ok=True)
-                content = change.get("content", "")
-                if file_path.exists():
-                    warnings.append(f"File {path} already exists, overwriting (create operation)")
-                file_path.write_text(content, encoding='utf-8')
-                changed_files_set.add(path)  # Use set to dedupe
-                print(f"✓ Created file: {path}")
-                
-            elif operation == "replace_file" or operation == "replace":
-                # Replace entire file content
-                if not file_path.exists():
-                    errors.append(f"File not found for replace: {path}")
-                    continue
-                content = change.get("content", "")
-                # F) Idempotency: check if content actually changed
-                if file_path.exists():
-                    current_content = file_path.read_text(encoding='utf-8')
-                    if current_content == content:
-                        print(f"ℹ️  File {path} already matches replacement content (no changes needed)")
-                        continue
-                file_path.write_text(content, encoding='utf-8')
-                changed_files_set.add(path)  # Use set to dedupe
-                print(f"✓ Replaced file: {path}")
-                
-            elif operation == "edit":
-                # Apply targeted edits with fallbacks
-                if not file_path.exists():
-                    errors.append(f"File not found for edit: {path}")
-                    continue
-                
-                current_content = file_path.read_text(encoding='utf-8')
-                new_content = current_content
-                edit_success = False
-                
-                edits = change.get("edits", [])
-                for edit in edits:
-                    find_text = edit.get("find", "")
-                    replace_text = edit.get("replace", "")
-                    
-                    # Try exact match first
-                    if find_text in new_content:
-                        new_content = new_content.replace(find_text, replace_text, 1)
-                        edit_success = True
-                    else:
-                        # Try regex anchor
-                        try:
-                            pattern = re.compile(re.escape(find_text), re.MULTILINE | re.DOTALL)
-                            if pattern.search(new_content):
-                                new_content = pattern.sub(replace_text, new_content, count=1)
-                                edit_success = True
-                                warnings.append(f"Used regex fallback for edit in {path}")
-                            else:
-                                errors.append(f"Could not find anchor in {path}: {find_text[:50]}...")
-                        except:
-                            errors.append(f"Invalid regex pattern in {path}: {find_text[:50]}...")
-                
-                if edit_success and new_content != current_content:
-                    file_path.write_text(new_content, encoding='utf-8')
-                    changed_files_set.add(path)  # Use set to dedupe
-                    print(f"✓ Edited file: {path}")
-                elif not edit_success:
-                    errors.append(f"No changes applied to {path} (all find texts not found)")
-                    
-            elif operation == "insert_after_anchor":
-                anchor = change.get("anchor", "")
-                content_to_insert = change.get("content", "")
-                use_regex = change.get("use_regex", False)
-                
-                if insert_after_anchor(file_path, anchor, content_to_insert, use_regex):
-                    changed_files_set.add(path)  # Use set to dedupe
-                    print(f"✓ Inserted content after anchor in {path}")
-                else:
-                    errors.append(f"Could not find anchor in {path}: {anchor[:50]}...")
-                    
-            elif operation == "insert_before_anchor":
-                anchor = change.get("anchor", "")
-                content_to_insert = change.get("content", "")
-                use_regex = change.get("use_regex", False)
-                
-                if insert_before_anchor(file_path, anchor, content_to_insert, use_regex):
-                    changed_files_set.add(path)  # Use set to dedupe
-                    print(f"✓ Inserted content before anchor in {path}")
-                else:
-                    errors.append(f"Could not find anchor in {path}: {anchor[:50]}...")
-                    
-            elif operation == "append_if_missing":
-                content_to_append = change.get("content", "")
-                signature = change.get("signature", "")
-                
-                # F) Idempotency: append_if_missing already returns False if signature exists
-                if append_if_missing(file_path, content_to_append, signature):
-                    changed_files_set.add(path)  # Use set to dedupe
-                    print(f"✓ Appended content to {path}")
-                else:
-                    print(f"ℹ️  Content already present in {path} (signature found)")
-                    
-            elif operation == "upsert_function_js":
-                function_name = change.get("function_name", "")
-                function_body = change.get("content", "")
-                
-                if not function_name:
-                    errors.append(f"Missing function_name for upsert_function_js in {path}")
-                    continue
-                
-                if upsert_function_js(file_path, function_name, function_body):
-                    changed_files.append(path)
-                    print(f"✓ Upserted function {function_name} in {path}")
-                else:
-                    errors.append(f"Failed to upsert function {function_name} in {path}")
-                    
-            elif operation == "upsert_css_selector":
-                selector = change.get("selector", "")
-                css_block = change.get("content", "")
-                
-                if not selector:
-                    errors.append(f"Missing selector for upsert_css_selector in {path}")
-                    continue
-                
-                if upsert_css_selector(file_path, selector, css_block):
-                    changed_files.append(path)
-                    print(f"✓ Upserted CSS selector {selector} in {path}")
-                else:
-                    errors.append(f"Failed to upsert CSS selector {selector} in {path}")
-                    
-            elif operation == "delete":
-                # Delete file
-                if not file_path.exists():
-                    errors.append(f"File not found for delete: {path}")
-                    continue
-                file_path.unlink()
-                changed_files_set.add(path)  # Use set to dedupe
-                print(f"✓ Deleted file: {path}")
-            else:
-                # This should not happen if validator is working correctly
-                errors.append(f"Unknown operation '{operation}' for {path}. Supported: create, replace, replace_file, edit, upsert_function_js, upsert_css_selector, insert_after_anchor, insert_before_anchor, append_if_missing, delete")
-                
-        except Exception as e:
-            errors.append(f"Error applying change to {path}: {str(e)}")
-    
-    # Print warnings
-    for warning in warnings:
-        print(f"⚠️  {warning}")
-    
-    # F) Convert set to sorted list for consistent output
-    changed_files = sorted(list(changed_files_set))
-    return len(errors) == 0, changed_files, errors
-
-
-def get_git_changed_files(work_dir: Path) -> list[str]:
-    """Get list of changed files from git status. Returns empty list if no changes."""
-    if not (work_dir / ".git").exists():
-        return []
-    
-    try:
-        result = subprocess.run(
-            ["git", "status", "--porcelain"],
-            cwd=work_dir,
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
-        
-        if result.returncode != 0:
-            return []
-        
-        files = []
-        for line in result.stdout.strip().split('\n'):
-            if line.strip():
-                # Format: " M file.js" or "?? newfile.js"
-                file_path = line[3:].strip()
-                if file_path:
-                    files.append(file_path)
-        
-        return files
-    except Exception:
-        return []
-
-
-def parse_plan_requirements(plan_file: Path) -> dict:
-    """
-    Parse requirements from implementation plan file.
-    Returns dict with: functions, css_selectors, test_files, required_files
-    """
-    requirements = {
-        "functions": [],
-        "css_selectors": [],
-        "test_files": [],
-        "required_files": []
-    }
-    
-    if not plan_file.exists():
-        return requirements
-    
-    try:
-        content = plan_file.read_text(encoding='utf-8')
-        
-        # Extract functions from "New Functions/Classes/Modules" section
-        func_section = re.search(r'###?\s*New Functions[^#]*', content, re.IGNORECASE | re.DOTALL)
-        if func_section:
-            func_text = func_section.group(0)
-            # Look for function names like "functionName()" or "- functionName"
-            func_matches = re.findall(r'[-*]\s*`?(\w+)\s*\([^)]*\)`?', func_text)
-            requirements["functions"] = [f for f in func_matches if not f.startswith('function')]
-        
-        # Extract CSS selectors from "Files to Change" or "styles.css" mentions
-        # E) Only treat CSS selectors as required if they start with ., #, or [
-        # Prefer extracting selectors from backticks, fenced code blocks, or CSS declarations
-        css_selectors = set()
-        
-        # Method 1: Extract from fenced code blocks (```css or ```)
-        code_block_pattern = r'```(?:css)?\s*([^`]+)```'
-        code_blocks = re.findall(code_block_pattern, content, re.IGNORECASE | re.DOTALL)
-        for block in code_blocks:
-            # Extract selectors from CSS code blocks
-            # Match: .selector, #selector, [attribute], or compound selectors starting with . or #
-            selector_pattern = r'(?:^|\n)\s*([.#\[][\w-]+(?:\s*[.#\[][\w-]+)*(?:\s*\{)?)'
-            matches = re.findall(selector_pattern, block, re.MULTILINE)
-            for match in matches:
-                # Clean up: remove trailing { and whitespace
-                selector = match.strip().rstrip('{').strip()
-                # Only accept if starts with ., #, or [
-                if selector and (selector.startswith('.') or selector.startswith('#') or selector.startswith('[')):
-                    css_selectors.add(selector)
-        
-        # Method 2: Extract from inline backticks (e.g., `.modal`, `#editModal`, `[data-id]`)
-        inline_backtick_pattern = r'`([.#\[][\w-]+(?:\s+[.#\[][\w-]+)*)`'
-        inline_matches = re.findall(inline_backtick_pattern, content)
-        for match in inline_matches:
-            selector = match.strip()
-            # Only accept if starts with ., #, or [
-            if selector and (selector.startswith('.') or selector.startswith('#') or selector.startswith('[')):
-                css_selectors.add(selector)
-        
-        # Method 3: Extract from lines that look like CSS declarations
-        # Match lines like: ".modal {", "#id {", ".class .nested {", "[data-id] {"
-        css_declaration_pattern = r'(?:^|\n)\s*([.#\[][\w-]+(?:\s+[.#\[][\w-]+)*)\s*\{'
-        declaration_matches = re.findall(css_declaration_pattern, content, re.MULTILINE)
-        for match in declaration_matches:
-            selector = match.strip()
-            # Only accept if starts with ., #, or [
-            if selector and (selector.startswith('.') or selector.startswith('#') or selector.startswith('[')):
-                css_selectors.add(selector)
-        
-        # Method 4: Extract from bullet lists that mention selectors
-        # Look for lines like "- Add `.modal` styles" or "- Style `#toast`"
-        bullet_pattern = r'[-*]\s+[^`]*`([.#\[][\w-]+)`'
-        bullet_matches = re.findall(bullet_pattern, content)
-        for match in bullet_matches:
-            selector = match.strip()
-            # Only accept if starts with ., #, or [
-            if selector and (selector.startswith('.') or selector.startswith('#') or selector.startswith('[')):
-                css_selectors.add(selector)
-        
-        # Debug logging on extraction
-        if css_selectors:
-            print(f"   Extracted {len(css_selectors)} CSS selector(s) from plan: {', '.join(sorted(css_selectors))}")
-        
-        requirements["css_selectors"] = sorted(list(css_selectors))
-        
-        # Extract test files from "Test Approach" or "Files to Change"
-        test_section = re.search(r'Test Approach[^#]*|test[^#]*\.(js|ts|py)', content, re.IGNORECASE | re.DOTALL)
-        if test_section:
-            test_text = test_section.group(0)
-            test_matches = re.findall(r'(test[/\\][\w/\\-]+\.(?:js|ts|py))', test_text)
-            requirements["test_files"] = test_matches
-        
-        # Extract required files from "Files to Change" section
-        files_section = re.search(r'###?\s*Files to Change[^#]*', content, re.IGNORECASE | re.DOTALL)
-        if files_section:
-            files_text = files_section.group(0)
-            file_matches = re.findall(r'[-*]\s*`([^`]+)`', files_text)
-            requirements["required_files"] = file_matches
-        
-    except Exception as e:
-        print(f"⚠️  Warning: Could not parse plan requirements: {e}")
-    
-    return requirements
-
-
-def check_coverage(plan_file: Path, work_dir: Path) -> tuple[bool, dict]:
-    """
-    Check if implementation plan requirements are met.
-    Returns (is_complete, missing_items_dict)
-    """
-    requirements = parse_plan_requirements(plan_file)
-    missing = {
-        "functions": [],
-        "css_selectors": [],
-        "test_files": [],
-        "required_files": []
-    }
-    
-    # Check required functions in JS files
-    for func_name in requirements["functions"]:
-        found = False
-        # Check common JS files
-        for js_file in ["app.js", "index.js", "main.js"]:
-            js_path = work_dir / js_file
-            if js_path.exists():
-                content = js_path.read_text(encoding='utf-8')
-                # Look for function definition
-                patterns = [
-                    rf'function\s+{re.escape(func_name)}\s*\(',
-                    rf'const\s+{re.escape(func_name)}\s*=',
-                    rf'let\s+{re.escape(func_name)}\s*=',
-                    rf'var\s+{re.escape(func_name)}\s*='
-                ]
-                for pattern in patterns:
-                    if re.search(pattern, content):
-                        found = True
-                        break
-                if found:
-                    break
-        if not found:
-            missing["functions"].append(func_name)
-    
-    # Check CSS selectors
-    css_path = work_dir / "styles.css"
-    
-    # Filter out invalid/garbage selectors before checking
-    valid_selectors = [s for s in requirements["css_selectors"] 
-                      if s and (s.startswith('.') or s.startswith('#') or s.startswith('['))]
-    
-    if valid_selectors:
-        print(f"   Checking {len(valid_selectors)} CSS selector(s): {', '.join(valid_selectors)}")
-    
-    if css_path.exists():
-        css_content = css_path.read_text(encoding='utf-8')
-        for selector in valid_selectors:
-            # Check for selector in CSS file
-            # Handle compound selectors (e.g., ".modal .close" -> match ".modal" and ".close")
-            # For compound selectors, check if all parts exist
-            selector_parts = selector.split()
-            all_found = True
-            
-            for part in selector_parts:
-                # Each part should start with . or #
-                if part.startswith('.'):
-                    pattern = rf'\{re.escape(part)}\s*\{{'
-                elif part.startswith('#'):
-                    pattern = rf'\{re.escape(part)}\s*\{{'
-                else:
-                    # Skip invalid parts
-                    all_found = False
-                    break
-                
-                if not re.search(pattern, css_content, re.MULTILINE):
-                    all_found = False
-                    break
-            
-            if not all_found:
-                missing["css_selectors"].append(selector)
-    else:
-        # If CSS file doesn't exist but selectors are required, mark all as missing
-        if valid_selectors:
-            missing["css_selectors"] = valid_selectors
-    
-    # Check test files
-    for test_file in requirements["test_files"]:
-        test_path = work_dir / test_file
-        if not test_path.exists():
-            missing["test_files"].append(test_file)
-    
-    # Check required files
-    for req_file in requirements["required_files"]:
-        req_path = work_dir / req_file
-        if not req_path.exists():
-            missing["required_files"].append(req_file)
-    
-    # Determine if complete
-    is_complete = (
-        len(missing["functions"]) == 0 and
-        len(missing["css_selectors"]) == 0 and
-        len(missing["test_files"]) == 0 and
-        len(missing["required_files"]) == 0
-    )
-    
-    return is_complete, missing
-
-
 def generate_git_patch(work_dir: Path, patch_file: Path) -> tuple[bool, str]:
     """
     Generate patch using git diff after changes are applied.
@@ -1910,51 +1064,31 @@ def generate_git_patch(work_dir: Path, patch_file: Path) -> tuple[bool, str]:
     
     try:
         # Generate diff of unstaged changes (no need to stage)
+        # Keep the diff as bytes so it is written to disk without a decode/encode round trip
         result = subprocess.run(
             ["git", "diff", "--no-color", "--minimal"],
             cwd=work_dir,
             capture_output=True,
-            text=True,
             timeout=30
         )
         
         if result.returncode != 0:
-            return False, f"git diff failed: {result.stderr}"
+            return False, f"git diff failed: {result.stderr.decode('utf-8', 'replace')}"
         
-        patch_content = result.stdout
+        patch_bytes = result.stdout
         
         # Validate patch is non-empty
-        if not patch_content.strip():
+        if not patch_bytes.strip():
             return False, "Patch is empty (no changes detected)"
         
-        # Validate patch format using git apply --check (dry-run)
-        # Create a temporary file for validation
-        import tempfile
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.diff', delete=False) as tmp:
-            tmp.write(patch_content)
-            tmp_path = tmp.name
+        patch_content = patch_bytes.decode('utf-8', 'replace')
         
-        try:
-            check_result = subprocess.run(
-                ["git", "apply", "--check"],
-                cwd=work_dir,
-                input=patch_content,
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-            if check_result.returncode != 0:
-                # Patch validation failed, but we'll still save it
-                print(f"⚠️  Warning: Generated patch failed validation: {check_result.stderr[:200]}")
-        finally:
-            # Clean up temp file
-            try:
-                Path(tmp_path).unlink()
-            except:
-                pass
+        # No `git apply --check` here: the patch is git's own output for this
+        # working tree, and the changes are already applied, so a dry-run
+        # re-apply could only fail spuriously.
         
         # Write patch file
-        patch_file.write_text(patch_content, encoding='utf-8')
+        patch_file.write_bytes(patch_bytes)
         
         return True, patch_content
         
@@ -1964,6 +1098,38 @@ def generate_git_patch(work_dir: Path, patch_file: Path) -> tuple[bool, str]:
         return False, f"Error generating git patch: {str(e)}"
 
 
+# Diff parsing patterns, compiled once
+_FENCED_DIFF_RE = re.compile(r"```diff\s*(.*?)```", re.DOTALL | re.IGNORECASE)
+_DIFF_DUP_SEP_RE = re.compile(r'(diff --git[^\n]+\n)(diff --git)')
+# "-X" immediately followed by "+X" (whitespace-insensitive): a no-op change pair
+_NOOP_PAIR_RE = re.compile(r'^-[^\S\n]*(.*?)[^\S\n]*\n\+[^\S\n]*\1[^\S\n]*$\n?', re.MULTILINE)
+# Line prefixes that belong to a unified diff
+_DIFF_LINE_PREFIXES = ('diff', 'index', '---', '+++', '@@', ' ', '-', '+', '\\')
+# Words that mark a line as review commentary rather than diff content
+_REVIEW_WORD_RE = re.compile(r'correctness|security|edge case|style|maintainability|review', re.IGNORECASE)
+# First character of a line kept by fix_patch_for_current_files -> prefix it must have
+# ('' means the first character alone is enough; unlisted characters are dropped)
+_VALID_DIFF_FIRST = {'d': 'diff --git', 'i': 'index ', '@': '@@', ' ': '', '-': '', '+': '', '\\': ''}
+# Hunk header: @@ -start[,count] +start[,count] @@
+_HUNK_RE = re.compile(r'@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
+
+def _count_patch_lines(patch_text: str) -> tuple[int, int]:
+    """
+    (added, removed) line counts of a unified diff in one pass over its lines.
+    File headers ('+++ b/...', '--- a/...', '/dev/null') are not counted; added or
+    removed lines whose own text starts with '++' or '--' are.
+    """
+    added = removed = 0
+    for line in patch_text.splitlines():
+        first = line[:1]
+        if first == '+':
+            if not line.startswith(('+++ b/', '+++ /dev/null')):
+                added += 1
+        elif first == '-':
+            if not line.startswith(('--- a/', '--- /dev/null')):
+                removed += 1
+    return added, removed
+
 def extract_diff(text: str) -> str:
     """
     Extract a unified diff from a model response.
@@ -1972,14 +1138,15 @@ def extract_diff(text: str) -> str:
     Aligned with run_autopr.py
     """
     # Prefer fenced diff
-    m = re.search(r"```diff\s*(.*?)```", text, re.DOTALL | re.IGNORECASE)
+    m = _FENCED_DIFF_RE.search(text)
     if m:
         diff_text = m.group(1).strip() + "\n"
     else:
-        # Else raw diff
-        m2 = re.search(r"(diff --git.*)", text, re.DOTALL)
-        if m2:
-            diff_text = m2.group(1).strip() + "\n"
+        # Else raw diff: everything from the first 'diff --git' on (a plain substring
+        # search, no regex needed for a fixed literal)
+        start = text.find("diff --git")
+        if start != -1:
+            diff_text = text[start:].strip() + "\n"
         else:
             return ""
     
@@ -1997,40 +1164,42 @@ def validate_diff_format(diff_text: str) -> bool:
     """
     Validate that the diff is in proper git diff format.
     Returns True if valid, False otherwise.
+    Works on the string directly: no per-line split of the whole patch.
     """
     if not diff_text or not diff_text.strip():
         return False
     
-    lines = diff_text.split('\n')
-    
-    # Must start with 'diff --git'
-    if not any(line.startswith('diff --git') for line in lines[:10]):
+    # Must start with 'diff --git' within the first 10 lines
+    head_end = -1
+    for _ in range(10):
+        head_end = diff_text.find('\n', head_end + 1)
+        if head_end == -1:
+            head_end = len(diff_text)
+            break
+    head = diff_text[:head_end]
+    if not (head.startswith('diff --git') or '\ndiff --git' in head):
         return False
     
-    # Check for valid diff structure
-    has_file_header = False
-    has_hunk = False
+    # Must contain at least one hunk header
+    if not (diff_text.startswith('@@') or '\n@@' in diff_text):
+        return False
     
-    for line in lines:
-        if line.startswith('diff --git'):
-            has_file_header = True
-        elif line.startswith('@@'):
-            has_hunk = True
-        # Check for review comments mixed in (lines that look like explanations)
-        elif (line.strip() and 
-              not line.startswith(('diff', 'index', '---', '+++', '@@', ' ', '-', '+', '\\', '#')) and
-              not line.startswith('```') and
-              len(line) > 50 and
-              ('correctness' in line.lower() or 
-               'security' in line.lower() or 
-               'edge case' in line.lower() or
-               'style' in line.lower() or
-               'maintainability' in line.lower() or
-               'review' in line.lower())):
+    # Check for review comments mixed in (lines that look like explanations):
+    # only the lines holding a review word are sliced out and inspected
+    pos = 0
+    while True:
+        m = _REVIEW_WORD_RE.search(diff_text, pos)
+        if not m:
+            return True
+        line_start = diff_text.rfind('\n', 0, m.start()) + 1
+        line_end = diff_text.find('\n', m.end())
+        if line_end == -1:
+            line_end = len(diff_text)
+        line = diff_text[line_start:line_end]
+        if len(line) > 50 and not line.startswith(_DIFF_LINE_PREFIXES + ('#', '```')):
             # Likely a review comment, not part of diff
             return False
-    
-    return has_file_header and has_hunk
+        pos = line_end + 1
 
 def extract_review_comments(text: str) -> str:
     """
@@ -2062,119 +1231,140 @@ def extract_review_comments(text: str) -> str:
         return "\n\n".join(review_sections)
     return ""
 
-def fix_malformed_diff(diff_text: str) -> str:
+def _is_review_comment(line: str) -> bool:
+    """A long, non-diff line that reads like reviewer commentary."""
+    return (len(line) > 50 and
+            not line.startswith(_DIFF_LINE_PREFIXES) and
+            (_REVIEW_WORD_RE.search(line) is not None or line.startswith('Overall,')))
+
+
+def _filter_diff_lines(diff_text: str, skip_preamble: bool = False) -> list[str]:
     """
-    Attempt to fix a malformed diff by removing review comments and invalid lines.
+    Single pass over the diff: drop review-comment lines and, with skip_preamble,
+    anything before the first 'diff --git' header.
     """
-    lines = diff_text.split('\n')
-    cleaned_lines = []
-    in_diff = False
-    
-    for i, line in enumerate(lines):
-        # Start of a new file diff
-        if line.startswith('diff --git'):
-            in_diff = True
-            cleaned_lines.append(line)
-            continue
-        
+    kept = []
+    in_diff = not skip_preamble
+    for line in diff_text.split('\n'):
         if not in_diff:
+            if not line.startswith('diff --git'):
+                continue
+            in_diff = True
+        if _is_review_comment(line):
             continue
-        
-        # Valid diff lines
-        if (line.startswith(('index ', '---', '+++', '@@', ' ', '-', '+', '\\')) or
-            line.startswith('diff --git')):
-            cleaned_lines.append(line)
-        # Skip review comments (lines that look like explanations)
-        elif (line.strip() and 
-              len(line) > 50 and
-              ('correctness' in line.lower() or 
-               'security' in line.lower() or 
-               'edge case' in line.lower() or
-               'style' in line.lower() or
-               'maintainability' in line.lower() or
-               'review' in line.lower() or
-               line.startswith('- **') or
-               line.startswith('Overall,'))):
-            # Skip review comment lines
-            continue
-        elif line.strip() == '':
-            # Keep empty lines (they're part of context)
-            cleaned_lines.append(line)
-        else:
-            # Unknown line - might be part of diff, keep it but log warning
-            cleaned_lines.append(line)
-    
-    return '\n'.join(cleaned_lines)
+        kept.append(line)
+    return kept
+
+
+def fix_malformed_diff(diff_text: str) -> str:
+    """
+    Attempt to fix a malformed diff by removing review comments and invalid lines.
+    """
+    return '\n'.join(_filter_diff_lines(diff_text, skip_preamble=True))
 
 def clean_diff(diff_text: str) -> str:
     """
     Clean and fix common issues in generated diffs.
     Also removes review comments that may have been mixed in.
     """
-    lines = diff_text.split('\n')
-    cleaned_lines = []
-    i = 0
-    
-    while i < len(lines):
-        line = lines[i]
-        
-        # Skip review comments (lines that look like explanations)
-        if (line.strip() and 
-            not line.startswith(('diff', 'index', '---', '+++', '@@', ' ', '-', '+', '\\')) and
-            len(line) > 50 and
-            ('correctness' in line.lower() or 
-             'security' in line.lower() or 
-             'edge case' in line.lower() or
-             'style' in line.lower() or
-             'maintainability' in line.lower() or
-             'review' in line.lower() or
-             line.startswith('- **') or
-             line.startswith('Overall,'))):
-            # Skip review comment lines
-            i += 1
-            continue
-        
-        # Skip no-op changes (removing and adding the same line)
-        if i + 1 < len(lines):
-            next_line = lines[i + 1]
-            if line.startswith('-') and next_line.startswith('+'):
-                removed = line[1:].strip()
-                added = next_line[1:].strip()
-                if removed == added:
-                    # Skip both lines (no-op change)
-                    i += 2
-                    continue
-        
-        # Fix missing newline at end of file markers
-        if line.startswith('\\ No newline at end of file'):
-            # Ensure proper format
-            if i > 0 and not lines[i-1].endswith('\n'):
-                pass  # Keep it
-        
-        # Fix incomplete diff headers
-        if line.startswith('diff --git') and i + 1 < len(lines):
-            # Ensure we have proper index line
-            if not lines[i+1].startswith('index ') and not lines[i+1].startswith('---'):
-                # Try to fix by checking if next line is a file path
-                pass
-        
-        cleaned_lines.append(line)
-        i += 1
+    cleaned = '\n'.join(_filter_diff_lines(diff_text))
     
-    # Join and ensure proper format
-    cleaned = '\n'.join(cleaned_lines)
+    # Skip no-op changes (removing and adding the same line, ignoring surrounding whitespace)
+    cleaned = _NOOP_PAIR_RE.sub('', cleaned)
     
     # Remove duplicate file separators
     # If we see "diff --git" immediately after another "diff --git" without proper separation
-    cleaned = re.sub(r'(diff --git[^\n]+\n)(diff --git)', r'\1\n\2', cleaned)
+    cleaned = _DIFF_DUP_SEP_RE.sub(r'\1\n\2', cleaned)
     
     return cleaned
 
+# --3way reads and writes the index, so concurrent per-file applies take turns on it
+_GIT_INDEX_LOCK = threading.Lock()
+
+def _rank_strategies_by_error(stderr: str, strategies: list) -> list:
+    """
+    Reorder the remaining `git apply` strategies using the first attempt's error.
+    A patch git cannot parse fails every strategy alike, so none are left to try.
+    Whitespace errors try --ignore-whitespace next; context mismatches try --3way next.
+    """
+    err = stderr.lower()
+    if "corrupt patch" in err or "no valid patches" in err:
+        return []
+    if "whitespace" in err:
+        preferred = "--ignore-whitespace"
+    elif "patch does not apply" in err or "while searching for" in err:
+        preferred = "--3way"
+    else:
+        return strategies
+    # Stable: the preferred strategy moves to the front, the rest keep their order
+    return sorted(strategies, key=lambda s: preferred not in s[0])
+
+def _try_apply_strategies(cwd: Path, strategies: list, log_first_error: bool = False):
+    """
+    Run `git apply` strategies in order; return the name of the first that succeeds, else None.
+    Plain `git apply` is all-or-nothing, so the first strategy doubles as the dry run: its
+    error decides which strategy goes next, and an unparseable patch stops the loop at once.
+    `--3way` can leave conflict markers behind, so it is dry-run with `--check` first and
+    only applied for real when the check passes.
+    """
+    if not strategies:
+        return None
+    
+    def run(strategy_cmd, capture_stderr=False):
+        # Only returncode matters; stderr is kept (undecoded) when asked for
+        if "--3way" in strategy_cmd:
+            with _GIT_INDEX_LOCK:
+                check_cmd = strategy_cmd[:2] + ["--check"] + strategy_cmd[2:]
+                check = subprocess.run(check_cmd, cwd=cwd, stdout=subprocess.DEVNULL,
+                                       stderr=subprocess.DEVNULL, timeout=30)
+                if check.returncode != 0:
+                    return check
+                return subprocess.run(strategy_cmd, cwd=cwd, stdout=subprocess.DEVNULL,
+                                      stderr=subprocess.PIPE if capture_stderr else subprocess.DEVNULL,
+                                      timeout=30)
+        return subprocess.run(strategy_cmd, cwd=cwd, stdout=subprocess.DEVNULL,
+                              stderr=subprocess.PIPE if capture_stderr else subprocess.DEVNULL,
+                              timeout=30)
+    
+    (first_cmd, first_name), remaining = strategies[0], strategies[1:]
+    try:
+        result = run(first_cmd, capture_stderr=True)
+        if result.returncode == 0:
+            return first_name
+        error_msg = (result.stderr or b"").decode('utf-8', 'replace')
+        # Log the error for debugging (first strategy only to avoid spam)
+        if log_first_error and error_msg:
+            short_msg = error_msg[:200]
+            if "corrupt" in short_msg.lower() or "error:" in short_msg.lower():
+                print(f"   Debug: {short_msg}")
+        remaining = _rank_strategies_by_error(error_msg, remaining)
+    except (subprocess.TimeoutExpired, OSError):
+        pass
+    
+    for strategy_cmd, strategy_name in remaining:
+        try:
+            if run(strategy_cmd).returncode == 0:
+                return strategy_name
+        except (subprocess.TimeoutExpired, OSError):
+            continue
+    return None
+
 def apply_patch(cwd: Path, patch_text: str) -> Path:
     """Apply a patch to the repository - aligned with run_autopr.py"""
     patch_file = cwd / "crewai_patch.diff"
     patch_file.write_text(patch_text, encoding="utf-8")
     
+    # A patch that reverses cleanly is already in the tree (e.g. the agent re-emitted
+    # an applied diff): skip the strategy chain, whose fallbacks could apply it twice
+    try:
+        reverse = subprocess.run(["git", "apply", "--reverse", "--check", str(patch_file)],
+                                 cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=30)
+        if reverse.returncode == 0:
+            print(f"✓ Patch already applied, nothing to do")
+            return patch_file
+    except (subprocess.TimeoutExpired, OSError):
+        pass
+    
     # Try to apply the patch with multiple strategies
     strategies = [
         (["git", "apply", "--whitespace=fix", str(patch_file)], "whitespace fix"),
@@ -2184,43 +1374,29 @@ def apply_patch(cwd: Path, patch_text: str) -> Path:
         (["git", "apply", "-C1", str(patch_file)], "reduce context (-C1)"),
     ]
     
-    for strategy_cmd, strategy_name in strategies:
-        try:
-            result = subprocess.run(strategy_cmd, cwd=cwd, capture_output=True, text=True, timeout=30)
-            if result.returncode == 0:
-                print(f"✓ Patch applied successfully using {strategy_name}")
-                return patch_file
-            else:
-                # Log the error for debugging (first strategy only to avoid spam)
-                if strategy_name == "whitespace fix" and result.stderr:
-                    error_msg = result.stderr[:200] if len(result.stderr) > 200 else result.stderr
-                    if "corrupt" in error_msg.lower() or "error:" in error_msg.lower():
-                        print(f"   Debug: {error_msg}")
-        except subprocess.TimeoutExpired:
-            continue
-        except Exception as e:
-            continue
+    strategy_name = _try_apply_strategies(cwd, strategies, log_first_error=True)
+    if strategy_name:
+        print(f"✓ Patch applied successfully using {strategy_name}")
+        return patch_file
     
-    # If all standard strategies failed, try file-by-file application
+    # If all standard strategies failed, try file-by-file application.
+    # The fallbacks below share one line split of the patch.
+    patch = index_patch(patch_text)
     print(f"⚠ Standard patch application failed. Trying file-by-file approach...")
-    if apply_patch_file_by_file(cwd, patch_text):
+    if apply_patch_file_by_file(cwd, patch):
         print(f"✓ Patch applied successfully using file-by-file method")
         return patch_file
     
     # If file-by-file also failed, try to fix and retry
     print(f"⚠ File-by-file approach failed. Attempting to fix patch...")
-    fixed_patch = fix_patch_for_current_files(cwd, patch_text)
-    if fixed_patch and fixed_patch != patch_text:
+    fixed_patch = fix_patch_for_current_files(patch)
+    if fixed_patch:
         patch_file.write_text(fixed_patch, encoding="utf-8")
         # Retry with fixed patch
-        for strategy_cmd, strategy_name in strategies[:3]:  # Try first 3 strategies
-            try:
-                result = subprocess.run(strategy_cmd, cwd=cwd, capture_output=True, text=True, timeout=30)
-                if result.returncode == 0:
-                    print(f"✓ Patch applied successfully after fixing (using {strategy_name})")
-                    return patch_file
-            except Exception:
-                continue
+        strategy_name = _try_apply_strategies(cwd, strategies[:3])  # Try first 3 strategies
+        if strategy_name:
+            print(f"✓ Patch applied successfully after fixing (using {strategy_name})")
+            return patch_file
     
     # Last resort: try using 'patch' command directly (if available)
     print(f"⚠ Git apply failed. Trying 'patch' command as last resort...")
@@ -2242,7 +1418,7 @@ def apply_patch(cwd: Path, patch_text: str) -> Path:
     
     # All git/patch command attempts failed - try direct file editing as last resort
     print(f"⚠ All standard methods failed. Attempting direct file editing...")
-    if apply_patch_directly(cwd, patch_text):
+    if apply_patch_directly(cwd, patch):
         print(f"✓ Patch applied successfully using direct file editing")
         return patch_file
     
@@ -2253,219 +1429,238 @@ def apply_patch(cwd: Path, patch_text: str) -> Path:
     print(f"   - Patch file: {patch_file}")
     
     # Check if any changes were made (partial success)
+    invalidate_git_snapshot(cwd)
     if has_changes(cwd):
         print(f"⚠ Some changes may have been applied. Check 'git status' to see what changed.")
     
     # Don't raise - we've tried everything, but don't fail the whole process
     return patch_file
 
-def split_patch_by_file(patch_text: str) -> list[tuple[str, str]]:
+@dataclass
+class PatchIndex:
     """
-    Split a multi-file patch into individual file patches.
-    Returns list of (file_path, file_patch) tuples.
+    A patch split into lines once, shared by every fallback applier.
+    lines: the patch split on '\n'; file_slices: (file_path, slice of lines) per file diff.
     """
-    files = []
-    current_file = None
-    current_patch = []
+    lines: list[str]
+    file_slices: list[tuple[str, slice]] = field(default_factory=list)
     
+    def file_patches(self) -> list[tuple[str, str]]:
+        """(file_path, file_patch) per file; each section ends with a newline so git accepts it."""
+        return [(path, '\n'.join(self.lines[sl]) + '\n') for path, sl in self.file_slices]
+
+def index_patch(patch_text: str) -> PatchIndex:
+    """
+    Split a multi-file patch into lines and record where each file's diff starts and ends.
+    """
     lines = patch_text.split('\n')
-    i = 0
+    # A trailing newline leaves one empty element; it belongs to no section
+    end = len(lines) - 1 if lines and lines[-1] == '' else len(lines)
+    index = PatchIndex(lines)
     
-    while i < len(lines):
+    current_file = None
+    current_start = 0
+    for i in range(end):
         line = lines[i]
-        
         # Start of a new file diff
         if line.startswith('diff --git'):
             # Save previous file if exists
-            if current_file and current_patch:
-                files.append((current_file, '\n'.join(current_patch)))
+            if current_file:
+                index.file_slices.append((current_file, slice(current_start, i)))
             
             # Extract file path
             # Format: diff --git a/path b/path
             parts = line.split()
             if len(parts) >= 4:
-                file_path = parts[2].lstrip('a/')
-                current_file = file_path
-                current_patch = [line]
+                current_file = parts[2].removeprefix('a/')
+                current_start = i
             else:
                 current_file = None
-                current_patch = []
-        elif current_file:
-            current_patch.append(line)
-        
-        i += 1
     
     # Save last file
-    if current_file and current_patch:
-        files.append((current_file, '\n'.join(current_patch)))
+    if current_file:
+        index.file_slices.append((current_file, slice(current_start, end)))
     
-    return files
+    return index
 
-def apply_patch_file_by_file(cwd: Path, patch_text: str) -> bool:
+def apply_patch_file_by_file(cwd: Path, patch: PatchIndex) -> bool:
     """
     Apply patch file-by-file as a fallback strategy.
     Returns True if at least one file was successfully patched.
     """
-    files = split_patch_by_file(patch_text)
+    files = patch.file_patches()
     if not files:
         return False
     
-    success_count = 0
-    for file_path, file_patch in files:
-        target_file = cwd / file_path
-        if not target_file.exists():
-            print(f"⚠ File {file_path} does not exist, skipping...")
-            continue
-        
-        # Create temporary patch file for this single file
-        temp_patch = cwd / f"crewai_patch_{file_path.replace('/', '_')}.diff"
-        try:
-            temp_patch.write_text(file_patch, encoding="utf-8")
-            
-            # Try to apply this single-file patch
-            strategies = [
-                ["git", "apply", "--whitespace=fix", str(temp_patch)],
-                ["git", "apply", "--ignore-whitespace", str(temp_patch)],
-                ["git", "apply", "--3way", str(temp_patch)],
-            ]
-            
-            applied = False
-            for strategy in strategies:
-                result = subprocess.run(strategy, cwd=cwd, capture_output=True, text=True, timeout=30)
-                if result.returncode == 0:
-                    print(f"✓ Applied patch to {file_path}")
-                    success_count += 1
-                    applied = True
-                    break
-            
-            if not applied:
-                # Try using 'patch' command as last resort (if available)
-                try:
-                    # patch command needs input from stdin or file
-                    with open(temp_patch, 'r') as pf:
-                        result = subprocess.run(["patch", "-p1", str(target_file)],
-                                              cwd=cwd, stdin=pf, capture_output=True, text=True, timeout=30)
-                        if result.returncode == 0:
-                            print(f"✓ Applied patch to {file_path} using 'patch' command")
-                            success_count += 1
-                            applied = True
-                except (subprocess.TimeoutExpired, FileNotFoundError):
-                    # patch command not available or timed out - that's okay
-                    pass
-                except Exception as e:
-                    # Other errors - log but continue
-                    print(f"⚠ Patch command error for {file_path}: {e}")
-                
-                if not applied:
-                    print(f"⚠ Failed to apply patch to {file_path} (will try other methods)")
-        finally:
-            # Clean up temp patch file
-            if temp_patch.exists():
-                temp_patch.unlink()
+    # Per-file patches live in a temp dir outside the working tree (no git status noise)
+    tmpdir = Path(tempfile.mkdtemp(prefix='crewai_patch_'))
+    try:
+        # Each section targets a distinct path, so the git apply subprocesses can overlap
+        with ThreadPoolExecutor(max_workers=min(8, len(files))) as executor:
+            results = list(executor.map(
+                lambda item: _apply_single_file_patch(cwd, tmpdir, item[0], item[1]), files
+            ))
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
     
-    return success_count > 0
+    return any(results)
+
+def _apply_single_file_patch(cwd: Path, tmpdir: Path, file_path: str, file_patch: str) -> bool:
+    """Apply one file's section of a patch; True if it applied."""
+    target_file = cwd / file_path
+    if not target_file.exists():
+        print(f"⚠ File {file_path} does not exist, skipping...")
+        return False
+    
+    # Temporary patch file for this single file
+    temp_patch = tmpdir / f"{file_path.replace('/', '_')}.diff"
+    temp_patch.write_text(file_patch, encoding="utf-8")
+    
+    # Try to apply this single-file patch
+    strategies = [
+        (["git", "apply", "--whitespace=fix", str(temp_patch)], "whitespace fix"),
+        (["git", "apply", "--ignore-whitespace", str(temp_patch)], "ignore whitespace"),
+        (["git", "apply", "--3way", str(temp_patch)], "3-way merge"),
+    ]
+    
+    if _try_apply_strategies(cwd, strategies) is not None:
+        print(f"✓ Applied patch to {file_path}")
+        return True
+    
+    # Try using 'patch' command as last resort (if available)
+    try:
+        # patch command needs input from stdin or file
+        with open(temp_patch, 'r') as pf:
+            result = subprocess.run(["patch", "-p1", str(target_file)],
+                                  cwd=cwd, stdin=pf, stdout=subprocess.DEVNULL,
+                                  stderr=subprocess.DEVNULL, timeout=30)
+            if result.returncode == 0:
+                print(f"✓ Applied patch to {file_path} using 'patch' command")
+                return True
+    except (subprocess.TimeoutExpired, FileNotFoundError):
+        # patch command not available or timed out - that's okay
+        pass
+    except Exception as e:
+        # Other errors - log but continue
+        print(f"⚠ Patch command error for {file_path}: {e}")
+    
+    print(f"⚠ Failed to apply patch to {file_path} (will try other methods)")
+    return False
 
-def apply_patch_directly(cwd: Path, patch_text: str) -> bool:
+def apply_patch_directly(cwd: Path, patch: PatchIndex) -> bool:
     """
     Apply patch by directly editing files (last resort when git apply fails).
     Parses the diff and applies changes directly to files.
     Returns True if at least one file was successfully modified.
     """
-    import re
-    
-    files = split_patch_by_file(patch_text)
-    if not files:
+    if not patch.file_slices:
         return False
     
     success_count = 0
     
-    for file_path, file_patch in files:
+    for file_path, file_slice in patch.file_slices:
         target_file = cwd / file_path
         if not target_file.exists():
             print(f"⚠ File {file_path} does not exist, skipping direct edit...")
             continue
         
         try:
-            # Read current file
-            current_content = target_file.read_text(encoding='utf-8')
-            lines = current_content.split('\n')
-            
-            # Parse the patch to extract changes
-            patch_lines = file_patch.split('\n')
-            new_lines = lines.copy()
-            offset = 0
+            # Read current file as bytes lines, keeping each line's own terminator
+            current_content = target_file.read_bytes()
+            lines = current_content.splitlines(keepends=True)
+            eol = b'\r\n' if lines and lines[0].endswith(b'\r\n') else b'\n'
+            # A final line without terminator gets one while editing, removed again on write
+            missing_final_eol = bool(lines) and not lines[-1].endswith((b'\n', b'\r'))
+            if missing_final_eol:
+                lines[-1] += eol
+            
+            def line_equals(idx, content):
+                # Terminators are stripped only for the lines a hunk actually inspects
+                return idx < len(lines) and lines[idx].rstrip(b'\r\n') == content
+            
+            # Parse pass: collect every hunk as (old_start, old_count, ops)
+            patch_lines = patch.lines[file_slice]
+            hunks = []
             
             i = 0
             while i < len(patch_lines):
                 line = patch_lines[i]
                 
                 # Look for hunk headers: @@ -start,count +start,count @@
-                hunk_match = re.match(r'@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@', line)
+                # (prefix test first so most lines never reach the regex engine)
+                hunk_match = _HUNK_RE.match(line) if line.startswith('@@') else None
                 if hunk_match:
                     old_start = int(hunk_match.group(1)) - 1  # Convert to 0-based
                     old_count = int(hunk_match.group(2)) if hunk_match.group(2) else 1
-                    new_start = int(hunk_match.group(3)) - 1
-                    new_count = int(hunk_match.group(4)) if hunk_match.group(4) else 1
                     
                     # Process hunk lines
                     i += 1
                     hunk_lines = []
-                    context_lines = []
                     
                     while i < len(patch_lines) and not patch_lines[i].startswith('@@'):
                         patch_line = patch_lines[i]
                         if patch_line.startswith(' '):
                             # Context line - verify it matches
-                            context_lines.append(patch_line[1:])
-                            hunk_lines.append(('context', patch_line[1:]))
+                            hunk_lines.append(('context', patch_line[1:].encode('utf-8')))
                         elif patch_line.startswith('-'):
                             # Line to remove
-                            hunk_lines.append(('remove', patch_line[1:]))
+                            hunk_lines.append(('remove', patch_line[1:].encode('utf-8')))
                         elif patch_line.startswith('+'):
                             # Line to add
-                            hunk_lines.append(('add', patch_line[1:]))
+                            hunk_lines.append(('add', patch_line[1:].encode('utf-8') + eol))
                         i += 1
                     
-                    # Apply hunk to file
-                    # Find the context in the file
-                    context_found = False
-                    search_start = max(0, old_start - 5)
-                    search_end = min(len(new_lines), old_start + old_count + 5)
-                    
-                    for search_pos in range(search_start, search_end - len(context_lines) + 1):
-                        # Check if context matches
-                        matches = True
-                        for j, (op, content) in enumerate(hunk_lines[:min(3, len(hunk_lines))]):
-                            if op == 'context':
-                                if search_pos + j >= len(new_lines) or new_lines[search_pos + j] != content:
-                                    matches = False
-                                    break
-                        
-                        if matches:
-                            context_found = True
-                            # Apply changes
-                            pos = search_pos
-                            for op, content in hunk_lines:
-                                if op == 'context':
-                                    pos += 1
-                                elif op == 'remove':
-                                    if pos < len(new_lines) and new_lines[pos] == content:
-                                        new_lines.pop(pos)
-                                elif op == 'add':
-                                    new_lines.insert(pos, content)
-                                    pos += 1
-                            break
-                    
-                    if not context_found:
-                        print(f"⚠ Could not find context for hunk in {file_path}, skipping...")
-                        continue
+                    hunks.append((old_start, old_count, hunk_lines))
+                else:
+                    i += 1
+            
+            # Locate each hunk in the original file. Only the context lines among the
+            # first three hunk lines are compared, within 5 lines of the stated start.
+            placed = []
+            for old_start, old_count, hunk_lines in hunks:
+                context_count = sum(1 for op, _ in hunk_lines if op == 'context')
+                search_start = max(0, old_start - 5)
+                search_end = min(len(lines), old_start + old_count + 5)
+                # (offset, text) of the context lines to probe, built once per hunk
+                probes = [(j, content) for j, (op, content) in enumerate(hunk_lines[:3]) if op == 'context']
+                
+                for search_pos in range(search_start, search_end - context_count + 1):
+                    if all(line_equals(search_pos + j, content) for j, content in probes):
+                        placed.append((search_pos, hunk_lines))
+                        break
                 else:
-                    i += 1
+                    print(f"⚠ Could not find context for hunk in {file_path}, skipping...")
+            
+            # Build pass: one cursor over the original lines, copying unchanged ranges
+            # by slice and emitting each hunk's edits in file order
+            placed.sort(key=lambda h: h[0])
+            new_lines = []
+            src_idx = 0
+            for pos, hunk_lines in placed:
+                if pos < src_idx:
+                    print(f"⚠ Hunk overlaps a previous hunk in {file_path}, skipping...")
+                    continue
+                new_lines.extend(lines[src_idx:pos])
+                src_idx = pos
+                for op, content in hunk_lines:
+                    if op == 'context':
+                        if src_idx < len(lines):
+                            new_lines.append(lines[src_idx])
+                            src_idx += 1
+                    elif op == 'remove':
+                        # Only drop the line if it is really there
+                        if line_equals(src_idx, content):
+                            src_idx += 1
+                    elif op == 'add':
+                        new_lines.append(content)
+            new_lines.extend(lines[src_idx:])
             
             # Write modified file
-            new_content = '\n'.join(new_lines)
+            if missing_final_eol and new_lines:
+                new_lines[-1] = new_lines[-1].rstrip(b'\r\n')
+            new_content = b''.join(new_lines)
             if new_content != current_content:
-                target_file.write_text(new_content, encoding='utf-8')
+                target_file.write_bytes(new_content)
                 print(f"✓ Applied changes to {file_path} using direct editing")
                 success_count += 1
             else:
@@ -2477,19 +1672,15 @@ def apply_patch_directly(cwd: Path, patch_text: str) -> bool:
     
     return success_count > 0
 
-def fix_patch_for_current_files(cwd: Path, patch_text: str) -> str:
+def fix_patch_for_current_files(patch: PatchIndex) -> Optional[str]:
     """
     Attempt to fix patch by adjusting it to match current file structure.
     This is a best-effort attempt - may not always work.
+    Only called after file-by-file application already failed, so it goes straight to
+    fixing the patch format.
     """
-    # First, try to split and apply file-by-file
-    if apply_patch_file_by_file(cwd, patch_text):
-        # If file-by-file worked, return the original patch (it's been applied)
-        return patch_text
-    
-    # If that didn't work, try to fix the patch format
     # Remove problematic sections and try to reconstruct
-    lines = patch_text.split('\n')
+    lines = patch.lines
     fixed_lines = []
     i = 0
     
@@ -2506,34 +1697,25 @@ def fix_patch_for_current_files(cwd: Path, patch_text: str) -> str:
                     i += 2
                     continue
         
-        # Keep valid diff lines
-        if (line.startswith('diff --git') or
-            line.startswith('index ') or
-            line.startswith('---') or
-            line.startswith('+++') or
-            line.startswith('@@') or
-            line.startswith(' ') or
-            line.startswith('-') or
-            line.startswith('+') or
-            line.startswith('\\')):
-            fixed_lines.append(line)
+        # Keep valid diff lines: dispatch on the first character, then at most one prefix check
+        if line:
+            required = _VALID_DIFF_FIRST.get(line[0], False)
+            if required == '' or (required and line.startswith(required)):
+                fixed_lines.append(line)
         
         i += 1
     
-    fixed_patch = '\n'.join(fixed_lines)
-    
-    # If we made changes, return the fixed version
-    if fixed_patch != patch_text:
-        return fixed_patch
+    # If we made changes, return the fixed version (newline-terminated, or git
+    # rejects the last line as a corrupt patch and the retry is wasted)
+    if fixed_lines and fixed_lines != lines:
+        return '\n'.join(fixed_lines) + '\n'
     
     # Otherwise, return None to indicate we can't auto-fix
     return None
 
-def has_changes(cwd: Path) -> bool:
-    """Check if there are uncommitted changes - aligned with run_autopr.py"""
-    r = subprocess.run(["git", "status", "--porcelain"], 
-                      cwd=cwd, text=True, capture_output=True, check=True)
-    return bool(r.stdout.strip())
+def _print_bullets(header: str, items) -> None:
+    """Print a header and one '   - item' line per item as a single write."""
+    print("\n".join([header, *(f"   - {item}" for item in items)]))
 
 def apply_implementation(result, issue_number, work_dir, enable_testing: bool = None):
     """Apply the implementation to actual files - aligned with run_autopr.py
@@ -2584,14 +1766,15 @@ def apply_implementation(result, issue_number, work_dir, enable_testing: bool =
     output_file = work_dir / "implementations" / f"issue_{issue_number}_plan.md"
     output_file.parent.mkdir(exist_ok=True)
     
-    # Extract diff from result - try multiple ways to get full output
-    result_text = str(result) if result else ""
-    
-    # If result is a CrewAI result object, try to get more details
-    if result and hasattr(result, 'raw'):
-        raw_text = str(result.raw) if result.raw else ""
-        if raw_text and len(raw_text) > len(result_text):
-            result_text = raw_text
+    # Extract diff from result - try multiple ways to get full output.
+    # A CrewAI result's .raw is the full agent text (its str() is derived from it),
+    # so only format the object itself when there is no raw output.
+    if not result:
+        result_text = ""
+    elif getattr(result, 'raw', None):
+        result_text = str(result.raw)
+    else:
+        result_text = str(result)
     
     # Try to get task outputs separately
     task_outputs = []
@@ -2632,10 +1815,11 @@ def apply_implementation(result, issue_number, work_dir, enable_testing: bool =
     # Legacy: Also try to extract diff for backward compatibility/display
     patch = extract_diff(result_text)  # Keep for display in plan file
     
-    # Save full result with metadata
-    with open(output_file, 'w', encoding='utf-8') as f:
+    # Save full result with metadata (1 MiB buffer: the many small writes below,
+    # json.dump included, reach the OS as a few large ones)
+    with open(output_file, 'w', encoding='utf-8', buffering=1 << 20) as f:
         f.write(f"# Implementation Plan for Issue #{issue_number}\n\n")
-        f.write(f"**Generated:** {__import__('datetime').datetime.now().isoformat()}\n\n")
+        f.write(f"**Generated:** {datetime.now().isoformat()}\n\n")
         f.write("## Full Crew Output\n\n")
         f.write(result_text)
         
@@ -2648,7 +1832,7 @@ def apply_implementation(result, issue_number, work_dir, enable_testing: bool =
         if structured_changes and "error" not in structured_changes:
             f.write("\n\n## Structured Changes (JSON)\n\n")
             f.write("```json\n")
-            f.write(json.dumps(structured_changes, indent=2))
+            json.dump(structured_changes, f, indent=2)
             f.write("\n```\n")
         
         # Save patch (generated by git diff, or legacy if available)
@@ -2676,8 +1860,8 @@ def apply_implementation(result, issue_number, work_dir, enable_testing: bool =
     export_dir = Path.home() / "ai-dev-team" / "exports"
     if export_dir.exists():
         export_file = export_dir / f"issue_{issue_number}_plan.md"
-        import shutil
-        shutil.copy(output_file, export_file)
+        # copyfile: kernel-side copy (sendfile on Linux), no permission-bit copying
+        shutil.copyfile(output_file, export_file)
         print(f"✓ Output also exported to: {export_file}")
     
     # Apply structured changes (new approach - no LLM diffs)
@@ -2702,9 +1886,7 @@ def apply_implementation(result, issue_number, work_dir, enable_testing: bool =
         is_valid, validation_errors = validate_structured_changes(structured_changes, work_dir)
         
         if not is_valid:
-            print(f"\n❌ Structured changes validation failed:")
-            for error in validation_errors:
-                print(f"   - {error}")
+            _print_bullets(f"\n❌ Structured changes validation failed:", validation_errors)
             print(f"\n⚠️  Changes were not applied. Review the agent output in: {output_file}")
             # B) Set meaningful missing_items when validation fails
             missing["validation_errors"] = validation_errors
@@ -2717,11 +1899,10 @@ def apply_implementation(result, issue_number, work_dir, enable_testing: bool =
             print(f"{'='*70}")
             
             success, changed_files, apply_errors = apply_structured_changes(structured_changes, work_dir)
+            invalidate_git_snapshot(work_dir)
             
             if apply_errors:
-                print(f"\n⚠️  Errors during application:")
-                for error in apply_errors:
-                    print(f"   - {error}")
+                _print_bullets(f"\n⚠️  Errors during application:", apply_errors)
                 # B) Track apply errors in missing_items
                 if "apply_errors" not in missing:
                     missing["apply_errors"] = []
@@ -2731,16 +1912,12 @@ def apply_implementation(result, issue_number, work_dir, enable_testing: bool =
             
             # C) Only proceed if changes were actually applied
             if success and changed_files:
-                print(f"\n✅ Successfully applied changes to {len(changed_files)} file(s):")
-                for file in changed_files:
-                    print(f"   - {file}")
+                _print_bullets(f"\n✅ Successfully applied changes to {len(changed_files)} file(s):", changed_files)
                 
                 # Verify changes with git status (robust check)
                 git_changed = get_git_changed_files(work_dir)
                 if git_changed:
-                    print(f"\n📋 Git reports {len(git_changed)} changed file(s):")
-                    for file in git_changed:
-                        print(f"   - {file}")
+                    _print_bullets(f"\n📋 Git reports {len(git_changed)} changed file(s):", git_changed)
                 elif changed_files:
                     print(f"\n⚠️  Warning: Applied changes but git status shows no changes")
                     print(f"   This may indicate files were written outside repo or changes were reverted")
@@ -2795,8 +1972,7 @@ def apply_implementation(result, issue_number, work_dir, enable_testing: bool =
                             print(f"✅ Patch generated successfully: {patch_file}")
                             
                             # Show patch summary
-                            lines_added = patch_content.count('\n+') - patch_content.count('\n+++')
-                            lines_removed = patch_content.count('\n-') - patch_content.count('\n---')
+                            lines_added, lines_removed = _count_patch_lines(patch_content)
                             print(f"   Files changed: {len(git_changed)}")
                             print(f"   Lines added: {lines_added}")
                             print(f"   Lines removed: {lines_removed}")
@@ -2861,6 +2037,7 @@ def apply_implementation(result, issue_number, work_dir, enable_testing: bool =
         if patch and (work_dir / ".git").exists():
             try:
                 patch_file = apply_patch(work_dir, patch)
+                invalidate_git_snapshot(work_dir)
                 if has_changes(work_dir):
                     print(f"✓ Changes detected in repository - patch applied successfully (legacy mode)")
                     patch_applied = True
@@ -2872,49 +2049,40 @@ def apply_implementation(result, issue_number, work_dir, enable_testing: bool =
     # D) Create RunState as single source of truth
     run_state = RunState()
     # C) Only set applied_ok if changes were actually applied AND git shows changes
-    run_state.applied_ok = (success and changed_files and git_changed) if ('success' in locals() and 'changed_files' in locals() and 'git_changed' in locals()) else False
-    run_state.coverage_ok = is_complete if 'is_complete' in locals() else False
+    run_state.applied_ok = bool(success and changed_files and git_changed)
+    run_state.coverage_ok = is_complete
     # B) Add validation/apply errors to run_state
     if missing.get("validation_errors"):
         run_state.errors.extend(missing["validation_errors"])
     if missing.get("apply_errors"):
         run_state.errors.extend(missing["apply_errors"])
     
-    # Get git info for RunState
-    if (work_dir / ".git").exists():
-        try:
-            result = subprocess.run(['git', 'rev-parse', '--abbrev-ref', 'HEAD'], 
-                                  cwd=work_dir, capture_output=True, text=True, check=False, timeout=5)
-            if result.returncode == 0:
-                run_state.current_branch = result.stdout.strip()
-            result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], 
-                                  cwd=work_dir, capture_output=True, text=True, check=False, timeout=5)
-            if result.returncode == 0:
-                run_state.head_sha_before = result.stdout.strip()
-        except Exception:
-            pass
+    # Get git info for RunState (branch, HEAD and changed files from one git status)
+    snapshot = get_git_snapshot(work_dir)
+    if snapshot:
+        run_state.current_branch = snapshot.branch
+        run_state.head_sha_before = snapshot.short_sha
     
     # Return implementation status (backward compatibility with dict)
     # D) Determine final status: complete only if coverage passed AND git shows changes
     final_status = "incomplete"
     implementation_complete = False
     
-    if 'is_complete' in locals() and 'git_changed' in locals():
-        if is_complete and git_changed:
-            final_status = "complete"
-            implementation_complete = True
-            run_state.coverage_ok = True
+    if is_complete and git_changed:
+        final_status = "complete"
+        implementation_complete = True
+        run_state.coverage_ok = True
     
     implementation_status = {
         "status": final_status,
         "is_complete": implementation_complete,  # Boolean flag for gating
-        "files_changed": changed_files if 'changed_files' in locals() else [],
-        "git_changed_files": get_git_changed_files(work_dir) if (work_dir / ".git").exists() else [],
-        "patch_path": str(work_dir / "crewai_patch.diff") if 'patch_applied' in locals() and patch_applied else None,
+        "files_changed": changed_files,
+        "git_changed_files": snapshot.changed_files if snapshot else [],
+        "patch_path": str(work_dir / "crewai_patch.diff") if patch_applied else None,
         "missing_items": missing,  # B) Always include missing_items (never empty dict after failure)
-        "patch_content": patch_content if 'patch_content' in locals() else None,
+        "patch_content": patch_content,
         "coverage_passed": run_state.coverage_ok,
-        "has_git_changes": bool(git_changed) if 'git_changed' in locals() else False,
+        "has_git_changes": bool(git_changed),
         "did_commit": run_state.did_commit,  # D) From RunState
         "did_push": run_state.did_push,      # D) From RunState
         "did_move_done": run_state.did_move_done,  # D) From RunState
@@ -2936,22 +2104,15 @@ def print_issue_status(issue_number: int, work_dir: Path, warnings: list[str], i
         warnings: List of warning messages
         implementation_status: Optional dict with did_commit, did_push flags
     """
+    # Collected and written once at the end instead of one print (and TTY flush) per line
+    out: list[str] = []
+    
     # Separate warnings into local and git/github categories
-    local_warnings = []
-    git_warnings = []
-    
-    for warning in warnings:
-        warning_lower = warning.lower()
-        if any(keyword in warning_lower for keyword in ['patch', 'implementation', 'plan', 'file']):
-            local_warnings.append(warning)
-        elif any(keyword in warning_lower for keyword in ['git', 'github', 'push', 'branch', 'pipeline', 'remote', 'network']):
-            git_warnings.append(warning)
-        else:
-            # Default to local if unclear
-            local_warnings.append(warning)
+    local_warnings, git_warnings = split_warnings(warnings)
     
     # Check local implementation status
     patch_file = work_dir / "crewai_patch.diff"
+    has_patch_file = patch_file.exists()
     plan_file = work_dir / "implementations" / f"issue_{issue_number}_plan.md"
     # C) Use implementation_status to determine if changes were actually applied
     if implementation_status:
@@ -2959,31 +2120,15 @@ def print_issue_status(issue_number: int, work_dir: Path, warnings: list[str], i
         files_changed = implementation_status.get("files_changed", [])
         git_changed_files = implementation_status.get("git_changed_files", [])
         patch_applied = bool(files_changed and git_changed_files and implementation_status.get("coverage_passed", False))
-    else:
-        patch_applied = has_changes(work_dir) if (work_dir / ".git").exists() else False
+    
+    # One `git status --porcelain=v2 --branch` answers branch, HEAD, upstream and dirtiness
+    is_git_repo = (work_dir / ".git").exists()
+    snapshot = get_git_snapshot(work_dir) if is_git_repo else None
+    if not implementation_status:
+        patch_applied = snapshot.dirty if snapshot else False
     
     # Check test execution status from implementation plan
-    test_status = None
-    test_executed = False
-    if plan_file.exists():
-        try:
-            plan_content = plan_file.read_text(encoding='utf-8')
-            if "## Test Results" in plan_content or "Test Execution Status" in plan_content:
-                test_executed = True
-                # Extract test status
-                status_match = re.search(r"Test Execution Status:\s*([✅❌⚠️ℹ️]+)\s*([A-Z]+)", plan_content)
-                if status_match:
-                    test_status = f"{status_match.group(1)} {status_match.group(2)}"
-                elif "Status: ✅ PASSED" in plan_content:
-                    test_status = "✅ PASSED"
-                elif "Status: ❌ FAILED" in plan_content:
-                    test_status = "❌ FAILED"
-                elif "Status: ⚠️  NO TESTS FOUND" in plan_content:
-                    test_status = "⚠️  NO TESTS FOUND"
-                else:
-                    test_status = "ℹ️  COMPLETED"
-        except:
-            pass
+    test_executed, test_status = read_plan_test_status(plan_file)
     
     # Capture ACTUAL current git branch and HEAD commit immediately before printing
     current_branch = None
@@ -2991,140 +2136,120 @@ def print_issue_status(issue_number: int, work_dir: Path, warnings: list[str], i
     git_committed = False
     git_pushed = False
     
-    if (work_dir / ".git").exists():
-        try:
-            # Get current branch
-            result = subprocess.run(['git', 'rev-parse', '--abbrev-ref', 'HEAD'], 
-                                  cwd=work_dir, capture_output=True, text=True, check=False, timeout=5)
-            if result.returncode == 0:
-                current_branch = result.stdout.strip()
-            
-            # Get HEAD commit SHA (short)
-            result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], 
-                                  cwd=work_dir, capture_output=True, text=True, check=False, timeout=5)
-            if result.returncode == 0:
-                head_sha = result.stdout.strip()
-            
-            # Use implementation_status flags if available (most accurate)
-            if implementation_status:
-                git_committed = implementation_status.get("did_commit", False)
-                git_pushed = implementation_status.get("did_push", False)
-            else:
-                # Fallback: Check if there are commits on this branch
-                result = subprocess.run(['git', 'log', '--oneline', '-1'], 
-                                      cwd=work_dir, capture_output=True, text=True, check=False, timeout=5)
-                if result.returncode == 0 and result.stdout.strip():
-                    git_committed = True
-                
-                # Check if branch is pushed (fallback method)
-                if current_branch:
-                    result = subprocess.run(['git', 'rev-parse', '--abbrev-ref', '@{u}'], 
-                                          cwd=work_dir, capture_output=True, text=True, check=False, timeout=5)
-                    if result.returncode == 0:
-                        git_pushed = True
-        except Exception as e:
-            pass
+    if snapshot:
+        current_branch = snapshot.branch
+        head_sha = snapshot.short_sha
+        
+        # Use implementation_status flags if available (most accurate)
+        if implementation_status:
+            git_committed = implementation_status.get("did_commit", False)
+            git_pushed = implementation_status.get("did_push", False)
+        else:
+            # Fallback: HEAD exists once the branch has a commit; an upstream means it was pushed
+            git_committed = snapshot.head_sha is not None
+            git_pushed = bool(current_branch and snapshot.upstream)
     
     # Print Section 1: Local Implementation & Testing
-    print(f"\n{'='*70}")
-    print(f"📦 LOCAL IMPLEMENTATION & TESTING - Issue #{issue_number}")
-    print(f"{'='*70}")
+    out.append(f"\n{'='*70}")
+    out.append(f"📦 LOCAL IMPLEMENTATION & TESTING - Issue #{issue_number}")
+    out.append(f"{'='*70}")
     
     # C) Only show success if changes were actually applied AND git shows changes
     if patch_applied:
-        print(f"✅ Code changes applied successfully to local files")
-    elif patch_file.exists():
-        print(f"⚠️  Code changes generated but not automatically applied")
-        print(f"   Patch file: {patch_file}")
-        print(f"   To apply manually:")
-        print(f"      cd {work_dir}")
-        print(f"      git apply --whitespace=fix crewai_patch.diff")
-        print(f"      # Or review and apply changes manually from the patch file")
+        out.append(f"✅ Code changes applied successfully to local files")
+    elif has_patch_file:
+        out.append(f"⚠️  Code changes generated but not automatically applied")
+        out.append(f"   Patch file: {patch_file}")
+        out.append(f"   To apply manually:")
+        out.append(f"      cd {work_dir}")
+        out.append(f"      git apply --whitespace=fix crewai_patch.diff")
+        out.append(f"      # Or review and apply changes manually from the patch file")
     else:
         # C) Check if validation failed or no changes were applied
         if implementation_status and implementation_status.get("missing_items", {}).get("_failure_reason"):
             failure_reason = implementation_status["missing_items"]["_failure_reason"]
             if failure_reason == "validation_failed":
-                print(f"❌ Code changes: Validation failed - changes not applied")
+                out.append(f"❌ Code changes: Validation failed - changes not applied")
             elif failure_reason == "apply_failed":
-                print(f"❌ Code changes: Application failed - changes not applied")
+                out.append(f"❌ Code changes: Application failed - changes not applied")
             elif failure_reason == "parse_failed":
-                print(f"❌ Code changes: Failed to parse structured changes")
+                out.append(f"❌ Code changes: Failed to parse structured changes")
             else:
-                print(f"⚠️  Code changes: Not applied (reason: {failure_reason})")
+                out.append(f"⚠️  Code changes: Not applied (reason: {failure_reason})")
         else:
-            print(f"ℹ️  Implementation plan generated (no changes applied)")
+            out.append(f"ℹ️  Implementation plan generated (no changes applied)")
     
     if plan_file.exists():
-        print(f"✅ Implementation plan: {plan_file}")
-        print(f"   Contains full code changes and implementation details")
+        out.append(f"✅ Implementation plan: {plan_file}")
+        out.append(f"   Contains full code changes and implementation details")
     
     # C) Only show test execution status if changes were actually applied
     if patch_applied:
         if test_executed:
-            print(f"\n🧪 Test Execution Status:")
+            out.append(f"\n🧪 Test Execution Status:")
             if test_status:
-                print(f"   {test_status}")
+                out.append(f"   {test_status}")
             else:
-                print(f"   ℹ️  Tests were executed (check plan file for details)")
-            print(f"   Review test results in: {plan_file}")
-            print(f"   Look for '## Test Results' section")
+                out.append(f"   ℹ️  Tests were executed (check plan file for details)")
+            out.append(f"   Review test results in: {plan_file}")
+            out.append(f"   Look for '## Test Results' section")
         else:
-            print(f"\n⚠️  Test Execution:")
-            print(f"   Tests were not executed (may have been skipped or failed to start)")
-            print(f"   Check console output above for test execution messages")
+            out.append(f"\n⚠️  Test Execution:")
+            out.append(f"   Tests were not executed (may have been skipped or failed to start)")
+            out.append(f"   Check console output above for test execution messages")
     
     if local_warnings:
-        print(f"\n⚠️  Local Warnings:")
+        out.append(f"\n⚠️  Local Warnings:")
         for warning in local_warnings:
-            print(f"   - {warning}")
+            out.append(f"   - {warning}")
     
     # Testing instructions (only if tests weren't executed)
     if not test_executed:
-        print(f"\n🧪 Manual Testing Steps:")
-    print(f"   1. Review implementation plan: {plan_file}")
-    if patch_file.exists() and not patch_applied:
-        print(f"   2. Apply patch manually (see above) or copy code from plan file")
-    print(f"   3. Test locally:")
-    print(f"      cd {work_dir}")
+        out.append(f"\n🧪 Manual Testing Steps:")
+    out.append(f"   1. Review implementation plan: {plan_file}")
+    if has_patch_file and not patch_applied:
+        out.append(f"   2. Apply patch manually (see above) or copy code from plan file")
     if (work_dir / "package.json").exists():
-        print(f"      npm start  # or: node server.js")
+        run_cmd = "npm start  # or: node server.js"
     elif (work_dir / "server.js").exists():
-        print(f"      node server.js")
+        run_cmd = "node server.js"
     else:
-        print(f"      python3 -m http.server 8000  # or your preferred method")
-    print(f"   4. Open in browser and verify functionality")
+        run_cmd = "python3 -m http.server 8000  # or your preferred method"
+    out.append(f"""   3. Test locally:
+      cd {work_dir}
+      {run_cmd}
+   4. Open in browser and verify functionality""")
     
     # Print Section 2: Git/GitHub Operations
-    print(f"\n{'='*70}")
-    print(f"🔀 GIT STATUS / SUMMARY - Issue #{issue_number}")
-    print(f"{'='*70}")
+    out.append(f"\n{'='*70}")
+    out.append(f"🔀 GIT STATUS / SUMMARY - Issue #{issue_number}")
+    out.append(f"{'='*70}")
     
-    if not (work_dir / ".git").exists():
-        print(f"ℹ️  Not a git repository - Git operations skipped")
+    if not is_git_repo:
+        out.append(f"ℹ️  Not a git repository - Git operations skipped")
     else:
         # D) Show actual current branch and HEAD commit (computed truthfully)
         # Also show feature branch used (from branch safety guard)
         if implementation_status and implementation_status.get("feature_branch"):
             feature_branch = implementation_status["feature_branch"]
             if current_branch == feature_branch:
-                print(f"📍 Current Branch: {current_branch} (feature branch used)")
+                out.append(f"📍 Current Branch: {current_branch} (feature branch used)")
             else:
-                print(f"📍 Current Branch: {current_branch}")
-                print(f"📍 Feature Branch Used: {feature_branch}")
+                out.append(f"📍 Current Branch: {current_branch}")
+                out.append(f"📍 Feature Branch Used: {feature_branch}")
         elif current_branch:
-            print(f"📍 Current Branch: {current_branch}")
+            out.append(f"📍 Current Branch: {current_branch}")
         else:
-            print(f"⚠️  Branch status unknown")
+            out.append(f"⚠️  Branch status unknown")
         
         if head_sha:
-            print(f"📍 HEAD Commit: {head_sha}")
+            out.append(f"📍 HEAD Commit: {head_sha}")
         else:
-            print(f"⚠️  HEAD commit unknown")
+            out.append(f"⚠️  HEAD commit unknown")
         
         # D) Compute committed status truthfully: check if working tree is clean AND commit was made
         # If working tree has uncommitted changes, show "Uncommitted changes: ✅"
-        has_uncommitted = has_changes(work_dir) if (work_dir / ".git").exists() else False
+        has_uncommitted = snapshot.dirty if snapshot else False
         
         # D) Use run state flags for accurate commit/push status
         if implementation_status:
@@ -3136,68 +2261,71 @@ def print_issue_status(issue_number: int, work_dir: Path, warnings: list[str], i
         
         # D) Show committed status truthfully
         if git_committed:
-            print(f"✅ Committed")
+            out.append(f"✅ Committed")
         elif has_uncommitted:
-            print(f"❌ Committed: No")
-            print(f"✅ Uncommitted changes: Yes (working tree has changes)")
+            out.append(f"❌ Committed: No")
+            out.append(f"✅ Uncommitted changes: Yes (working tree has changes)")
         else:
-            print(f"⚠️  Not committed")
+            out.append(f"⚠️  Not committed")
         
         # D) Show pushed status truthfully (only if push actually succeeded)
         if git_pushed:
-            print(f"✅ Pushed")
+            out.append(f"✅ Pushed")
         else:
-            print(f"⚠️  Not pushed")
+            out.append(f"⚠️  Not pushed")
             if current_branch:
-                print(f"   To push manually:")
-                print(f"      cd {work_dir}")
-                print(f"      git push -u origin {current_branch}")
+                out.append(f"   To push manually:")
+                out.append(f"      cd {work_dir}")
+                out.append(f"      git push -u origin {current_branch}")
         
         if git_warnings:
-            print(f"\n⚠️  Git/GitHub Warnings:")
+            out.append(f"\n⚠️  Git/GitHub Warnings:")
             for warning in git_warnings:
-                print(f"   - {warning}")
+                out.append(f"   - {warning}")
     
     # Summary
-    print(f"\n{'='*70}")
-    print(f"📊 SUMMARY - Issue #{issue_number}")
-    print(f"{'='*70}")
+    out.append(f"\n{'='*70}")
+    out.append(f"📊 SUMMARY - Issue #{issue_number}")
+    out.append(f"{'='*70}")
     
     # C) Implementation status - only show success if actually applied
     if patch_applied:
-        print(f"✅ Code changes: Applied successfully")
+        out.append(f"✅ Code changes: Applied successfully")
     else:
         # Check failure reason from missing_items
         if implementation_status and implementation_status.get("missing_items", {}).get("_failure_reason"):
             failure_reason = implementation_status["missing_items"]["_failure_reason"]
             failure_summary = implementation_status["missing_items"].get("_failure_summary", failure_reason)
-            print(f"❌ Code changes: {failure_summary}")
+            out.append(f"❌ Code changes: {failure_summary}")
         else:
-            print(f"⚠️  Code changes: Not applied (check patch file or validation errors)")
+            out.append(f"⚠️  Code changes: Not applied (check patch file or validation errors)")
     
     # Test status
     if test_executed:
         if test_status and "PASSED" in test_status:
-            print(f"✅ Tests: Executed and PASSED")
+            out.append(f"✅ Tests: Executed and PASSED")
         elif test_status and "FAILED" in test_status:
-            print(f"❌ Tests: Executed but FAILED - Review test results")
+            out.append(f"❌ Tests: Executed but FAILED - Review test results")
         elif test_status and "NO TESTS FOUND" in test_status:
-            print(f"⚠️  Tests: No tests found - Manual verification recommended")
+            out.append(f"⚠️  Tests: No tests found - Manual verification recommended")
         else:
-            print(f"ℹ️  Tests: Executed (check results in plan file)")
+            out.append(f"ℹ️  Tests: Executed (check results in plan file)")
     else:
-        print(f"⚠️  Tests: Not executed")
+        out.append(f"⚠️  Tests: Not executed")
     
     # Git status
     if git_warnings:
-        print(f"⚠️  Git/GitHub: Some operations had issues (non-critical for local testing)")
+        out.append(f"⚠️  Git/GitHub: Some operations had issues (non-critical for local testing)")
     elif current_branch and git_committed and git_pushed:
-        print(f"✅ Git/GitHub: All operations completed successfully")
+        out.append(f"✅ Git/GitHub: All operations completed successfully")
     elif current_branch:
-        print(f"ℹ️  Git/GitHub: Partial completion (check status above)")
+        out.append(f"ℹ️  Git/GitHub: Partial completion (check status above)")
     
-    print(f"{'='*70}")
-    print(f"{'='*70}\n")
+    out.append(f"{'='*70}")
+    out.append(f"{'='*70}\n")
+    
+    sys.stdout.write("\n".join(out) + "\n")
+    sys.stdout.flush()
 
 def run_preview_script(issue_number: int, work_dir: Path):
     """Run the preview script to show changes and start preview server"""
@@ -3279,28 +2407,14 @@ def ensure_base_branch(work_dir):
     """Ensure we're on the base branch (development) before processing issues.
     This ensures patches are generated based on the correct codebase state."""
     try:
-        # Get current branch
-        result = subprocess.run(['git', 'rev-parse', '--abbrev-ref', 'HEAD'], 
-                              cwd=work_dir, capture_output=True, text=True, check=False)
-        if result.returncode != 0:
+        # Get current branch (read from .git/HEAD, no subprocess)
+        current_branch = get_current_branch(Path(work_dir))
+        if not current_branch:
             return  # Not a git repo or can't determine branch
         
-        current_branch = result.stdout.strip()
-        
         # Determine base branch (prefer development, fallback to main/master)
-        base_branch = None
-        result = subprocess.run(['git', 'show-ref', '--verify', '--quiet', f'refs/heads/development'],
-                              cwd=work_dir, capture_output=True, check=False)
-        if result.returncode == 0:
-            base_branch = 'development'
-        else:
-            # Fallback to main/master
-            for branch in ['main', 'master']:
-                result = subprocess.run(['git', 'show-ref', '--verify', '--quiet', f'refs/heads/{branch}'],
-                                      cwd=work_dir, capture_output=True, check=False)
-                if result.returncode == 0:
-                    base_branch = branch
-                    break
+        existing = existing_branches(work_dir, BASE_BRANCH_CANDIDATES)
+        base_branch = find_base_branch(existing)
         
         if not base_branch:
             print(f"⚠ No development/main/master branch found, staying on {current_branch}")
@@ -3309,63 +2423,45 @@ def ensure_base_branch(work_dir):
         # Switch to base branch if not already on it
         if current_branch != base_branch:
             # Check for uncommitted changes
-            result = subprocess.run(['git', 'status', '--porcelain'], 
-                                  cwd=work_dir, capture_output=True, text=True, check=False)
-            if result.stdout.strip():
+            if has_changes(Path(work_dir)):
                 print(f"⚠ Uncommitted changes detected on {current_branch}")
                 print(f"   Switching to {base_branch} will carry these changes over")
             
             print(f"🔄 Switching to base branch: {base_branch}")
-            result = subprocess.run(['git', 'checkout', base_branch], 
-                                  cwd=work_dir, capture_output=True, text=True, check=False)
+            result = run_git(['checkout', base_branch], work_dir)
             if result.returncode == 0:
                 # Pull latest changes
-                subprocess.run(['git', 'pull', '--ff-only'], 
-                             cwd=work_dir, capture_output=True, check=False)
+                pull_base_branch(work_dir, base_branch)
                 print(f"✓ On base branch: {base_branch}")
             else:
                 print(f"⚠ Could not switch to {base_branch}: {result.stderr}")
         else:
             # Already on base branch, just pull latest
-            subprocess.run(['git', 'pull', '--ff-only'], 
-                         cwd=work_dir, capture_output=True, check=False)
+            pull_base_branch(work_dir, base_branch)
     except Exception as e:
         print(f"⚠ Error ensuring base branch: {e}")
 
-def create_branch_and_commit(issue_number, work_dir, repo_name=None, issue_title=None, push=False) -> dict:
+def create_branch_and_commit(issue_number, work_dir, repo_name=None, issue_title=None, push=False,
+                             pr_executor=None) -> dict:
     """
     Create a git branch, commit changes, and optionally push and create PR.
-    Returns dict with: did_commit, did_push, branch_name, commit_hash (if successful)
+    With pr_executor, the PR is opened on it in the background instead of before returning.
+    Returns dict with: did_commit, did_push, branch_name, commit_hash (if successful),
+    and pr_future (resolves to the PR URL or None) when the PR was submitted to pr_executor
     """
-    original_dir = os.getcwd()
-    os.chdir(work_dir)
-    
     try:
         # Check if git repo exists
         if not (Path(work_dir) / ".git").exists():
             print("⚠ Not a git repository, skipping branch/commit")
-            return
+            return {"did_commit": False, "did_push": False, "branch_name": None, "commit_hash": None}
         
         # Get current branch
-        result = subprocess.run(['git', 'rev-parse', '--abbrev-ref', 'HEAD'], 
-                              capture_output=True, text=True, check=False)
-        current_branch = result.stdout.strip() if result.returncode == 0 else None
+        snapshot = get_git_snapshot(Path(work_dir))
+        current_branch = snapshot.branch if snapshot else None
         
         # Determine base branch (prefer development, fallback to main/master)
-        base_branch = None
-        # First check for development branch (Git Flow workflow)
-        result = subprocess.run(['git', 'show-ref', '--verify', '--quiet', f'refs/heads/development'],
-                              capture_output=True, check=False)
-        if result.returncode == 0:
-            base_branch = 'development'
-        else:
-            # Fallback to main/master if development doesn't exist
-            for branch in ['main', 'master']:
-                result = subprocess.run(['git', 'show-ref', '--verify', '--quiet', f'refs/heads/{branch}'],
-                                      capture_output=True, check=False)
-                if result.returncode == 0:
-                    base_branch = branch
-                    break
+        existing = existing_branches(work_dir, BASE_BRANCH_CANDIDATES + (f"feature/issue-{issue_number}",))
+        base_branch = find_base_branch(existing)
         
         if not base_branch:
             print("⚠ No development/main/master branch found, using current branch as base")
@@ -3373,8 +2469,8 @@ def create_branch_and_commit(issue_number, work_dir, repo_name=None, issue_title
         
         # Switch to base branch if not already on it
         if current_branch != base_branch:
-            subprocess.run(['git', 'checkout', base_branch], check=False, capture_output=True)
-            subprocess.run(['git', 'pull', '--ff-only'], check=False, capture_output=True)
+            run_git(['checkout', base_branch], work_dir, capture=False)
+            pull_base_branch(work_dir, base_branch)
         
         # Create branch (delete if exists)
         branch_name = f"feature/issue-{issue_number}"
@@ -3384,70 +2480,57 @@ def create_branch_and_commit(issue_number, work_dir, repo_name=None, issue_title
             print(f"✓ Already on branch: {branch_name}")
         else:
             # Check if branch exists
-            result = subprocess.run(['git', 'show-ref', '--verify', '--quiet', f'refs/heads/{branch_name}'],
-                                  capture_output=True, check=False)
-            if result.returncode == 0:
+            if branch_name in existing:
                 # Branch exists, switch to it or delete and recreate
                 print(f"⚠ Branch {branch_name} already exists")
                 # Try to switch to it first
-                result = subprocess.run(['git', 'checkout', branch_name], 
-                                      capture_output=True, text=True, check=False)
+                result = run_git(['checkout', branch_name], work_dir, capture=False)
                 if result.returncode != 0:
                     # Can't switch, delete and recreate
                     print(f"   Deleting existing branch...")
-                    subprocess.run(['git', 'branch', '-D', branch_name], check=False, capture_output=True)
+                    run_git(['branch', '-D', branch_name], work_dir, capture=False)
                     # Create new branch from base
-                    result = subprocess.run(['git', 'checkout', '-b', branch_name], 
-                                          capture_output=True, text=True, check=False)
+                    result = run_git(['checkout', '-b', branch_name], work_dir)
                     if result.returncode != 0:
                         print(f"⚠ Failed to create branch: {result.stderr}")
                         print(f"   Continuing without branch creation...")
-                        return
+                        return {"did_commit": False, "did_push": False, "branch_name": None, "commit_hash": None}
             else:
                 # Branch doesn't exist, create it
-                result = subprocess.run(['git', 'checkout', '-b', branch_name], 
-                                      capture_output=True, text=True, check=False)
+                result = run_git(['checkout', '-b', branch_name], work_dir)
                 if result.returncode != 0:
                     print(f"⚠ Failed to create branch: {result.stderr}")
                     print(f"   Continuing without branch creation...")
-                    return
+                    return {"did_commit": False, "did_push": False, "branch_name": None, "commit_hash": None}
         
-        # Check if there are changes to commit (excluding patch artifacts)
-        result = subprocess.run(['git', 'status', '--porcelain'], 
-                              capture_output=True, text=True, check=True)
+        # Check if there are changes to commit (excluding patch artifacts);
+        # the cached snapshot is reused unless a checkout moved HEAD
+        snapshot = get_git_snapshot(Path(work_dir))
+        changed_files = snapshot.changed_files if snapshot else []
         
         # Filter out patch artifacts from staging
-        status_lines = result.stdout.strip().split('\n') if result.stdout.strip() else []
-        files_to_commit = []
-        for line in status_lines:
-            if line.strip():
-                file_path = line[3:].strip()  # Skip status prefix
-                # Exclude patch artifacts
-                if not file_path.endswith('crewai_patch.diff') and not file_path.endswith('_patch.diff'):
-                    files_to_commit.append(file_path)
+        files_to_commit = [f for f in changed_files if not f.endswith(_PATCH_ARTIFACT_SUFFIXES)]
         
         if not files_to_commit:
             print("⚠ No source files to commit (only patch artifacts/plans or no changes)")
-            return
+            return {"did_commit": False, "did_push": False, "branch_name": branch_name, "commit_hash": None}
         
         # Add only source files (exclude patch artifacts and implementation plans)
-        for file_path in files_to_commit:
-            subprocess.run(['git', 'add', file_path], check=False, capture_output=True)
+        stage_files(work_dir, files_to_commit)
         
         # Verify we have something staged
-        result = subprocess.run(['git', 'diff', '--cached', '--name-only'], 
-                              capture_output=True, text=True, check=True)
+        result = run_git(['diff', '--cached', '--name-only'], work_dir)
         if not result.stdout.strip():
             print("⚠ No files staged for commit")
-            return
+            return {"did_commit": False, "did_push": False, "branch_name": branch_name, "commit_hash": None}
         
         # Commit
         commit_msg = f"feat: implement solution for issue #{issue_number}\n\nCloses #{issue_number}"
         if issue_title:
             commit_msg = f"feat: implement solution for issue #{issue_number}: {issue_title}\n\nCloses #{issue_number}"
         
-        result = subprocess.run(['git', 'commit', '-m', commit_msg], 
-                              capture_output=True, text=True, check=False)
+        # Generous timeout: commit hooks may run linters or tests
+        result = run_git(['commit', '-m', commit_msg], work_dir, timeout=120)
         commit_result_dict = {
             "did_commit": False,
             "did_push": False,
@@ -3460,8 +2543,7 @@ def create_branch_and_commit(issue_number, work_dir, repo_name=None, issue_title
         else:
             commit_result_dict["did_commit"] = True
             # Get commit hash
-            commit_result = subprocess.run(['git', 'rev-parse', 'HEAD'], 
-                                         capture_output=True, text=True, check=False)
+            commit_result = run_git(['rev-parse', 'HEAD'], work_dir)
             if commit_result.returncode == 0:
                 commit_result_dict["commit_hash"] = commit_result.stdout.strip()
             print(f"✓ Created branch: {branch_name}")
@@ -3470,28 +2552,36 @@ def create_branch_and_commit(issue_number, work_dir, repo_name=None, issue_title
         # Push branch if requested
         if push:
             try:
-                # Check network connectivity first
-                import socket
-                try:
-                    socket.create_connection(("github.com", 443), timeout=5)
-                except (socket.timeout, OSError):
-                    print(f"⚠ Network connectivity issue: Cannot reach github.com")
-                    print(f"   Branch committed locally but not pushed")
-                    print(f"   You can push manually later: git push -u origin {branch_name}")
-                    return commit_result_dict
+                # No separate connectivity probe: a failed push's stderr says whether the remote was unreachable
                 
-                push_result = subprocess.run(['git', 'push', '-u', 'origin', branch_name], 
-                                      capture_output=True, text=True, check=False, timeout=60)
+                # The PR's base branch lookup (GitHub API) doesn't depend on the push, so it runs alongside it
+                open_pr = bool(repo_name and GITHUB_TOKEN)
+                with ThreadPoolExecutor(max_workers=1) as executor:
+                    base_branch_future = executor.submit(resolve_pr_base_branch, repo_name) if open_pr else None
+                    push_result = run_git(push_args(branch_name), work_dir, timeout=60)
                 if push_result.returncode == 0:
                     commit_result_dict["did_push"] = True
                     print(f"✓ Pushed branch to origin")
                     
                     # Create PR if repo_name provided
-                    if repo_name and GITHUB_TOKEN:
-                        create_pr(repo_name, branch_name, issue_number, issue_title)
+                    if open_pr and pr_executor is not None:
+                        commit_result_dict["pr_future"] = pr_executor.submit(
+                            create_pr, repo_name, branch_name, issue_number, issue_title,
+                            base_branch=base_branch_future.result())
+                    elif open_pr:
+                        create_pr(repo_name, branch_name, issue_number, issue_title,
+                                  base_branch=base_branch_future.result())
                 else:
                     error_msg = push_result.stderr or push_result.stdout or "Unknown error"
-                    if "timeout" in error_msg.lower() or "could not connect" in error_msg.lower():
+                    # --porcelain reports each rejected ref as a '!' line on stdout
+                    rejected = rejected_push_refs(push_result.stdout or "")
+                    if rejected:
+                        for ref, reason in rejected:
+                            print(f"⚠ Push rejected for {ref}: {reason}")
+                        if any("non-fast-forward" in reason or "fetch first" in reason for _, reason in rejected):
+                            print(f"   origin/{branch_name} has commits this branch doesn't; pull or rebase, then push again")
+                        print(f"   Branch committed locally but not pushed")
+                    elif _NETWORK_ERROR_RE.search(error_msg):
                         print(f"⚠ Network connectivity issue: Cannot reach GitHub")
                         print(f"   Branch committed locally but not pushed")
                         print(f"   You can push manually later: git push -u origin {branch_name}")
@@ -3509,35 +2599,26 @@ def create_branch_and_commit(issue_number, work_dir, repo_name=None, issue_title
         return commit_result_dict
     except Exception as e:
         print(f"⚠ Error in git operations: {e}")
-        import traceback
-        traceback.print_exc()
+        if os.getenv("CREW_DEBUG", "false").lower() == "true":
+            traceback.print_exc()
         return {"did_commit": False, "did_push": False, "branch_name": None, "commit_hash": None}
     finally:
-        os.chdir(original_dir)
+        # The commit moves the branch ref and the push sets the upstream; neither touches .git/HEAD
+        invalidate_git_snapshot(work_dir)
 
-def create_pr(repo_name, branch_name, issue_number, issue_title=None):
-    """Create a pull request on GitHub"""
+def create_pr(repo_name, branch_name, issue_number, issue_title=None, base_branch=None):
+    """Create a pull request on GitHub (base_branch is looked up when not given)"""
     try:
-        g = get_github_client()
-        if not g:
+        repo = get_repo(repo_name)
+        if not repo:
             print("⚠ Cannot create PR: GitHub client not available")
             return None
         
-        repo = g.get_repo(repo_name)
         org_name = repo_name.split('/')[0]
         
         # Determine base branch (prefer development, fallback to main/master)
-        base_branch = None
-        for branch in ["development", "main", "master"]:
-            try:
-                repo.get_branch(branch)
-                base_branch = branch
-                break
-            except:
-                continue
-        
         if not base_branch:
-            base_branch = "main"  # Final fallback
+            base_branch = resolve_pr_base_branch(repo_name)
         
         # PR title and body
         pr_title = f"[CrewAI] Implement issue #{issue_number}"
@@ -3595,36 +2676,53 @@ Please review the changes carefully.
         return None
 
 def move_issue_in_project(repo_name, issue_number, target_column_name, project_name=None):
-    """Move an issue to a specific column in GitHub project (supports both Classic and V2 Projects)"""
+    """Move an issue to a specific column (status option) in a GitHub Projects V2 board"""
     try:
-        g = get_github_client()
-        if not g:
+        if not get_github_client():
             print("⚠ Cannot move issue: GitHub client not available")
             return False
         
-        repo = g.get_repo(repo_name)
-        issue = repo.get_issue(issue_number)
-        
         # Extract organization/user name from repo (e.g., "org/repo" -> "org")
         org_name = repo_name.split('/')[0]
         repo_name_only = repo_name.split('/')[1]
         
         token = os.getenv("GITHUB_TOKEN")
         
-        # Try Projects V2 (GraphQL) first - this is the new format
+        # Projects V2 (GraphQL)
         print(f"🔍 Looking for project: {project_name or 'default'}...")
         
         # GraphQL query to find projects
-        graphql_url = "https://api.github.com/graphql"
         headers = {
             "Authorization": f"Bearer {token}",
             "Content-Type": "application/json",
         }
         
-        # Query for repository projects V2
-        query = """
-        query($owner: String!, $repo: String!) {
-          repository(owner: $owner, name: $repo) {
+        # Project layout is cached per (repo, project); the issue's own projectItems give its
+        # item ID, and once that is cached too the move is a single mutation
+        meta = get_cached_project_v2(repo_name, project_name)
+        project_item_id = _PROJECT_ITEM_CACHE.get((meta['id'], issue_number)) if meta else None
+        issue_node = {}
+        # True once projectItems listed every project the issue is in
+        item_ids_complete = False
+        
+        if not project_item_id:
+            issue_selection = """
+            issue(number: $number) {
+              id
+              projectItems(first: 20) {
+                pageInfo {
+                  hasNextPage
+                }
+                nodes {
+                  id
+                  project {
+                    id
+                  }
+                }
+              }
+            }
+            """
+            projects_selection = """
             projectsV2(first: 10) {
               nodes {
                 id
@@ -3644,340 +2742,191 @@ def move_issue_in_project(repo_name, issue_number, target_column_name, project_n
                 }
               }
             }
-          }
-        }
-        """
-        
-        variables = {
-            "owner": org_name,
-            "repo": repo_name_only
-        }
-        
-        try:
-            response = requests.post(graphql_url, headers=headers, json={"query": query, "variables": variables}, timeout=30)
-        except requests.exceptions.Timeout:
-            print(f"⚠ Network timeout when querying GitHub Projects API")
-            print(f"   Pipeline movement skipped (network issue)")
-            return False
-        except requests.exceptions.ConnectionError as e:
-            print(f"⚠ Network error when querying GitHub Projects API: {e}")
-            print(f"   Pipeline movement skipped (network issue)")
-            return False
-        
-        if response.status_code == 200:
-            data = response.json()
-            if 'errors' not in data:
-                projects_v2 = data.get('data', {}).get('repository', {}).get('projectsV2', {}).get('nodes', [])
-                if projects_v2:
-                    # Find the right project
-                    project_v2 = None
-                    if project_name:
-                        for p in projects_v2:
-                            if p.get('title') == project_name:
-                                project_v2 = p
-                                break
-                    else:
-                        project_v2 = projects_v2[0]  # Use first project
-                    
-                    if project_v2:
-                        print(f"📋 Using Projects V2: {project_v2.get('title')} (ID: {project_v2.get('id')})")
-                        return move_issue_in_project_v2(
-                            project_v2.get('id'),
-                            issue.id,
-                            issue_number,
-                            target_column_name,
-                            project_v2.get('fields', {}).get('nodes', []),
-                            token
-                        )
-        
-        # Fallback to classic projects (REST API)
-        print("   Trying classic projects (REST API)...")
-        project = None
-        projects = []
-        
-        # Try repository projects
-        try:
-            projects = list(repo.get_projects())
-            print(f"📋 Found {len(projects)} repository-level classic project(s)")
-        except:
-            projects = []
-        
-        # Try user projects
-        if not projects:
-            try:
-                user = g.get_user(org_name)
-                projects = list(user.get_projects())
-                print(f"📋 Found {len(projects)} user-level classic project(s)")
-            except:
-                projects = []
-        
-        if not projects:
-            print("⚠ No projects found")
-            return False
-        
-        # Find project
-        if project_name:
-            for p in projects:
-                if p.name == project_name:
-                    project = p
-                    break
-        else:
-            project = projects[0]
-        
-        if not project:
-            print(f"⚠ Project '{project_name or 'default'}' not found")
-            return False
-        
-        print(f"📋 Using classic project: {project.name} (ID: {project.id})")
-        
-        # Get columns
-        columns = list(project.get_columns())
-        print(f"📋 Found {len(columns)} columns: {[c.name for c in columns]}")
-        
-        target_column = None
-        issue_card = None
-        source_column = None
-        
-        # First pass: Find target column
-        for column in columns:
-            if column.name == target_column_name:
-                target_column = column
-                break
-        
-        # Second pass: Find issue card in all columns
-        for column in columns:
-            if issue_card:
-                break
-            try:
-                cards = list(column.get_cards())
-                print(f"   Checking column '{column.name}' ({len(cards)} cards)...")
-                for card in cards:
-                    try:
-                        content = card.get_content()
-                        if hasattr(content, 'number') and content.number == issue_number:
-                            issue_card = card
-                            source_column = column
-                            print(f"   ✓ Found issue #{issue_number} in column '{column.name}'")
-                            break
-                    except Exception as e:
-                        # Some cards might not have content or might be notes
-                        continue
-            except Exception as e:
-                print(f"   ⚠ Error reading cards from '{column.name}': {e}")
-                continue
-        
-        if not target_column:
-            print(f"⚠ Target column '{target_column_name}' not found")
-            print(f"   Available columns: {[c.name for c in columns]}")
-            return False
-        
-        if not issue_card:
-            # Issue might not be in project yet, try to add it
-            print(f"⚠ Issue #{issue_number} not found in project. Adding to '{target_column_name}'...")
-            print(f"   Available columns: {[c.name for c in columns]}")
+            """
+            query = """
+            query($owner: String!, $repo: String!, $number: Int!) {
+              repository(owner: $owner, name: $repo) {%s}
+            }
+            """ % (issue_selection + ("" if meta else projects_selection))
+            
+            variables = {
+                "owner": org_name,
+                "repo": repo_name_only,
+                "number": issue_number
+            }
+            
             try:
-                # Add issue to target column using API directly
-                token = os.getenv("GITHUB_TOKEN")
-                url = f"https://api.github.com/projects/columns/{target_column.id}/cards"
-                headers = {
-                    "Authorization": f"Bearer {token}",
-                    "Accept": "application/vnd.github+json",
-                    "X-GitHub-Api-Version": "2022-11-28"
-                }
-                data = {
-                    "content_id": issue.id,
-                    "content_type": "Issue"
-                }
-                response = requests.post(url, headers=headers, json=data)
-                if response.status_code in [201, 200]:
-                    print(f"✓ Added issue #{issue_number} to '{target_column_name}'")
-                    return True
-                else:
-                    # Try legacy API
-                    headers_legacy = {
-                        "Authorization": f"token {token}",
-                        "Accept": "application/vnd.github.inertia-preview+json",
-                        "X-GitHub-Api-Version": "2022-11-28"
-                    }
-                    response2 = requests.post(url, headers=headers_legacy, json=data)
-                    if response2.status_code in [201, 200]:
-                        print(f"✓ Added issue #{issue_number} to '{target_column_name}' (using legacy API)")
-                        return True
-                    else:
-                        print(f"⚠ Failed to add issue: {response2.status_code} - {response2.text[:200]}")
-                        return False
-            except Exception as e:
-                print(f"⚠ Failed to add issue to project: {e}")
-                import traceback
-                traceback.print_exc()
+                response = post_graphql(query, variables, headers)
+            except requests.exceptions.Timeout:
+                print(f"⚠ Network timeout when querying GitHub Projects API")
+                print(f"   Pipeline movement skipped (network issue)")
                 return False
+            except requests.exceptions.ConnectionError as e:
+                print(f"⚠ Network error when querying GitHub Projects API: {e}")
+                print(f"   Pipeline movement skipped (network issue)")
+                return False
+            
+            if response.status_code == 200:
+                data = response.json()
+                if 'errors' not in data:
+                    repository = data.get('data', {}).get('repository', {})
+                    issue_node = repository.get('issue') or {}
+                    # project ID -> this issue's item ID in that project
+                    item_ids = {
+                        item['project']['id']: item['id']
+                        for item in issue_node.get('projectItems', {}).get('nodes', [])
+                        if item.get('project')
+                    }
+                    item_page_info = (issue_node.get('projectItems') or {}).get('pageInfo') or {}
+                    item_ids_complete = bool(issue_node) and item_page_info.get('hasNextPage') is False
+                    projects_v2 = repository.get('projectsV2', {}).get('nodes', [])
+                    if not meta and projects_v2:
+                        # Find the right project
+                        project_v2 = None
+                        if project_name:
+                            for p in projects_v2:
+                                if p.get('title') == project_name:
+                                    project_v2 = p
+                                    break
+                        else:
+                            project_v2 = projects_v2[0]  # Use first project
+                        if project_v2:
+                            meta = cache_project_v2(repo_name, project_name, project_v2)
+                    if meta:
+                        project_item_id = item_ids.get(meta['id'])
+        
+        if meta:
+            print(f"📋 Using Projects V2: {meta['title']} (ID: {meta['id']})")
+            return move_issue_in_project_v2(
+                meta['id'],
+                issue_node.get('id'),
+                issue_number,
+                target_column_name,
+                meta['fields'],
+                token,
+                project_item_id=project_item_id,
+                status_field_id=meta['status_field_id'],
+                option_id=resolve_status_option(meta, target_column_name),
+                # Not among the issue's projectItems means not in the project: add it, don't scan
+                scan_items=not item_ids_complete
+            )
         
-        # Move card to target column
-        if source_column and source_column.id == target_column.id:
-            print(f"✓ Issue #{issue_number} already in '{target_column_name}'")
-            return True
-        
-        # Use GitHub API directly to move card
-        token = os.getenv("GITHUB_TOKEN")
-        url = f"https://api.github.com/projects/columns/cards/{issue_card.id}/moves"
-        
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Accept": "application/vnd.github+json",
-            "X-GitHub-Api-Version": "2022-11-28"
-        }
-        
-        data = {
-            "position": "top",
-            "column_id": target_column.id
-        }
-        
-        print(f"🔄 Moving issue #{issue_number} from '{source_column.name if source_column else 'unknown'}' to '{target_column_name}'...")
-        print(f"   Card ID: {issue_card.id}, Target Column ID: {target_column.id}")
-        
-        response = requests.post(url, headers=headers, json=data)
-        
-        if response.status_code in [201, 200]:
-            print(f"✓ Moved issue #{issue_number} to '{target_column_name}'")
-            return True
-        else:
-            print(f"⚠ Failed to move card: {response.status_code}")
-            print(f"   Response: {response.text[:500]}")
-            # Try with old API format as fallback
-            if response.status_code == 404 or "inertia" in response.text.lower():
-                print(f"   Trying with legacy API format...")
-                headers_legacy = {
-                    "Authorization": f"token {token}",
-                    "Accept": "application/vnd.github.inertia-preview+json",
-                    "X-GitHub-Api-Version": "2022-11-28"
-                }
-                response2 = requests.post(url, headers=headers_legacy, json=data)
-                if response2.status_code in [201, 200]:
-                    print(f"✓ Moved issue #{issue_number} to '{target_column_name}' (using legacy API)")
-                    return True
-                else:
-                    print(f"   Legacy API also failed: {response2.status_code} - {response2.text[:200]}")
-            return False
+        # Classic projects (REST columns/cards) have been sunset by GitHub, so there is no fallback
+        print(f"⚠ Project '{project_name or 'default'}' not found among {repo_name}'s Projects V2 boards")
+        return False
             
     except Exception as e:
+        # Project moves are non-critical; the one-line error is enough
         print(f"⚠ Error moving issue in project: {e}")
-        import traceback
-        traceback.print_exc()
         return False
 
-def move_issue_in_project_v2(project_id, issue_id, issue_number, target_field_value, fields, token):
-    """Move an issue in a Projects V2 using GraphQL"""
+def move_issue_in_project_v2(project_id, issue_id, issue_number, target_field_value, fields, token,
+                             project_item_id=None, status_field_id=None, option_id=None, scan_items=True):
+    """
+    Move an issue in a Projects V2 using GraphQL.
+    Without project_item_id, the project's items are paged through to find the issue
+    unless scan_items is False (the caller knows it isn't in the project yet).
+    """
     try:
-        graphql_url = "https://api.github.com/graphql"
         headers = {
             "Authorization": f"Bearer {token}",
             "Content-Type": "application/json",
         }
         
-        # Find the status field (usually called "Status" or similar)
-        status_field = None
-        target_option_id = None
-        
-        # Try multiple field name variations
-        status_field_names = ['status', 'state', 'stage', 'progress', 'column']
-        
-        for field in fields:
-            field_name_lower = field.get('name', '').lower()
-            if any(name in field_name_lower for name in status_field_names):
-                status_field = field
-                # Find the target option (case-insensitive match)
-                options = field.get('options', [])
-                for opt in options:
-                    if opt.get('name', '').lower() == target_field_value.lower():
-                        target_option_id = opt.get('id')
-                        break
-                # If exact match not found, try partial match
-                if not target_option_id:
-                    for opt in options:
-                        opt_name = opt.get('name', '').lower()
-                        if target_field_value.lower() in opt_name or opt_name in target_field_value.lower():
-                            target_option_id = opt.get('id')
-                            print(f"   Using partial match: '{opt.get('name')}' for '{target_field_value}'")
-                            break
-                break
-        
-        if not status_field:
-            print(f"⚠ No status field found in project")
-            print(f"   Available fields: {[f.get('name') for f in fields]}")
-            print(f"   Looking for fields matching: {status_field_names}")
-            return False
-        
-        if not target_option_id:
-            print(f"⚠ Target value '{target_field_value}' not found in status field '{status_field.get('name')}'")
-            print(f"   Available options: {[opt.get('name') for opt in status_field.get('options', [])]}")
-            print(f"   Tip: Check exact spelling/capitalization of column names")
-            return False
+        # Callers with a cached project layout pass the resolved field/option IDs
+        if not (status_field_id and option_id):
+            # Find the status field (usually called "Status" or similar) and the target option
+            status = index_status_field(fields)
+            status_field_id = status['status_field_id']
+            if not status_field_id:
+                print(f"⚠ No status field found in project")
+                print(f"   Available fields: {[f.get('name') for f in fields]}")
+                print(f"   Looking for fields matching: {STATUS_FIELD_NAMES}")
+                return False
+            
+            option_id = resolve_status_option(status, target_field_value)
+            if not option_id:
+                print(f"⚠ Target value '{target_field_value}' not found in status field '{status['status_field_name']}'")
+                print(f"   Available options: {status['option_names']}")
+                print(f"   Tip: Check exact spelling/capitalization of column names")
+                return False
         
-        # First, get the current project item for this issue
-        query_item = """
-        query($projectId: ID!) {
-          node(id: $projectId) {
-            ... on ProjectV2 {
-              items(first: 100) {
-                nodes {
-                  id
-                  content {
-                    ... on Issue {
+        # Callers that already know the issue's item ID (or know it has none) skip the items query
+        if not project_item_id and scan_items:
+            # Page through the project's items, stopping at the page that holds this issue
+            query_item = """
+            query($projectId: ID!, $cursor: String) {
+              node(id: $projectId) {
+                ... on ProjectV2 {
+                  items(first: 50, after: $cursor) {
+                    pageInfo {
+                      hasNextPage
+                      endCursor
+                    }
+                    nodes {
                       id
-                      number
+                      content {
+                        ... on Issue {
+                          id
+                          number
+                        }
+                      }
                     }
                   }
                 }
               }
             }
-          }
-        }
-        """
-        
-        variables_item = {
-            "projectId": project_id
-        }
-        
-        try:
-            response = requests.post(graphql_url, headers=headers, json={"query": query_item, "variables": variables_item}, timeout=30)
-        except requests.exceptions.Timeout:
-            print(f"⚠ Network timeout when querying project items")
-            return False
-        except requests.exceptions.ConnectionError as e:
-            print(f"⚠ Network error when querying project items: {e}")
-            return False
-        
-        if response.status_code != 200:
-            print(f"⚠ Failed to query project items: {response.status_code}")
-            if response.status_code == 404:
-                print(f"   This might indicate the project structure has changed")
-            return False
-        
-        data = response.json()
-        if 'errors' in data:
-            print(f"⚠ GraphQL errors: {data['errors']}")
-            return False
-        
-        project_node = data.get('data', {}).get('node', {})
-        items = project_node.get('items', {}).get('nodes', [])
-        
-        # Find the item for this issue
-        project_item_id = None
-        for item in items:
-            content = item.get('content', {})
-            if content.get('number') == issue_number:
-                project_item_id = item.get('id')
-                break
+            """
+            
+            variables_item = {
+                "projectId": project_id,
+                "cursor": None
+            }
+            
+            while True:
+                try:
+                    response = post_graphql(query_item, variables_item, headers)
+                except requests.exceptions.Timeout:
+                    print(f"⚠ Network timeout when querying project items")
+                    return False
+                except requests.exceptions.ConnectionError as e:
+                    print(f"⚠ Network error when querying project items: {e}")
+                    return False
+                
+                if response.status_code != 200:
+                    print(f"⚠ Failed to query project items: {response.status_code}")
+                    if response.status_code == 404:
+                        print(f"   This might indicate the project structure has changed")
+                    return False
+                
+                data = response.json()
+                if 'errors' in data:
+                    print(f"⚠ GraphQL errors: {data['errors']}")
+                    return False
+                
+                project_node = data.get('data', {}).get('node') or {}
+                items_page = project_node.get('items') or {}
+                
+                # Find the item for this issue
+                for item in items_page.get('nodes', []):
+                    content = item.get('content') or {}
+                    if content.get('number') == issue_number:
+                        project_item_id = item.get('id')
+                        break
+                
+                page_info = items_page.get('pageInfo') or {}
+                if project_item_id or not page_info.get('hasNextPage'):
+                    break
+                variables_item["cursor"] = page_info.get('endCursor')
         
         if not project_item_id:
             # Issue not in project, add it first
             print(f"⚠ Issue #{issue_number} not in project. Adding...")
             
-            # Ensure issue_id is in the correct format for GraphQL
-            # GitHub GraphQL expects format: "Issue_<numeric_id>" or just the numeric ID
+            # issue_id is normally the GraphQL node ID from the project query;
+            # a bare numeric REST ID still gets the legacy "Issue_" prefix
             content_id = issue_id
-            if not str(issue_id).startswith('Issue_'):
-                # Try with Issue_ prefix
+            if str(issue_id).isdigit():
                 content_id = f"Issue_{issue_id}"
             
             mutation_add = """
@@ -3996,7 +2945,7 @@ def move_issue_in_project_v2(project_id, issue_id, issue_number, target_field_va
             }
             
             try:
-                response_add = requests.post(graphql_url, headers=headers, json={"query": mutation_add, "variables": variables_add}, timeout=30)
+                response_add = post_graphql(mutation_add, variables_add, headers)
             except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
                 print(f"⚠ Network error when adding issue to project: {e}")
                 print(f"   ℹ️  This is non-critical - core implementation still succeeded")
@@ -4053,13 +3002,13 @@ def move_issue_in_project_v2(project_id, issue_id, issue_number, target_field_va
         variables_update = {
             "projectId": project_id,
             "itemId": project_item_id,
-            "fieldId": status_field.get('id'),
-            "optionId": target_option_id
+            "fieldId": status_field_id,
+            "optionId": option_id
         }
         
         print(f"🔄 Moving issue #{issue_number} to '{target_field_value}'...")
         try:
-            response_update = requests.post(graphql_url, headers=headers, json={"query": mutation_update, "variables": variables_update}, timeout=30)
+            response_update = post_graphql(mutation_update, variables_update, headers)
         except requests.exceptions.Timeout:
             print(f"⚠ Network timeout when updating project status")
             return False
@@ -4071,8 +3020,11 @@ def move_issue_in_project_v2(project_id, issue_id, issue_number, target_field_va
             data_update = response_update.json()
             if 'errors' in data_update:
                 print(f"⚠ Failed to update: {data_update.get('errors')}")
+                # The item may have been removed from the project; look it up again next time
+                _PROJECT_ITEM_CACHE.pop((project_id, issue_number), None)
                 return False
             else:
+                _PROJECT_ITEM_CACHE[(project_id, issue_number)] = project_item_id
                 print(f"✓ Moved issue #{issue_number} to '{target_field_value}'")
                 return True
         else:
@@ -4080,9 +3032,8 @@ def move_issue_in_project_v2(project_id, issue_id, issue_number, target_field_va
             return False
             
     except Exception as e:
+        # Project moves are non-critical; the one-line error is enough
         print(f"⚠ Error in Projects V2 movement: {e}")
-        import traceback
-        traceback.print_exc()
         return False
 
 def run_automated_crew(repo_name, max_issues=5, issue_number=None):
@@ -4090,6 +3041,10 @@ def run_automated_crew(repo_name, max_issues=5, issue_number=None):
     
     processed_file = Path.home() / "ai-dev-team" / "processed_issues.json"
     work_dir = WORK_DIR
+    # Crew results that completed on the first pass, replayed when the same issue text comes back
+    result_cache = None
+    if os.getenv("CREW_RESULT_CACHE", "true").lower() == "true":
+        result_cache = CrewResultCache(Path.home() / "ai-dev-team" / ".crew_cache")
     
     print(f"🚀 Starting Automated Crew")
     print(f"Repository: {repo_name}")
@@ -4103,51 +3058,55 @@ def run_automated_crew(repo_name, max_issues=5, issue_number=None):
     
     # If specific issue number provided, process only that
     if issue_number:
-        g = get_github_client()
-        if not g:
+        repo = get_repo(repo_name)
+        if not repo:
             print("❌ Failed to get GitHub client")
             return
         
+        # PRs are opened on this pool while later sub-issues run and the moves are sent;
+        # it is shut down however processing ends
+        pr_executor = ThreadPoolExecutor(max_workers=4)
+        pr_futures = []
+        # Sub-issues completed here, marked processed with the parent (or on their own if it fails)
+        processed_sub_issues = []
+        # Sub-issue crew runs (SUB_ISSUE_STRATEGY=sequential); queued ones are cancelled if processing stops early
+        sub_crew_executor = None
         try:
-            # First verify repository exists
+            # Fetch the issue straight away (lazy repo: no GET for the repository itself). Only if
+            # that fails does one GraphQL query tell a missing repository from a missing issue
             try:
-                repo = g.get_repo(repo_name)
-                print(f"✓ Repository '{repo_name}' found: {repo.full_name}")
-            except Exception as repo_error:
-                error_msg = str(repo_error)
-                if "404" in error_msg or "Not Found" in error_msg:
+                issue = repo.get_issue(issue_number)
+            except Exception as issue_error:
+                error_msg = str(issue_error)
+                if "404" not in error_msg and "Not Found" not in error_msg:
+                    print(f"\n❌ Error accessing issue #{issue_number}: {issue_error}")
+                    return
+                
+                try:
+                    repo_meta, _, recent_issues = _verify_repo_and_issue_gql(repo_name, issue_number)
+                except Exception:
+                    # Lookup failed too; assume the repository is fine and report the issue
+                    repo_meta, recent_issues = {}, []
+                
+                if repo_meta is None:
                     print(f"\n❌ Repository '{repo_name}' not found or not accessible")
                     print(f"   Please verify:")
                     print(f"   1. The repository exists on GitHub")
                     print(f"   2. You have access to the repository")
                     print(f"   3. The repository name is correct: {repo_name}")
                 else:
-                    print(f"\n❌ Error accessing repository '{repo_name}': {repo_error}")
-                return
-            
-            # Then verify issue exists
-            try:
-                issue = repo.get_issue(issue_number)
-            except Exception as issue_error:
-                error_msg = str(issue_error)
-                if "404" in error_msg or "Not Found" in error_msg:
                     print(f"\n❌ Issue #{issue_number} not found in repository '{repo_name}'")
                     print(f"   Please verify:")
                     print(f"   1. Issue #{issue_number} exists in the repository")
                     print(f"   2. The issue is not a pull request (use get_pull_request for PRs)")
                     print(f"   3. You have access to view the issue")
-                    # Try to list some recent issues to help user
-                    try:
-                        recent_issues = list(repo.get_issues(state='open', sort='created', direction='desc')[:5])
-                        if recent_issues:
-                            print(f"\n   Recent open issues in this repository:")
-                            for recent_issue in recent_issues:
-                                print(f"   - Issue #{recent_issue.number}: {recent_issue.title}")
-                    except:
-                        pass
-                else:
-                    print(f"\n❌ Error accessing issue #{issue_number}: {issue_error}")
+                    # List some recent issues to help user
+                    if recent_issues:
+                        print(f"\n   Recent open issues in this repository:")
+                        for recent_issue in recent_issues:
+                            print(f"   - Issue #{recent_issue['number']}: {recent_issue['title']}")
                 return
+            print(f"✓ Repository '{repo_name}' found")
             
             print(f"\n{'='*70}")
             print(f"Processing Issue #{issue.number}: {issue.title}")
@@ -4170,7 +3129,11 @@ def run_automated_crew(repo_name, max_issues=5, issue_number=None):
                 ensure_base_branch(work_dir)
             
             # Process the issue (with sub-issues if enabled)
-            result = process_issue(issue, repo_name, work_dir, include_sub_issues=process_sub_issues, enable_testing=enable_testing)
+            result = process_issue(issue, repo_name, work_dir, include_sub_issues=process_sub_issues, enable_testing=enable_testing,
+                                   result_cache=result_cache)
+            
+            # Done moves for this issue and its sub-issues, sent together once processing ends
+            pending_moves = []
             
             # Save implementation plan and apply changes (with retry)
             max_retries = 2
@@ -4201,7 +3164,7 @@ def run_automated_crew(repo_name, max_issues=5, issue_number=None):
                     ])
                     
                     # Build issue text for retry
-                    issue_text_retry = f"# {issue.title}\n\n{issue.body or 'No description'}".strip()
+                    issue_text_retry = _compress_context(f"# {issue.title}\n\n{issue.body or 'No description'}".strip())
                     
                     # Create architect task for context (simplified for retry)
                     retry_architect_task = Task(
@@ -4257,22 +3220,27 @@ Original issue:
             
             # Create branch, commit, push, and create PR (ONLY if implementation is complete)
             if implementation_status and implementation_status["status"] == "complete":
+                # Only a first-pass result replays on its own; retry output covers just the missing items
+                if result_cache is not None and retry_count == 0:
+                    result_cache.put(issue.number, result)
                 if (work_dir / ".git").exists():
                     # Check if we should push and create PR
                     push_to_github = os.getenv("AUTO_PUSH", "false").lower() == "true"
-                    create_branch_and_commit(
+                    commit_result = create_branch_and_commit(
                         issue.number, 
                         work_dir, 
                         repo_name=repo_name,
                         issue_title=issue.title,
-                        push=push_to_github
+                        push=push_to_github,
+                        pr_executor=pr_executor
                     )
+                    if commit_result.get("pr_future"):
+                        pr_futures.append((issue.number, commit_result["pr_future"]))
                 
-                # Move issue to Done (only if complete)
+                # Queue the move to Done (only if complete); applied with the other moves below
                 if pipeline_enabled:
                     target_column = os.getenv("PIPELINE_DONE_COLUMN", "Done")
-                    move_issue_in_project(repo_name, issue.number, target_column)
-                    print(f"✅ Issue #{issue.number} moved to '{target_column}'")
+                    pending_moves.append((issue.number, target_column))
             else:
                 print(f"\n⚠️  Implementation incomplete - skipping commit and GitHub operations")
                 print(f"   Issue will remain in current column (not moved to Done)")
@@ -4290,41 +3258,69 @@ Original issue:
                     # - "skip": Don't process sub-issues separately
                     
                     if sub_issue_strategy == "sequential":
-                        print(f"\n📋 Processing {len(sub_issues)} sub-issue(s) sequentially...")
+                        sub_concurrency = max(1, int(os.getenv("SUB_ISSUE_CONCURRENCY", "4")))
+                        print(f"\n📋 Processing {len(sub_issues)} sub-issue(s), up to {sub_concurrency} crew run(s) at a time...")
+                        
+                        # Move sub-issues to "In Progress" (batched into as few GraphQL requests as possible)
+                        if pipeline_enabled:
+                            move_issues_in_project(repo_name, [(sub_issue.number, in_progress_column) for sub_issue in sub_issues],
+                                                   move_one=move_issue_in_project)
+                        
+                        # With concurrency > 1 the crews overlap. They all plan against one snapshot of the
+                        # project taken here, before any sub-issue is applied, since applying, testing and
+                        # committing (in order, below) change the tree under them. With 1, each crew runs
+                        # in the loop on the tree the previous sub-issue left.
+                        sub_result_futures = {}
+                        if sub_concurrency > 1:
+                            shared_inputs = gather_project_inputs(work_dir)
+                            sub_crew_executor = ThreadPoolExecutor(max_workers=sub_concurrency)
+                            sub_result_futures = {
+                                sub_issue.number: sub_crew_executor.submit(
+                                    process_issue, sub_issue, repo_name, work_dir, include_sub_issues=False,
+                                    enable_testing=enable_testing, result_cache=result_cache,
+                                    project_inputs=shared_inputs)
+                                for sub_issue in sub_issues
+                            }
+                            sub_crew_executor.shutdown(wait=False)
+                        
                         for sub_issue in sub_issues:
                             print(f"\n{'='*70}")
                             print(f"Processing Sub-Issue #{sub_issue.number}: {sub_issue.title}")
                             print(f"{'='*70}\n")
                             
-                            # Move sub-issue to "In Progress"
-                            if pipeline_enabled:
-                                move_issue_in_project(repo_name, sub_issue.number, in_progress_column)
-                            
-                            # Process sub-issue
-                            sub_result = process_issue(sub_issue, repo_name, work_dir, include_sub_issues=False, enable_testing=enable_testing)
+                            # Wait for the sub-issue's crew run, or run it now
+                            if sub_issue.number in sub_result_futures:
+                                sub_result = sub_result_futures[sub_issue.number].result()
+                            else:
+                                sub_result = process_issue(sub_issue, repo_name, work_dir, include_sub_issues=False,
+                                                           enable_testing=enable_testing, result_cache=result_cache)
                             
                             # Apply implementation
                             sub_implementation_status = apply_implementation(sub_result, sub_issue.number, work_dir, enable_testing=enable_testing)
                             
                             # Create branch and commit for sub-issue (ONLY if complete)
                             if sub_implementation_status and sub_implementation_status["status"] == "complete":
+                                if result_cache is not None:
+                                    result_cache.put(sub_issue.number, sub_result)
                                 if (work_dir / ".git").exists():
-                                    create_branch_and_commit(
+                                    sub_commit_result = create_branch_and_commit(
                                         sub_issue.number,
                                         work_dir,
                                         repo_name=repo_name,
                                         issue_title=sub_issue.title,
-                                        push=push_to_github
+                                        push=push_to_github,
+                                        pr_executor=pr_executor
                                     )
+                                    if sub_commit_result.get("pr_future"):
+                                        pr_futures.append((sub_issue.number, sub_commit_result["pr_future"]))
                                 
-                                # Move sub-issue to "Done" (only if complete)
+                                # Queue the sub-issue's move to "Done" (only if complete)
                                 if pipeline_enabled:
                                     target_column = os.getenv("PIPELINE_DONE_COLUMN", "Done")
-                                    move_issue_in_project(repo_name, sub_issue.number, target_column)
-                                    print(f"✅ Sub-issue #{sub_issue.number} moved to '{target_column}'")
+                                    pending_moves.append((sub_issue.number, target_column))
                                 
-                                # Mark sub-issue as processed
-                                mark_issue_processed(sub_issue.number, processed_file)
+                                # Queue the sub-issue's processed mark; written together with the parent's
+                                processed_sub_issues.append(sub_issue.number)
                                 print(f"✅ Sub-issue #{sub_issue.number} processed successfully!")
                             else:
                                 print(f"⚠️  Sub-issue #{sub_issue.number} implementation incomplete - not moved to Done")
@@ -4349,9 +3345,23 @@ Original issue:
                 if not patch_applied:
                     warnings.append("Patch failed to apply - review patch file manually or apply changes manually")
             
-            # Note: Issue move to Done is handled above with gating enforcement
-            # This section is kept for backward compatibility but should not execute
-            # if the main flow above already handled it
+            # Apply the queued pipeline moves (batched into as few GraphQL requests as possible)
+            if pending_moves:
+                move_results = move_issues_in_project(repo_name, pending_moves, move_one=move_issue_in_project)
+                for moved_number, target_column in pending_moves:
+                    if move_results.get(moved_number):
+                        print(f"✅ Issue #{moved_number} moved to '{target_column}'")
+                    else:
+                        warnings.append(f"Failed to move issue #{moved_number} in project pipeline (network/GitHub API issue)")
+            # Wait for the PRs so their output lands before the status summary; a failed one is a warning
+            for pr_issue_number, pr_future in pr_futures:
+                try:
+                    pr_url = pr_future.result()
+                except Exception as e:
+                    print(f"⚠ Error creating PR for issue #{pr_issue_number}: {e}")
+                    pr_url = None
+                if not pr_url:
+                    warnings.append(f"Pull request for issue #{pr_issue_number} was not created (network/GitHub API issue)")
             
             # Check git operations
             if (work_dir / ".git").exists():
@@ -4359,15 +3369,14 @@ Original issue:
                 if push_to_github:
                     # Check if branch was actually pushed
                     try:
-                        result = subprocess.run(['git', 'rev-parse', '--abbrev-ref', '@{u}'], 
-                                              cwd=work_dir, capture_output=True, text=True, check=False, timeout=5)
+                        result = run_git(['rev-parse', '--abbrev-ref', '@{u}'], work_dir, timeout=5)
                         if result.returncode != 0:
                             warnings.append("Branch not pushed to remote (network issue - check connectivity)")
                     except Exception:
                         warnings.append("Could not verify if branch was pushed (check manually)")
             
             # Mark as processed (core implementation succeeded, even if GitHub ops failed)
-            mark_issue_processed(issue.number, processed_file)
+            mark_issues_processed(processed_sub_issues + [issue.number], processed_file)
             
             # Separate local and Git/GitHub status
             print_issue_status(issue.number, work_dir, warnings, implementation_status)
@@ -4379,9 +3388,15 @@ Original issue:
             
         except Exception as e:
             print(f"\n❌ Error processing issue #{issue_number}: {e}")
-            import traceback
             traceback.print_exc()
+            # Sub-issues that already completed must not be re-run (and re-branched) next time
+            if processed_sub_issues:
+                mark_issues_processed(processed_sub_issues, processed_file)
             return
+        finally:
+            pr_executor.shutdown(wait=True)
+            if sub_crew_executor is not None:
+                sub_crew_executor.shutdown(wait=True, cancel_futures=True)
     
     # Otherwise, process multiple issues
     while issues_processed < max_issues:
@@ -4392,6 +3407,14 @@ Original issue:
             print("\n✅ No more unprocessed issues!")
             break
         
+        # Sub-issues completed in this iteration, marked processed with the parent
+        processed_sub_issues = []
+        # PRs are opened on this pool while later sub-issues run and the moves are sent;
+        # it is shut down however the iteration ends
+        pr_executor = ThreadPoolExecutor(max_workers=4)
+        pr_futures = []
+        # Sub-issue crew runs (SUB_ISSUE_STRATEGY=sequential); queued ones are cancelled if processing stops early
+        sub_crew_executor = None
         try:
             # Move issue to "In Progress" when starting
             pipeline_enabled = os.getenv("MOVE_IN_PIPELINE", "true").lower() == "true"
@@ -4406,7 +3429,11 @@ Original issue:
             enable_testing = os.getenv("ENABLE_TESTING", "true").lower() in ("true", "1", "yes")
             
             # Process the issue (with sub-issues if enabled)
-            result = process_issue(issue, repo_name, work_dir, include_sub_issues=process_sub_issues, enable_testing=enable_testing)
+            result = process_issue(issue, repo_name, work_dir, include_sub_issues=process_sub_issues, enable_testing=enable_testing,
+                                   result_cache=result_cache)
+            
+            # Done moves for this issue and its sub-issues, sent together once processing ends
+            pending_moves = []
             
             # Save implementation plan and apply changes (with retry)
             max_retries = 2
@@ -4437,7 +3464,7 @@ Original issue:
                     ])
                     
                     # Build issue text for retry
-                    issue_text_retry = f"# {issue.title}\n\n{issue.body or 'No description'}".strip()
+                    issue_text_retry = _compress_context(f"# {issue.title}\n\n{issue.body or 'No description'}".strip())
                     
                     # Create architect task for context (simplified for retry)
                     retry_architect_task = Task(
@@ -4493,22 +3520,27 @@ Original issue:
             
             # Create branch, commit, push, and create PR (ONLY if implementation is complete)
             if implementation_status and implementation_status["status"] == "complete":
+                # Only a first-pass result replays on its own; retry output covers just the missing items
+                if result_cache is not None and retry_count == 0:
+                    result_cache.put(issue.number, result)
                 if (work_dir / ".git").exists():
                     # Check if we should push and create PR
                     push_to_github = os.getenv("AUTO_PUSH", "false").lower() == "true"
-                    create_branch_and_commit(
+                    commit_result = create_branch_and_commit(
                         issue.number, 
                         work_dir, 
                         repo_name=repo_name,
                         issue_title=issue.title,
-                        push=push_to_github
+                        push=push_to_github,
+                        pr_executor=pr_executor
                     )
+                    if commit_result.get("pr_future"):
+                        pr_futures.append((issue.number, commit_result["pr_future"]))
                 
-                # Move issue to Done (only if complete)
+                # Queue the move to Done (only if complete); applied with the other moves below
                 if pipeline_enabled:
                     target_column = os.getenv("PIPELINE_DONE_COLUMN", "Done")
-                    move_issue_in_project(repo_name, issue.number, target_column)
-                    print(f"✅ Issue #{issue.number} moved to '{target_column}'")
+                    pending_moves.append((issue.number, target_column))
             else:
                 print(f"\n⚠️  Implementation incomplete - skipping commit and GitHub operations")
                 print(f"   Issue will remain in current column (not moved to Done)")
@@ -4526,41 +3558,69 @@ Original issue:
                     # - "skip": Don't process sub-issues separately
                     
                     if sub_issue_strategy == "sequential":
-                        print(f"\n📋 Processing {len(sub_issues)} sub-issue(s) sequentially...")
+                        sub_concurrency = max(1, int(os.getenv("SUB_ISSUE_CONCURRENCY", "4")))
+                        print(f"\n📋 Processing {len(sub_issues)} sub-issue(s), up to {sub_concurrency} crew run(s) at a time...")
+                        
+                        # Move sub-issues to "In Progress" (batched into as few GraphQL requests as possible)
+                        if pipeline_enabled:
+                            move_issues_in_project(repo_name, [(sub_issue.number, in_progress_column) for sub_issue in sub_issues],
+                                                   move_one=move_issue_in_project)
+                        
+                        # With concurrency > 1 the crews overlap. They all plan against one snapshot of the
+                        # project taken here, before any sub-issue is applied, since applying, testing and
+                        # committing (in order, below) change the tree under them. With 1, each crew runs
+                        # in the loop on the tree the previous sub-issue left.
+                        sub_result_futures = {}
+                        if sub_concurrency > 1:
+                            shared_inputs = gather_project_inputs(work_dir)
+                            sub_crew_executor = ThreadPoolExecutor(max_workers=sub_concurrency)
+                            sub_result_futures = {
+                                sub_issue.number: sub_crew_executor.submit(
+                                    process_issue, sub_issue, repo_name, work_dir, include_sub_issues=False,
+                                    enable_testing=enable_testing, result_cache=result_cache,
+                                    project_inputs=shared_inputs)
+                                for sub_issue in sub_issues
+                            }
+                            sub_crew_executor.shutdown(wait=False)
+                        
                         for sub_issue in sub_issues:
                             print(f"\n{'='*70}")
                             print(f"Processing Sub-Issue #{sub_issue.number}: {sub_issue.title}")
                             print(f"{'='*70}\n")
                             
-                            # Move sub-issue to "In Progress"
-                            if pipeline_enabled:
-                                move_issue_in_project(repo_name, sub_issue.number, in_progress_column)
-                            
-                            # Process sub-issue
-                            sub_result = process_issue(sub_issue, repo_name, work_dir, include_sub_issues=False, enable_testing=enable_testing)
+                            # Wait for the sub-issue's crew run, or run it now
+                            if sub_issue.number in sub_result_futures:
+                                sub_result = sub_result_futures[sub_issue.number].result()
+                            else:
+                                sub_result = process_issue(sub_issue, repo_name, work_dir, include_sub_issues=False,
+                                                           enable_testing=enable_testing, result_cache=result_cache)
                             
                             # Apply implementation
                             sub_implementation_status = apply_implementation(sub_result, sub_issue.number, work_dir, enable_testing=enable_testing)
                             
                             # Create branch and commit for sub-issue (ONLY if complete)
                             if sub_implementation_status and sub_implementation_status["status"] == "complete":
+                                if result_cache is not None:
+                                    result_cache.put(sub_issue.number, sub_result)
                                 if (work_dir / ".git").exists():
-                                    create_branch_and_commit(
+                                    sub_commit_result = create_branch_and_commit(
                                         sub_issue.number,
                                         work_dir,
                                         repo_name=repo_name,
                                         issue_title=sub_issue.title,
-                                        push=push_to_github
+                                        push=push_to_github,
+                                        pr_executor=pr_executor
                                     )
+                                    if sub_commit_result.get("pr_future"):
+                                        pr_futures.append((sub_issue.number, sub_commit_result["pr_future"]))
                                 
-                                # Move sub-issue to "Done" (only if complete)
+                                # Queue the sub-issue's move to "Done" (only if complete)
                                 if pipeline_enabled:
                                     target_column = os.getenv("PIPELINE_DONE_COLUMN", "Done")
-                                    move_issue_in_project(repo_name, sub_issue.number, target_column)
-                                    print(f"✅ Sub-issue #{sub_issue.number} moved to '{target_column}'")
+                                    pending_moves.append((sub_issue.number, target_column))
                                 
-                                # Mark sub-issue as processed
-                                mark_issue_processed(sub_issue.number, processed_file)
+                                # Queue the sub-issue's processed mark; written together with the parent's
+                                processed_sub_issues.append(sub_issue.number)
                                 print(f"✅ Sub-issue #{sub_issue.number} processed successfully!")
                             else:
                                 print(f"⚠️  Sub-issue #{sub_issue.number} implementation incomplete - not moved to Done")
@@ -4585,14 +3645,23 @@ Original issue:
                 if not patch_applied:
                     warnings.append("Patch failed to apply - review patch file manually or apply changes manually")
             
-            # Move issue in project pipeline
-            pipeline_enabled = os.getenv("MOVE_IN_PIPELINE", "true").lower() == "true"
-            if pipeline_enabled:
-                # Move to "Done" column after completion
-                target_column = os.getenv("PIPELINE_DONE_COLUMN", "Done")
-                pipeline_success = move_issue_in_project(repo_name, issue.number, target_column)
-                if not pipeline_success:
-                    warnings.append("Failed to move issue in project pipeline (network/GitHub API issue)")
+            # Apply the queued pipeline moves (batched into as few GraphQL requests as possible)
+            if pending_moves:
+                move_results = move_issues_in_project(repo_name, pending_moves, move_one=move_issue_in_project)
+                for moved_number, target_column in pending_moves:
+                    if move_results.get(moved_number):
+                        print(f"✅ Issue #{moved_number} moved to '{target_column}'")
+                    else:
+                        warnings.append(f"Failed to move issue #{moved_number} in project pipeline (network/GitHub API issue)")
+            # Wait for the PRs so their output lands before the status summary; a failed one is a warning
+            for pr_issue_number, pr_future in pr_futures:
+                try:
+                    pr_url = pr_future.result()
+                except Exception as e:
+                    print(f"⚠ Error creating PR for issue #{pr_issue_number}: {e}")
+                    pr_url = None
+                if not pr_url:
+                    warnings.append(f"Pull request for issue #{pr_issue_number} was not created (network/GitHub API issue)")
             
             # Check git operations
             if (work_dir / ".git").exists():
@@ -4600,15 +3669,14 @@ Original issue:
                 if push_to_github:
                     # Check if branch was actually pushed
                     try:
-                        result = subprocess.run(['git', 'rev-parse', '--abbrev-ref', '@{u}'], 
-                                              cwd=work_dir, capture_output=True, text=True, check=False, timeout=5)
+                        result = run_git(['rev-parse', '--abbrev-ref', '@{u}'], work_dir, timeout=5)
                         if result.returncode != 0:
                             warnings.append("Branch not pushed to remote (network issue - check connectivity)")
                     except Exception:
                         warnings.append("Could not verify if branch was pushed (check manually)")
             
             # Mark as processed (core implementation succeeded, even if GitHub ops failed)
-            mark_issue_processed(issue.number, processed_file)
+            mark_issues_processed(processed_sub_issues + [issue.number], processed_file)
             issues_processed += 1
             
             # Separate local and Git/GitHub status
@@ -4620,8 +3688,12 @@ Original issue:
         except Exception as e:
             print(f"\n❌ Error processing issue #{issue.number}: {e}")
             # Mark as processed anyway to avoid infinite loop
-            mark_issue_processed(issue.number, processed_file)
+            mark_issues_processed(processed_sub_issues + [issue.number], processed_file)
             continue
+        finally:
+            pr_executor.shutdown(wait=True)
+            if sub_crew_executor is not None:
+                sub_crew_executor.shutdown(wait=True, cancel_futures=True)
     
     print(f"\n{'='*70}")
     print(f"🎉 Automated crew completed! Processed {issues_processed} issues.")
@@ -4629,7 +3701,6 @@ Original issue:
 
 def test_css_selector_extraction():
     """Self-check: Validate CSS selector extraction from plan text"""
-    import tempfile
     from pathlib import Path
     
     # Test cases
@@ -4690,7 +3761,6 @@ def test_css_selector_extraction():
 
 def test_structured_changes_validation():
     """Self-check: Validate that new operations pass validation"""
-    import tempfile
     from pathlib import Path
     
     # Create a temporary work directory
@@ -4761,11 +3831,10 @@ def test_structured_changes_validation():
 
 
 def run_self_tests():
-    """Run self-tests for upsert functions, validation, and CSS selector extraction"""
+    """Run self-tests for validation and CSS selector extraction.
+    Upsert helper tests live in tests/test_structured_changes.py."""
     print("Running self-tests for structured change applier...")
     try:
-        test_upsert_function_js()
-        test_upsert_css_selector()
         test_structured_changes_validation()
         test_css_selector_extraction()
         print("\n✅ All self-tests passed!")
@@ -4775,7 +3844,6 @@ def run_self_tests():
         return False
     except Exception as e:
         print(f"\n❌ Self-test error: {e}")
-        import traceback
         traceback.print_exc()
         return False
 
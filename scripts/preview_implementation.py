@@ -173,9 +173,10 @@ def get_git_status(work_dir: Path) -> dict:
     if not (work_dir / ".git").exists():
         return status
     
-    # Get branch
+    # Get HEAD and branch in one rev-parse (full SHA first: --abbrev-ref applies to every later rev);
+    # HEAD only resolves once there is a commit
     result = subprocess.run(
-        ["git", "rev-parse", "--abbrev-ref", "HEAD"],
+        ["git", "rev-parse", "HEAD", "--abbrev-ref", "HEAD"],
         cwd=work_dir,
         capture_output=True,
         text=True,
@@ -183,19 +184,10 @@ def get_git_status(work_dir: Path) -> dict:
         timeout=5
     )
     if result.returncode == 0:
-        status["branch"] = result.stdout.strip()
-    
-    # Check if committed
-    result = subprocess.run(
-        ["git", "log", "--oneline", "-1"],
-        cwd=work_dir,
-        capture_output=True,
-        text=True,
-        check=False,
-        timeout=5
-    )
-    if result.returncode == 0 and result.stdout.strip():
-        status["committed"] = True
+        lines = result.stdout.split()
+        if len(lines) == 2:
+            status["committed"] = True
+            status["branch"] = lines[1]
     
     # Check if pushed
     if status["branch"]:
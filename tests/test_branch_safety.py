@@ -4,6 +4,8 @@ Unit tests for branch safety guard logic.
 Tests ensure_feature_branch function with mocked git commands.
 """
 
+import io
+import os
 import unittest
 import tempfile
 from pathlib import Path
@@ -14,12 +16,19 @@ from unittest.mock import patch, MagicMock
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 try:
-    from crew_runner.git_ops import ensure_feature_branch, get_current_branch, has_changes
+    from crew_runner.git_ops import (
+        ensure_feature_branch, get_current_branch, get_git_snapshot, has_changes, invalidate_git_snapshot,
+        rejected_push_refs, run_git
+    )
 except ImportError as e:
     print(f"⚠️  Skipping branch safety tests: {e}")
     ensure_feature_branch = None
     get_current_branch = None
+    get_git_snapshot = None
+    invalidate_git_snapshot = None
     has_changes = None
+    rejected_push_refs = None
+    run_git = None
 
 
 @unittest.skipIf(ensure_feature_branch is None, "Dependencies not installed")
@@ -135,6 +144,194 @@ class TestBranchSafetyGuard(unittest.TestCase):
             shutil.rmtree(non_git_dir, ignore_errors=True)
 
 
+@unittest.skipIf(get_current_branch is None, "Dependencies not installed")
+class TestGetCurrentBranch(unittest.TestCase):
+    """Test get_current_branch reading .git/HEAD directly"""
+    
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        (self.test_dir / ".git").mkdir()
+    
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    @patch('subprocess.run')
+    def test_reads_branch_from_head_file(self, mock_subprocess):
+        """Should return the branch named in .git/HEAD without running git"""
+        (self.test_dir / ".git" / "HEAD").write_text("ref: refs/heads/feature/issue-7\n")
+        
+        self.assertEqual(get_current_branch(self.test_dir), "feature/issue-7")
+        mock_subprocess.assert_not_called()
+    
+    def test_detached_head(self):
+        """Should return 'HEAD' when HEAD holds a commit SHA"""
+        (self.test_dir / ".git" / "HEAD").write_text("0123456789abcdef0123456789abcdef01234567\n")
+        
+        self.assertEqual(get_current_branch(self.test_dir), "HEAD")
+
+
+@unittest.skipIf(get_git_snapshot is None, "Dependencies not installed")
+class TestGitSnapshot(unittest.TestCase):
+    """Test get_git_snapshot parsing of `git status --porcelain=v2 --branch -z`"""
+    
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        (self.test_dir / ".git").mkdir()
+    
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    @patch('subprocess.Popen')
+    def test_parses_headers_and_entries(self, mock_popen):
+        """Should read branch, HEAD, upstream and every changed path from one call"""
+        records = [
+            b"# branch.oid 0123456789abcdef0123456789abcdef01234567",
+            b"# branch.head feature/issue-7",
+            b"# branch.upstream origin/feature/issue-7",
+            b"# branch.ab +1 -0",
+            b"1 .M N... 100644 100644 100644 aaaa bbbb src/app file.js",
+            b"2 R. N... 100644 100644 100644 aaaa bbbb R100 new.js",
+            b"old.js",
+            b"? untracked.css",
+        ]
+        mock_popen.return_value = MagicMock(stdout=io.BytesIO(b"\0".join(records) + b"\0"), **{'wait.return_value': 0})
+        
+        snapshot = get_git_snapshot(self.test_dir)
+        
+        self.assertEqual(mock_popen.call_count, 1)
+        self.assertEqual(snapshot.branch, "feature/issue-7")
+        self.assertEqual(snapshot.short_sha, "0123456")
+        self.assertEqual(snapshot.upstream, "origin/feature/issue-7")
+        self.assertEqual(snapshot.changed_files, ["src/app file.js", "new.js", "untracked.css"])
+        self.assertTrue(snapshot.dirty)
+    
+    @patch('subprocess.Popen')
+    def test_initial_commit_and_detached(self, mock_popen):
+        """Should report no HEAD before the first commit and 'HEAD' when detached"""
+        mock_popen.return_value = MagicMock(
+            stdout=io.BytesIO(b"# branch.oid (initial)\0# branch.head (detached)\0"), **{'wait.return_value': 0})
+        
+        snapshot = get_git_snapshot(self.test_dir)
+        
+        self.assertIsNone(snapshot.head_sha)
+        self.assertEqual(snapshot.branch, "HEAD")
+        self.assertIsNone(snapshot.upstream)
+        self.assertFalse(snapshot.dirty)
+    
+    @patch('subprocess.Popen')
+    def test_cached_until_invalidated(self, mock_popen):
+        """Should reuse the snapshot while .git/HEAD and .git/index are unchanged"""
+        (self.test_dir / ".git" / "HEAD").write_text("ref: refs/heads/main\n")
+        mock_popen.side_effect = lambda *a, **k: MagicMock(
+            stdout=io.BytesIO(b"# branch.head main\0"), **{'wait.return_value': 0})
+        
+        first = get_git_snapshot(self.test_dir)
+        self.assertIs(get_git_snapshot(self.test_dir), first)
+        self.assertEqual(mock_popen.call_count, 1)
+        
+        invalidate_git_snapshot(self.test_dir)
+        get_git_snapshot(self.test_dir)
+        self.assertEqual(mock_popen.call_count, 2)
+
+
+@unittest.skipIf(rejected_push_refs is None, "Dependencies not installed")
+class TestRejectedPushRefs(unittest.TestCase):
+    """Test parsing of `git push --porcelain` output"""
+    
+    def test_reports_only_rejected_refs(self):
+        """Should return (ref, reason) for '!' lines and ignore pushed or up-to-date refs"""
+        output = (
+            "To github.com:org/repo.git\n"
+            "!\trefs/heads/feature/issue-7:refs/heads/feature/issue-7\t[rejected] (non-fast-forward)\n"
+            " \trefs/heads/feature/issue-8:refs/heads/feature/issue-8\t0222c66..3bcf58e\n"
+            "=\trefs/heads/main:refs/heads/main\t[up to date]\n"
+            "Done\n"
+        )
+        
+        self.assertEqual(rejected_push_refs(output), [
+            ("refs/heads/feature/issue-7:refs/heads/feature/issue-7", "[rejected] (non-fast-forward)")
+        ])
+
+
+@unittest.skipIf(run_git is None, "Dependencies not installed")
+class TestRunGitPrompts(unittest.TestCase):
+    """Test that run_git never lets a command wait on a credential prompt or hit a too-short timeout"""
+    
+    @patch('subprocess.run')
+    def test_network_commands_disable_prompts(self, mock_subprocess):
+        """Should disable terminal and askpass prompts for push but leave local commands' env alone"""
+        with patch.dict(os.environ):
+            os.environ.pop('GIT_ASKPASS', None)
+            os.environ.pop('SSH_ASKPASS', None)
+            run_git(['push', '-u', 'origin', 'feature/issue-7'], Path('.'))
+        env = mock_subprocess.call_args.kwargs['env']
+        self.assertEqual(env['GIT_TERMINAL_PROMPT'], '0')
+        self.assertEqual(env['GIT_ASKPASS'], 'true')
+        
+        run_git(['status'], Path('.'))
+        self.assertIsNone(mock_subprocess.call_args.kwargs['env'])
+    
+    @patch('subprocess.run')
+    def test_keeps_user_askpass_helper(self, mock_subprocess):
+        """Should not override an askpass helper the user already configured"""
+        with patch.dict(os.environ, {'GIT_ASKPASS': '/opt/editor/askpass.sh'}):
+            run_git(['fetch', 'origin'], Path('.'))
+        env = mock_subprocess.call_args.kwargs['env']
+        self.assertEqual(env['GIT_ASKPASS'], '/opt/editor/askpass.sh')
+        self.assertEqual(env['GIT_TERMINAL_PROMPT'], '0')
+    
+    @patch('subprocess.run')
+    def test_default_timeouts(self, mock_subprocess):
+        """Should give checkout/add/reset/apply the long default, fetch 30s and other commands 10s"""
+        for args, expected in ((['checkout', 'main'], 120), (['add', '--', 'a.js'], 120),
+                               (['reset', '--hard'], 120), (['apply', 'x.patch'], 120),
+                               (['fetch', 'origin'], 30), (['status'], 10)):
+            run_git(args, Path('.'))
+            self.assertEqual(mock_subprocess.call_args.kwargs['timeout'], expected, args)
+
+
+def _load_script_function(name, namespace):
+    """Exec one top-level function from scripts/automated_crew.py (the script itself needs crewai)"""
+    import ast
+    source = (Path(__file__).parent.parent / "scripts" / "automated_crew.py").read_text(encoding='utf-8')
+    for node in ast.parse(source).body:
+        if isinstance(node, ast.FunctionDef) and node.name == name:
+            exec(compile(ast.Module([node], []), "automated_crew.py", "exec"), namespace)
+            return namespace[name]
+    raise LookupError(name)
+
+
+@unittest.skipIf(run_git is None, "Dependencies not installed")
+class TestScriptCreateBranchAndCommitResult(unittest.TestCase):
+    """The run loops read create_branch_and_commit's result with .get(); it must always be a dict"""
+    
+    def setUp(self):
+        import crew_runner.git_ops as git_ops
+        namespace = {k: v for k, v in vars(git_ops).items() if not k.startswith('__')}
+        self.create_branch_and_commit = _load_script_function("create_branch_and_commit", namespace)
+        self.test_dir = Path(tempfile.mkdtemp())
+    
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    def test_not_a_git_repo(self):
+        """Should return a not-committed dict outside a git repository"""
+        result = self.create_branch_and_commit(7, self.test_dir)
+        self.assertEqual(result["did_commit"], False)
+        self.assertIsNone(result.get("pr_future"))
+    
+    def test_nothing_to_commit(self):
+        """Should return a not-committed dict (with the branch) when there are no changes"""
+        import subprocess
+        subprocess.run(['git', 'init', '-q', str(self.test_dir)], check=True)
+        result = self.create_branch_and_commit(7, self.test_dir)
+        self.assertEqual(result["did_commit"], False)
+        self.assertEqual(result["branch_name"], "feature/issue-7")
+
+
 def run_self_check():
     """
     Internal self-check function that can be run without network.
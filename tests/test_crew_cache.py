@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the crew result cache.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# Add parent directory to path to import crew_runner modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from crew_runner.crew_cache import CrewResultCache
+
+
+class TestCrewResultCache(unittest.TestCase):
+    """Test CrewResultCache round trips and key invalidation"""
+
+    def setUp(self):
+        self.cache_dir = Path(tempfile.mkdtemp())
+        self.cache = CrewResultCache(self.cache_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_round_trip(self):
+        """Should replay raw and task outputs stored for the same issue signature"""
+        key = CrewResultCache.key_for("org/repo", "Add timer", "Body", [(8, "Sub", None)])
+        self.assertIsNone(self.cache.get(7, key))
+
+        crew_output = SimpleNamespace(raw='{"changes": []}', tasks_output=["plan", "review"])
+        self.cache.put(7, crew_output)
+
+        cached = self.cache.get(7, key)
+        self.assertEqual(str(cached), '{"changes": []}')
+        self.assertEqual(cached.tasks_output, ["plan", "review"])
+
+    def test_key_changes_with_issue_text_and_prompt_version(self):
+        """Should miss when the body, a sub-issue or CREW_PROMPT_VERSION changes"""
+        with patch.dict(os.environ, {"CREW_PROMPT_VERSION": "1"}):
+            key = CrewResultCache.key_for("org/repo", "Add timer", "Body")
+            self.assertEqual(key, CrewResultCache.key_for("org/repo", "Add timer", "Body"))
+            self.assertNotEqual(key, CrewResultCache.key_for("org/repo", "Add timer", "Body v2"))
+            self.assertNotEqual(key, CrewResultCache.key_for("org/repo", "Add timer", "Body", [(8, "Sub", "")]))
+        with patch.dict(os.environ, {"CREW_PROMPT_VERSION": "2"}):
+            self.assertNotEqual(key, CrewResultCache.key_for("org/repo", "Add timer", "Body"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -15,8 +15,11 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 try:
     from crew_runner.schema import validate_structured_changes, RunState
-    from crew_runner.apply_changes import upsert_function_js, upsert_css_selector
+    from crew_runner.apply_changes import (
+        upsert_function_js, upsert_css_selector, apply_structured_changes, apply_changes_batch
+    )
     from crew_runner.plan_requirements import parse_plan_requirements
+    from crew_runner.coverage import check_coverage
     from crew_runner.git_ops import ensure_feature_branch
 except ImportError as e:
     # Skip tests if dependencies are not installed
@@ -26,7 +29,10 @@ except ImportError as e:
     validate_structured_changes = None
     upsert_function_js = None
     upsert_css_selector = None
+    apply_structured_changes = None
+    apply_changes_batch = None
     parse_plan_requirements = None
+    check_coverage = None
     ensure_feature_branch = None
 
 
@@ -235,6 +241,103 @@ class TestUpsertCSSSelector(unittest.TestCase):
             tmp_path.unlink()
 
 
+@unittest.skipIf(apply_changes_batch is None, "Dependencies not installed")
+class TestApplyChangesBatch(unittest.TestCase):
+    """Test batched application: grouped by path, parallel across files"""
+    
+    def test_applies_sequential_changes_to_same_file_in_order(self):
+        """Should apply upserts on one file in order and report it once"""
+        work_dir = Path(tempfile.mkdtemp())
+        (work_dir / "app.js").write_text("// app\n")
+        (work_dir / "style.css").write_text("body { margin: 0; }\n")
+        changes = {
+            "changes": [
+                {"path": "app.js", "operation": "upsert_function_js", "function_name": "a",
+                 "content": "function a() { return 1; }"},
+                {"path": "style.css", "operation": "upsert_css_selector", "selector": ".modal",
+                 "content": ".modal { display: none; }"},
+                {"path": "app.js", "operation": "upsert_function_js", "function_name": "a",
+                 "content": "function a() { return 2; }"},
+            ]
+        }
+        success, changed_files, errors = apply_structured_changes(changes, work_dir)
+        self.assertTrue(success, f"Should succeed: {errors}")
+        self.assertEqual(changed_files, ["app.js", "style.css"])
+        content = (work_dir / "app.js").read_text()
+        self.assertIn("return 2", content)
+        self.assertNotIn("return 1", content)
+    
+    def test_collects_failed_paths(self):
+        """Should report failed paths separately from succeeded ones"""
+        work_dir = Path(tempfile.mkdtemp())
+        changes = {
+            "changes": [
+                {"path": "new.txt", "operation": "create", "content": "hello"},
+                {"path": "missing.txt", "operation": "delete"},
+            ]
+        }
+        result = apply_changes_batch(changes, work_dir)
+        self.assertEqual(result.succeeded, ["new.txt"])
+        self.assertEqual(result.failed, ["missing.txt"])
+        self.assertEqual(len(result.errors), 1)
+        self.assertEqual(result.messages, ["✓ Created file: new.txt"])
+    
+    def test_fail_fast_stops_remaining_changes(self):
+        """Should skip later changes in a group after the first error"""
+        work_dir = Path(tempfile.mkdtemp())
+        changes = {
+            "changes": [
+                {"path": "missing.txt", "operation": "delete"},
+                {"path": "missing.txt", "operation": "create", "content": "late"},
+            ]
+        }
+        result = apply_changes_batch(changes, work_dir, fail_fast=True)
+        self.assertEqual(result.failed, ["missing.txt"])
+        self.assertFalse((work_dir / "missing.txt").exists())
+    
+    def test_replace_file_keeps_mode_and_leaves_no_temp_files(self):
+        """Should swap file content atomically without leftover temp files"""
+        work_dir = Path(tempfile.mkdtemp())
+        target = work_dir / "run.sh"
+        target.write_text("echo old\n")
+        os.chmod(target, 0o755)
+        changes = {"changes": [{"path": "run.sh", "operation": "replace_file", "content": "echo new\n"}]}
+        success, changed_files, errors = apply_structured_changes(changes, work_dir)
+        self.assertTrue(success, f"Should succeed: {errors}")
+        self.assertEqual(target.read_text(), "echo new\n")
+        self.assertEqual(os.stat(target).st_mode & 0o777, 0o755)
+        self.assertEqual(sorted(p.name for p in work_dir.iterdir()), ["run.sh"])
+    
+    def test_create_uses_umask_mode(self):
+        """Should give new files the same mode as a plain open() would"""
+        work_dir = Path(tempfile.mkdtemp())
+        (work_dir / "plain.txt").write_text("x")
+        changes = {"changes": [{"path": "new.txt", "operation": "create", "content": "x"}]}
+        success, changed_files, errors = apply_structured_changes(changes, work_dir)
+        self.assertTrue(success, f"Should succeed: {errors}")
+        self.assertEqual(os.stat(work_dir / "new.txt").st_mode & 0o777,
+                         os.stat(work_dir / "plain.txt").st_mode & 0o777)
+
+    
+    def test_multiline_find_and_signature_in_crlf_file(self):
+        """Should match multi-line anchors and signatures in a file with \\r\\n line endings"""
+        work_dir = Path(tempfile.mkdtemp())
+        (work_dir / "app.js").write_bytes(b"function a() {\r\n  return 1;\r\n}\r\n")
+        (work_dir / "util.js").write_bytes(b"function u() {\r\n  return 0;\r\n}\r\n")
+        changes = {
+            "changes": [
+                {"path": "app.js", "operation": "edit",
+                 "edits": [{"find": "  return 1;\n}", "replace": "  return 2;\n}"}]},
+                {"path": "util.js", "operation": "append_if_missing",
+                 "signature": "function u() {\n  return 0;", "content": "function u() {}"},
+            ]
+        }
+        success, changed_files, errors = apply_structured_changes(changes, work_dir)
+        self.assertTrue(success, f"Should succeed: {errors}")
+        self.assertIn("return 2", (work_dir / "app.js").read_text())
+        self.assertEqual(changed_files, ["app.js"])
+
+
 @unittest.skipIf(parse_plan_requirements is None, "Dependencies not installed")
 class TestSelectorExtraction(unittest.TestCase):
     """Test E) CSS selector extraction: only valid selectors"""
@@ -306,6 +409,62 @@ The editModal needs work. Use data-id attributes.
             self.assertIn("#editModal", selectors)
         finally:
             tmp_path.unlink()
+    
+    def test_deep_headers_and_headerless_test_approach(self):
+        """Should read '####' sections and a bold 'Test Approach' line like the old unanchored scans"""
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.md', delete=False) as tmp:
+            tmp.write("""
+# Implementation Plan
+
+#### New Functions
+- `startTimer()`
+- `stopTimer()`
+
+**Test Approach:** add test/timer_spec.js
+
+#### Files to Change
+- `app.js`
+""")
+            tmp_path = Path(tmp.name)
+        
+        try:
+            requirements = parse_plan_requirements(tmp_path)
+            self.assertEqual(requirements["functions"], ["startTimer", "stopTimer"])
+            self.assertEqual(requirements["test_files"], ["test/timer_spec.js"])
+            self.assertEqual(requirements["required_files"], ["app.js"])
+        finally:
+            tmp_path.unlink()
+
+
+@unittest.skipIf(check_coverage is None, "Dependencies not installed")
+class TestCoverage(unittest.TestCase):
+    """Test coverage check against required functions and selectors"""
+    
+    def test_reports_only_missing_items(self):
+        """Should find declared functions/selectors and report the rest as missing"""
+        work_dir = Path(tempfile.mkdtemp())
+        plan_file = work_dir / "plan.md"
+        plan_file.write_text(
+            "### New Functions\n- `openModal()`\n- `closeModal()`\n\n"
+            "Style `.modal`, `#editModal` and `.toast`\n"
+        )
+        (work_dir / "app.js").write_text("function openModal() {}\n")
+        (work_dir / "styles.css").write_text(".modal, #editModal { display: none; }\n")
+        
+        is_complete, missing = check_coverage(plan_file, work_dir)
+        self.assertFalse(is_complete)
+        self.assertEqual(missing["functions"], ["closeModal"])
+        self.assertEqual(missing["css_selectors"], [".toast"])
+    
+    def test_attribute_selectors_are_matched(self):
+        """Should treat [attribute] selectors like classes and ids"""
+        work_dir = Path(tempfile.mkdtemp())
+        plan_file = work_dir / "plan.md"
+        plan_file.write_text("Style `[data-id]` rows and `[hidden]`\n")
+        (work_dir / "styles.css").write_text("[data-id] { cursor: pointer; }\n")
+        
+        _, missing = check_coverage(plan_file, work_dir)
+        self.assertEqual(missing["css_selectors"], ["[hidden]"])
 
 
 @unittest.skipIf(RunState is None, "Dependencies not installed")